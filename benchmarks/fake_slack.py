@@ -0,0 +1,302 @@
+"""
+Fake Slack Web API
+A local stand-in for ``https://slack.com/api/`` used by the benchmarks, with
+configurable latency, page sizes, 429 injection and workspace size.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from aiohttp import web
+
+# Timestamp of the oldest generated message
+BASE_TS = 1_700_000_000
+
+
+@dataclass
+class FakeSlackConfig:
+    """Shape and behaviour of the fake workspace."""
+
+    users: int = 5000
+    channels: int = 500
+    messages_per_channel: int = 2000
+    # Every n-th message starts a thread with ``replies_per_thread`` replies
+    thread_every: int = 10
+    replies_per_thread: int = 5
+    emojis: int = 200
+    files: int = 1000
+    # Server side cap on ``limit``/``count``, like Slack's own page limits
+    max_page_size: int = 1000
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    # Fraction of requests answered with HTTP 429
+    ratelimit_rate: float = 0.0
+    retry_after: int = 1
+    seed: int = 0
+
+
+def _user(i: int) -> dict[str, Any]:
+    return {
+        "id": f"U{i:07d}",
+        "name": f"user{i}",
+        "real_name": f"User {i}",
+        "tz": "Europe/Istanbul",
+        "is_bot": False,
+        "deleted": False,
+        "profile": {
+            "real_name": f"User {i}",
+            "display_name": f"user{i}",
+            "email": f"user{i}@example.com",
+            "title": "Engineer",
+            "status_text": "",
+        },
+    }
+
+
+def _channel(i: int) -> dict[str, Any]:
+    return {
+        "id": f"C{i:07d}",
+        "name": f"channel-{i}",
+        "is_private": False,
+        "is_archived": False,
+        "num_members": 10 + i % 90,
+        "created": BASE_TS,
+        "topic": {"value": f"Topic {i}"},
+        "purpose": {"value": f"Purpose {i}"},
+    }
+
+
+class FakeSlack:
+    """``aiohttp`` application answering the Slack Web API methods the tools use."""
+
+    def __init__(self, config: Optional[FakeSlackConfig] = None) -> None:
+        self.config = config or FakeSlackConfig()
+        self.requests: Counter[str] = Counter()
+        self.ratelimited: Counter[str] = Counter()
+        self._random = random.Random(self.config.seed)
+        self._posted = 0
+        self._uploads: dict[str, int] = {}
+        self._handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+            "auth.test": lambda a: {"user_id": "U0000000", "team_id": "T0000001"},
+            "team.info": self.team_info,
+            "emoji.list": self.emoji_list,
+            "users.list": self.users_list,
+            "users.info": self.users_info,
+            "users.lookupByEmail": self.users_lookup_by_email,
+            "conversations.list": self.conversations_list,
+            "conversations.info": self.conversations_info,
+            "conversations.history": self.conversations_history,
+            "conversations.replies": self.conversations_replies,
+            "conversations.create": self.conversations_create,
+            "chat.postMessage": self.chat_post_message,
+            "chat.scheduleMessage": lambda a: {"scheduled_message_id": "Q0000001", "post_at": a.get("post_at")},
+            "files.list": self.files_list,
+            "files.upload": lambda a: {"file": {"id": "F0000001"}},
+            "files.getUploadURLExternal": self.files_get_upload_url,
+            "files.completeUploadExternal": self.files_complete_upload,
+            "search.messages": self.search_messages,
+            "reminders.add": lambda a: {"reminder": {"id": "Rm0000001"}},
+        }
+
+    # -- application --------------------------------------------------------
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_route("*", "/api/{method}", self.handle)
+        app.router.add_post("/upload/{file_id}", self.handle_upload)
+        return app
+
+    async def _delay(self) -> None:
+        delay = self.config.latency_ms + self._random.uniform(-1, 1) * self.config.jitter_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.requests[method] += 1
+        await self._delay()
+        if self.config.ratelimit_rate and self._random.random() < self.config.ratelimit_rate:
+            self.ratelimited[method] += 1
+            return web.json_response(
+                {"ok": False, "error": "ratelimited"},
+                status=429,
+                headers={"Retry-After": str(self.config.retry_after)},
+            )
+
+        args: dict[str, Any] = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                args.update(await request.json())
+            else:
+                args.update(await request.post())
+        handler = self._handlers.get(method)
+        body = handler(args) if handler else {}
+        if "error" in body:
+            return web.json_response({"ok": False, **body})
+        return web.json_response({"ok": True, **body})
+
+    async def handle_upload(self, request: web.Request) -> web.Response:
+        size = 0
+        async for chunk in request.content.iter_chunked(1 << 16):
+            size += len(chunk)
+        self._uploads[request.match_info["file_id"]] = size
+        return web.Response(text=f"OK - {size}")
+
+    # -- helpers --------------------------------------------------------------
+
+    def _page(self, args: dict[str, Any], total: int, key: str = "limit") -> tuple[int, int, str]:
+        """Return ``(start, stop, next_cursor)`` for an offset cursor."""
+        limit = min(int(args.get(key) or 100), self.config.max_page_size)
+        start = int(args.get("cursor") or 0)
+        stop = min(start + limit, total)
+        return start, stop, str(stop) if stop < total else ""
+
+    def _message(self, channel: str, i: int) -> dict[str, Any]:
+        ts = f"{BASE_TS + i}.000100"
+        msg = {
+            "type": "message",
+            "ts": ts,
+            "user": f"U{i % self.config.users:07d}",
+            "text": f"message {i} in {channel} about deploy latency and metrics",
+        }
+        if self.config.thread_every and i % self.config.thread_every == 0:
+            msg["thread_ts"] = ts
+            msg["reply_count"] = self.config.replies_per_thread
+        return msg
+
+    # -- handlers -------------------------------------------------------------
+
+    def team_info(self, args: dict[str, Any]) -> dict[str, Any]:
+        return {"team": {"id": "T0000001", "name": "Bench", "domain": "bench", "email_domain": "example.com"}}
+
+    def emoji_list(self, args: dict[str, Any]) -> dict[str, Any]:
+        return {"emoji": {f"emoji{i}": f"https://emoji.example.com/{i}.png" for i in range(self.config.emojis)}}
+
+    def users_list(self, args: dict[str, Any]) -> dict[str, Any]:
+        start, stop, cursor = self._page(args, self.config.users)
+        return {
+            "members": [_user(i) for i in range(start, stop)],
+            "response_metadata": {"next_cursor": cursor},
+        }
+
+    def users_info(self, args: dict[str, Any]) -> dict[str, Any]:
+        user = str(args.get("user", ""))
+        if not user.startswith("U") or int(user[1:] or -1) >= self.config.users:
+            return {"error": "user_not_found"}
+        return {"user": _user(int(user[1:]))}
+
+    def users_lookup_by_email(self, args: dict[str, Any]) -> dict[str, Any]:
+        name = str(args.get("email", "")).split("@")[0]
+        if not name.startswith("user") or not name[4:].isdigit():
+            return {"error": "users_not_found"}
+        return {"user": _user(int(name[4:]))}
+
+    def conversations_list(self, args: dict[str, Any]) -> dict[str, Any]:
+        start, stop, cursor = self._page(args, self.config.channels)
+        return {
+            "channels": [_channel(i) for i in range(start, stop)],
+            "response_metadata": {"next_cursor": cursor},
+        }
+
+    def conversations_info(self, args: dict[str, Any]) -> dict[str, Any]:
+        channel = str(args.get("channel", ""))
+        return {"channel": _channel(int(channel[1:] or 0))}
+
+    def conversations_create(self, args: dict[str, Any]) -> dict[str, Any]:
+        return {"channel": dict(_channel(self.config.channels), name=args.get("name", "new"))}
+
+    def conversations_history(self, args: dict[str, Any]) -> dict[str, Any]:
+        channel = str(args.get("channel", ""))
+        total = self.config.messages_per_channel
+        # Messages are indexed 0 (oldest) .. total - 1 (newest)
+        newest = total - 1
+        if args.get("latest"):
+            newest = min(newest, int(float(args["latest"])) - BASE_TS - 1)
+        oldest = 0
+        if args.get("oldest"):
+            inclusive = str(args.get("inclusive", "")).lower() in ("1", "true")
+            oldest = max(oldest, int(float(args["oldest"])) - BASE_TS + (0 if inclusive else 1))
+        available = max(newest - oldest + 1, 0)
+        start, stop, cursor = self._page(args, available)
+        return {
+            "messages": [self._message(channel, newest - i) for i in range(start, stop)],
+            "has_more": bool(cursor),
+            "response_metadata": {"next_cursor": cursor},
+        }
+
+    def conversations_replies(self, args: dict[str, Any]) -> dict[str, Any]:
+        channel = str(args.get("channel", ""))
+        parent = int(float(args.get("ts", BASE_TS))) - BASE_TS
+        thread_ts = f"{BASE_TS + parent}.000100"
+        replies = [self._message(channel, parent)] + [
+            {
+                "type": "message",
+                "ts": f"{BASE_TS + parent}.{r + 200:06d}",
+                "thread_ts": thread_ts,
+                "user": f"U{(parent + r) % self.config.users:07d}",
+                "text": f"reply {r} to message {parent}",
+            }
+            for r in range(self.config.replies_per_thread)
+        ]
+        start, stop, cursor = self._page(args, len(replies))
+        return {"messages": replies[start:stop], "response_metadata": {"next_cursor": cursor}}
+
+    def chat_post_message(self, args: dict[str, Any]) -> dict[str, Any]:
+        self._posted += 1
+        return {"channel": args.get("channel"), "ts": f"{int(time.time())}.{self._posted:06d}"}
+
+    def files_list(self, args: dict[str, Any]) -> dict[str, Any]:
+        count = min(int(args.get("count") or 100), self.config.max_page_size)
+        page = int(args.get("page") or 1)
+        pages = max((self.config.files + count - 1) // count, 1)
+        start = (page - 1) * count
+        files = [
+            {"id": f"F{i:07d}", "name": f"file{i}.txt", "filetype": "text", "title": f"File {i}", "size": 1024 * i}
+            for i in range(start, min(start + count, self.config.files))
+        ]
+        return {"files": files, "paging": {"count": count, "total": self.config.files, "page": page, "pages": pages}}
+
+    def files_get_upload_url(self, args: dict[str, Any]) -> dict[str, Any]:
+        file_id = f"F{len(self._uploads) + self.config.files:07d}"
+        self._uploads[file_id] = 0
+        return {"upload_url": f"{self.base_url}/upload/{file_id}", "file_id": file_id}
+
+    def files_complete_upload(self, args: dict[str, Any]) -> dict[str, Any]:
+        files = args.get("files")
+        if isinstance(files, str):
+            files = json.loads(files)
+        return {"files": [{"id": f["id"], "title": f.get("title")} for f in files or []]}
+
+    def search_messages(self, args: dict[str, Any]) -> dict[str, Any]:
+        count = min(int(args.get("count") or 20), 100)
+        matches = [
+            dict(self._message(f"C{i % self.config.channels:07d}", i), channel={"id": f"C{i % self.config.channels:07d}", "name": f"channel-{i % self.config.channels}"})
+            for i in range(count)
+        ]
+        return {"messages": {"matches": matches, "total": count}}
+
+    # -- lifecycle --------------------------------------------------------------
+
+    base_url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Serve the fake API; ``base_url`` is set to ``http://host:port``."""
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        port = runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}"
+        return runner
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "requests": dict(sorted(self.requests.items())),
+            "ratelimited": dict(sorted(self.ratelimited.items())),
+        }
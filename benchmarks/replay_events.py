@@ -0,0 +1,180 @@
+"""
+Slack Event Replayer
+Sign and POST Events API envelopes to the server's ``/slack/events`` route,
+either from an NDJSON file (one envelope or bare event per line) or a
+synthetic mix of message, reaction, user and channel events. Socket Mode
+events are applied by the same ``EventIngestor.handle``, so replaying over
+HTTP covers both transports.
+
+    # Start a server against the fake Slack API and replay 1000 synthetic events
+    python -m benchmarks.replay_events --events 1000
+    # Replay recorded events against a running server
+    python -m benchmarks.replay_events --url http://127.0.0.1:8000 --file events.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import aiohttp
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from slack_mcp_app.events import EVENTS_PATH, signature
+
+from .fake_slack import BASE_TS, FakeSlack, FakeSlackConfig
+from .run import _free_port, _wait_ready, start_server
+
+CHANNELS = 5
+REACTIONS = ["thumbsup", "eyes", "tada", "white_check_mark"]
+
+
+def synthetic_events(count: int, channels: int = CHANNELS, users: int = 50, seed: int = 0) -> Iterable[dict[str, Any]]:
+    """Yield event envelopes shaped like the fake workspace's data."""
+    rng = random.Random(seed)
+    now = time.time()
+    for i in range(count):
+        channel = f"C{rng.randrange(channels):07d}"
+        user = f"U{rng.randrange(users):07d}"
+        ts = f"{now + i / 1000:.6f}"
+        kind = rng.random()
+        if kind < 0.6:
+            event = {"type": "message", "channel": channel, "user": user, "text": f"event message {i}", "ts": ts}
+        elif kind < 0.8:
+            event = {
+                "type": "reaction_added",
+                "user": user,
+                "reaction": rng.choice(REACTIONS),
+                "item": {"type": "message", "channel": channel, "ts": f"{BASE_TS + rng.randrange(100)}.000100"},
+            }
+        elif kind < 0.95:
+            index = int(user[1:])
+            event = {
+                "type": "user_change",
+                "user": {"id": user, "name": f"user{index}", "real_name": f"Renamed {index}-{i}",
+                         "profile": {"display_name": f"renamed{index}"}},
+            }
+        else:
+            event = {"type": "channel_rename", "channel": {"id": channel, "name": f"renamed-{i}"}}
+        yield envelope(event, f"Ev{i:08d}")
+
+
+def envelope(event: dict[str, Any], event_id: str, team_id: str = "T0000001") -> dict[str, Any]:
+    return {
+        "type": "event_callback",
+        "team_id": team_id,
+        "event_id": event_id,
+        "event_time": int(time.time()),
+        "event": event,
+    }
+
+
+def load_events(path: str) -> list[dict[str, Any]]:
+    events = []
+    for i, line in enumerate(Path(path).read_text().splitlines()):
+        if line.strip():
+            payload = json.loads(line)
+            events.append(payload if "event" in payload else envelope(payload, f"Ev{i:08d}"))
+    return events
+
+
+async def replay(url: str, secret: str, events: list[dict[str, Any]], concurrency: int) -> dict[str, Any]:
+    """POST every envelope with a valid signature and report latency and statuses."""
+    statuses: Counter = Counter()
+    latencies: list[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in events:
+        queue.put_nowait(payload)
+
+    async def worker(http: aiohttp.ClientSession) -> None:
+        while not queue.empty():
+            body = json.dumps(queue.get_nowait()).encode()
+            timestamp = str(int(time.time()))
+            headers = {
+                "Content-Type": "application/json",
+                "X-Slack-Request-Timestamp": timestamp,
+                "X-Slack-Signature": signature(secret, timestamp, body),
+            }
+            started = time.perf_counter()
+            async with http.post(f"{url}{EVENTS_PATH}", data=body, headers=headers) as resp:
+                await resp.read()
+                statuses[resp.status] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as http:
+        await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        async with http.get(f"{url}/stats") as resp:
+            applied = (await resp.json()).get("events", {})
+    latencies.sort()
+    return {
+        "events": len(events),
+        "seconds": round(elapsed, 3),
+        "events_per_s": round(len(events) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else 0.0,
+        "statuses": dict(statuses),
+        "server": applied,
+    }
+
+
+async def warm_store(url: str, channels: int = CHANNELS) -> None:
+    """Read each channel once so the message store mirrors it and keeps message events."""
+    async with streamablehttp_client(f"{url}/mcp") as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for i in range(channels):
+                await session.call_tool("get_conversation_history", {"channel": f"C{i:07d}", "limit": 100})
+
+
+async def main(args: argparse.Namespace) -> int:
+    events = load_events(args.file) if args.file else list(synthetic_events(args.events, seed=args.seed))
+    if args.url:
+        report = await replay(args.url.rstrip("/"), args.secret, events, args.concurrency)
+    else:
+        fake = FakeSlack(FakeSlackConfig(users=50, channels=CHANNELS, messages_per_channel=200, latency_ms=1.0))
+        slack_runner = await fake.start()
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        with tempfile.TemporaryDirectory() as workdir:
+            server = start_server(port, fake.base_url, Path(workdir), {"SLACK_SIGNING_SECRET": args.secret})
+            try:
+                await _wait_ready(url, server)
+                await warm_store(url)
+                report = await replay(url, args.secret, events, args.concurrency)
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+                await slack_runner.cleanup()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    return 0 if set(report["statuses"]) <= {200} else 1
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="", help="running server (default: start one against the fake Slack API)")
+    parser.add_argument("--secret", default=os.getenv("SLACK_SIGNING_SECRET", "replay-secret"), help="signing secret")
+    parser.add_argument("--file", default="", help="NDJSON file of envelopes or bare events to replay")
+    parser.add_argument("--events", type=int, default=500, help="synthetic events to generate without --file")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent POSTs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="", help="write the JSON report here (default: stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,283 @@
+"""
+Slack MCP Server Benchmarks
+Run the server against the fake Slack Web API and measure per-tool throughput
+and latency under concurrent MCP clients over streamable HTTP.
+
+    python -m benchmarks.run --clients 20 --requests 200 --output report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import aiohttp
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from .fake_slack import BASE_TS, FakeSlack, FakeSlackConfig
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Arguments for each benchmarked tool; ``i`` is the request number so calls
+# spread over different users/channels instead of hitting one cache entry.
+CASES: dict[str, Callable[[int], dict[str, Any]]] = {
+    "list_channels": lambda i: {"limit": 0},
+    "list_users": lambda i: {"limit": 0},
+    "get_user_info": lambda i: {"user_id": f"U{i % 100:07d}"},
+    "find_user_by_email": lambda i: {"email": f"user{i % 100}@example.com"},
+    "send_message": lambda i: {"channel": f"C{i % 50:07d}", "text": f"bench {i}"},
+    "send_messages_bulk": lambda i: {"channels": [f"C{c:07d}" for c in range(10)], "text": f"bench {i}"},
+    "reply_to_message": lambda i: {"channel": "C0000001", "thread_ts": f"{BASE_TS}.000100", "text": f"bench {i}"},
+    "delete_message": lambda i: {"channel": "C0000001", "ts": f"{BASE_TS + i}.000100"},
+    "schedule_message": lambda i: {"channel": "C0000001", "text": "later", "post_at": BASE_TS + 86400},
+    "add_reaction": lambda i: {"channel": "C0000001", "timestamp": f"{BASE_TS + i}.000100", "name": "eyes"},
+    "pin_message": lambda i: {"channel": "C0000001", "timestamp": f"{BASE_TS + i}.000100"},
+    "unpin_message": lambda i: {"channel": "C0000001", "timestamp": f"{BASE_TS + i}.000100"},
+    "upload_file": lambda i: {"channels": "C0000001", "content": "x" * 4096, "filename": f"bench{i}.txt"},
+    "list_files": lambda i: {"count": 0},
+    "get_conversation_history": lambda i: {"channel": f"C{i % 20:07d}", "limit": 100},
+    "get_thread_replies": lambda i: {"channel": "C0000001", "ts": f"{BASE_TS + (i % 100) * 10}.000100"},
+    "get_channel_threads": lambda i: {"channel": f"C{i % 20:07d}", "limit": 100},
+    "export_conversation": lambda i: {"channel": f"C{i % 5:07d}", "output_path": f"bench-{i % 5}.ndjson"},
+    "sync_channel_history": lambda i: {"channel": f"C{i % 20:07d}"},
+    "search_messages": lambda i: {"query": "deploy latency", "count": 20},
+    "search_local": lambda i: {"query": "deploy latency", "limit": 20},
+    "set_user_status": lambda i: {"status_text": "benchmarking"},
+    "create_reminder": lambda i: {"text": "bench", "time": "in 5 minutes"},
+    "create_channel": lambda i: {"name": f"bench-{i}"},
+    "archive_channel": lambda i: {"channel": f"C{i % 50:07d}"},
+    "set_channel_topic": lambda i: {"channel": f"C{i % 50:07d}", "topic": f"topic {i}"},
+    "set_channel_description": lambda i: {"channel": f"C{i % 50:07d}", "purpose": f"purpose {i}"},
+    "join_channel": lambda i: {"channel": f"C{i % 50:07d}"},
+    "get_team_info": lambda i: {},
+    "list_emojis": lambda i: {},
+    "batch": lambda i: {
+        "requests": [
+            {"tool": "get_user_info", "args": {"user_id": f"U{(i + u) % 100:07d}"}} for u in range(5)
+        ]
+        + [{"tool": "get_thread_replies", "args": {"channel": "C0000001", "ts": f"{BASE_TS + (i % 100) * 10}.000100"}}]
+    },
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (already sorted)."""
+    if not samples:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(samples) + 0.5)) - 1, 0)
+    return samples[min(rank, len(samples) - 1)]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, Any]:
+    samples = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": ms(sum(samples) / len(samples)) if samples else 0.0,
+        "p50_ms": ms(percentile(samples, 50)),
+        "p90_ms": ms(percentile(samples, 90)),
+        "p99_ms": ms(percentile(samples, 99)),
+        "max_ms": ms(samples[-1]) if samples else 0.0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                async with http.get(f"{url}/health") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError("server did not become ready")
+
+
+def start_server(port: int, slack_url: str, workdir: Path, env: dict[str, str]) -> subprocess.Popen:
+    """Launch the MCP server as a subprocess pointed at the fake Slack API."""
+    server_env = {
+        **os.environ,
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "SLACK_USER_TOKEN": "xoxp-bench",
+        "SLACK_API_BASE_URL": f"{slack_url}/api/",
+        "SLACK_EXPORT_DIR": str(workdir / "exports"),
+        "SLACK_MESSAGE_STORE_PATH": str(workdir / "messages.db"),
+        "FASTMCP_HOST": "127.0.0.1",
+        "FASTMCP_PORT": str(port),
+        "FASTMCP_LOG_LEVEL": "WARNING",
+        # Measure the server itself rather than Slack's tier quotas; pass
+        # --env SLACK_RATE_LIMIT_ENABLED=true to include queueing.
+        "SLACK_RATE_LIMIT_ENABLED": "false",
+        **env,
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "slack_mcp_app.slack_mcp_server"],
+        cwd=ROOT,
+        env=server_env,
+    )
+
+
+async def bench_tool(
+    sessions: list[ClientSession], tool: str, requests: int
+) -> dict[str, Any]:
+    """Spread ``requests`` calls of ``tool`` over all client sessions."""
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker(session: ClientSession) -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, CASES[tool](i))
+                text = "".join(getattr(c, "text", "") for c in result.content)
+                if result.isError or text.startswith("Error"):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(s) for s in sessions))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_clients(url: str, clients: int, tools: list[str], requests: int) -> dict[str, Any]:
+    """Open ``clients`` MCP sessions and benchmark each tool in turn."""
+    results: dict[str, Any] = {}
+    async with AsyncExitStack() as stack:
+        sessions: list[ClientSession] = []
+        for _ in range(clients):
+            read, write, _ = await stack.enter_async_context(streamablehttp_client(f"{url}/mcp"))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            sessions.append(session)
+
+        available = {t.name for t in (await sessions[0].list_tools()).tools}
+        for tool in tools:
+            if tool not in available:
+                results[tool] = {"skipped": "not registered"}
+            elif tool not in CASES:
+                results[tool] = {"skipped": "no benchmark case"}
+            else:
+                results[tool] = await bench_tool(sessions, tool, requests)
+                print(f"{tool:28} {json.dumps(results[tool])}", file=sys.stderr)
+        for tool in sorted(available - set(tools) - set(CASES)):
+            results[tool] = {"skipped": "no benchmark case"}
+    return results
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Return tools whose p99 latency regressed by more than ``max_regression``."""
+    regressions = []
+    for tool, result in report["tools"].items():
+        before = baseline.get("tools", {}).get(tool, {})
+        if "p99_ms" not in result or not before.get("p99_ms"):
+            continue
+        ratio = result["p99_ms"] / before["p99_ms"] - 1
+        if ratio > max_regression:
+            regressions.append(f"{tool}: p99 {before['p99_ms']}ms -> {result['p99_ms']}ms (+{ratio:.0%})")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    config = FakeSlackConfig(
+        users=args.users,
+        channels=args.channels,
+        messages_per_channel=args.messages,
+        max_page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        ratelimit_rate=args.ratelimit_rate,
+    )
+    fake = FakeSlack(config)
+    slack_runner = await fake.start()
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(item.split("=", 1) for item in args.env)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(port, fake.base_url, Path(workdir), env)
+        try:
+            await _wait_ready(url, server)
+            tools = args.tools.split(",") if args.tools else list(CASES)
+            started = time.time()
+            results = await run_clients(url, args.clients, tools, args.requests)
+            async with aiohttp.ClientSession() as http:
+                async with http.get(f"{url}/stats") as resp:
+                    server_stats = await resp.json()
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+            await slack_runner.cleanup()
+
+    report = {
+        "started_at": started,
+        "duration_s": round(time.time() - started, 2),
+        "clients": args.clients,
+        "requests_per_tool": args.requests,
+        "env": env,
+        "fake_slack": fake.stats(),
+        "tools": results,
+        "server_stats": server_stats,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    defaults = FakeSlackConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10, help="concurrent MCP sessions")
+    parser.add_argument("--requests", type=int, default=100, help="calls per tool")
+    parser.add_argument("--tools", default="", help="comma separated tools (default: all)")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--channels", type=int, default=defaults.channels)
+    parser.add_argument("--messages", type=int, default=defaults.messages_per_channel, help="messages per channel")
+    parser.add_argument("--page-size", type=int, default=defaults.max_page_size, help="fake API page size cap")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--ratelimit-rate", type=float, default=defaults.ratelimit_rate, help="fraction of 429 responses")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra server environment")
+    parser.add_argument("--output", default="", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default="", help="fail if p99 regressed against this report")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p99 increase (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
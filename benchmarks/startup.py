@@ -0,0 +1,142 @@
+"""
+Slack MCP Server Startup Profile
+Measure cold start: import time per package, time until ``/health`` answers
+and time until the first MCP session has listed the tools.
+
+    python -m benchmarks.startup --runs 5 --budget 1.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+import aiohttp
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from .run import ROOT, _free_port, start_server
+
+SERVER_MODULE = "slack_mcp_app.slack_mcp_server"
+
+
+def import_profile(module: str = SERVER_MODULE) -> dict[str, Any]:
+    """Import ``module`` in a fresh interpreter and sum ``-X importtime`` self times per package."""
+    env = {**os.environ, "SLACK_BOT_TOKEN": "xoxb-startup"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages: dict[str, int] = defaultdict(int)
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line[12:]:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[12:].split("|"))
+        if not self_us.isdigit():
+            continue
+        packages[name.split(".")[0]] += int(self_us)
+        if name == module:
+            total = int(cumulative_us)
+    return {"total_s": total / 1e6, "packages": {k: v / 1e6 for k, v in packages.items()}}
+
+
+async def _poll_health(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                async with http.get(f"{url}/health") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.01)
+    raise TimeoutError("server did not become ready")
+
+
+async def server_start(timeout: float = 30.0) -> dict[str, float]:
+    """Start the server and time ``/health`` and the first tool listing."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        # Slack is never called: the fake base URL only has to be well formed
+        started = time.perf_counter()
+        server = start_server(port, "http://127.0.0.1:9", Path(workdir), {})
+        try:
+            await _poll_health(url, server, timeout)
+            ready = time.perf_counter() - started
+            async with streamablehttp_client(f"{url}/mcp") as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = (await session.list_tools()).tools
+            first_session = time.perf_counter() - started
+            async with aiohttp.ClientSession() as http:
+                async with http.get(f"{url}/stats") as resp:
+                    phases = (await resp.json()).get("startup", {})
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+    return {"ready_s": ready, "first_session_s": first_session, "tools": len(tools), **phases}
+
+
+async def main(args: argparse.Namespace) -> int:
+    imports = [import_profile() for _ in range(args.runs)]
+    starts = [await server_start() for _ in range(args.runs)]
+
+    packages = defaultdict(list)
+    for run in imports:
+        for name, seconds in run["packages"].items():
+            packages[name].append(seconds)
+    median = lambda values: round(statistics.median(values), 4)
+    report = {
+        "runs": args.runs,
+        "import_s": median([r["total_s"] for r in imports]),
+        "ready_s": median([s["ready_s"] for s in starts]),
+        "first_session_s": median([s["first_session_s"] for s in starts]),
+        "tools": starts[0]["tools"],
+        # In-process phases reported by the server itself
+        "server_import_s": median([s.get("import_s", 0.0) for s in starts]),
+        "tools_load_s": median([s.get("tools_s", 0.0) for s in starts]),
+        "slowest_packages": dict(
+            sorted(((k, median(v)) for k, v in packages.items()), key=lambda kv: -kv[1])[: args.top]
+        ),
+        "budget_s": args.budget,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+    if args.budget and report["ready_s"] > args.budget:
+        print(f"OVER BUDGET ready in {report['ready_s']}s (budget {args.budget}s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to measure (medians are reported)")
+    parser.add_argument("--top", type=int, default=10, help="packages listed by import time")
+    parser.add_argument("--budget", type=float, default=0.0, help="fail if /health takes longer (seconds)")
+    parser.add_argument("--output", default="", help="write the JSON report here (default: stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -7,21 +7,23 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent
 ENV_JSON = BASE_DIR / "env.json"
 
-if not ENV_JSON.exists():
+vars_ = {}
+if ENV_JSON.exists():
+    config = json.loads(ENV_JSON.read_text())
+    vars_ = (
+        config.get("ImageRepository", {})
+        .get("ImageConfiguration", {})
+        .get("RuntimeEnvironmentVariables", {})
+    )
+
+    if not vars_:
+        sys.exit("RuntimeEnvironmentVariables not present in env.json")
+
+    os.environ.update(vars_)
+elif not (os.getenv("SLACK_BOT_TOKEN") or os.getenv("SLACK_TENANTS") or os.getenv("SLACK_TENANTS_FILE")):
+    # On App Runner the variables are injected by the service, so env.json is optional
     sys.exit("env.json not found. Please provide environment configuration.")
 
-config = json.loads(ENV_JSON.read_text())
-vars_ = (
-    config.get("ImageRepository", {})
-    .get("ImageConfiguration", {})
-    .get("RuntimeEnvironmentVariables", {})
-)
-
-if not vars_:
-    sys.exit("RuntimeEnvironmentVariables not present in env.json")
-
-os.environ.update(vars_)
-
 # Set port from environment variable for App Runner
 port = os.getenv("PORT", "8000")
 os.environ["FASTMCP_PORT"] = port
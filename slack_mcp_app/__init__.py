@@ -3,7 +3,16 @@ Slack MCP App Package
 Professional Slack automation tools for MCP.
 """
 
-from .slack_mcp_server import mcp
-from . import tools
+import importlib
 
 __all__ = ["mcp", "tools"]
+
+
+def __getattr__(name: str):
+    # Loaded on first access so that importing a submodule (or running
+    # ``python -m slack_mcp_app.slack_mcp_server``) doesn't build the server twice
+    if name == "mcp":
+        return importlib.import_module(".slack_mcp_server", __name__).mcp
+    if name == "tools":
+        return importlib.import_module(".tools", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,97 @@
+"""
+Slack Message Analytics
+Filter and aggregate messages server-side so that analytics-style questions
+(who posted most, which reactions, activity per day) return a few rows
+instead of the raw history.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+TIME_BUCKETS = ("hour", "day", "week")
+AGGREGATES = ("count", "users", "reactions", *TIME_BUCKETS)
+
+
+@dataclass
+class MessageFilter:
+    """Predicates a message must all satisfy; an empty filter matches everything."""
+
+    users: set[str] = field(default_factory=set)
+    pattern: Optional[re.Pattern] = None
+    has_reactions: bool = False
+    has_files: bool = False
+
+    @classmethod
+    def parse(cls, user: str = "", pattern: str = "", has_reactions: bool = False, has_files: bool = False) -> "MessageFilter":
+        """Build a filter from tool arguments; raises ``ValueError`` for a bad regex."""
+        try:
+            compiled = re.compile(pattern, re.IGNORECASE) if pattern else None
+        except re.error as e:
+            raise ValueError(f"invalid pattern '{pattern}': {e}") from None
+        users = {u.strip() for u in (user or "").split(",") if u.strip()}
+        return cls(users, compiled, has_reactions, has_files)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.users or self.pattern or self.has_reactions or self.has_files)
+
+    def matches(self, msg: dict[str, Any]) -> bool:
+        if self.users and (msg.get("user") or msg.get("bot_id")) not in self.users:
+            return False
+        if self.pattern and not self.pattern.search(msg.get("text") or ""):
+            return False
+        if self.has_reactions and not msg.get("reactions"):
+            return False
+        if self.has_files and not msg.get("files"):
+            return False
+        return True
+
+
+def parse_aggregates(spec: str) -> list[str]:
+    """Split a comma separated aggregate list; raises ``ValueError`` for unknown names."""
+    names = [a.strip() for a in (spec or "").split(",") if a.strip()]
+    unknown = [a for a in names if a not in AGGREGATES]
+    if unknown:
+        raise ValueError(f"unknown aggregate '{unknown[0]}' (use any of {', '.join(AGGREGATES)})")
+    return names
+
+
+def bucket_start(ts: str, unit: str) -> str:
+    """Return the UTC start of the ``hour``/``day``/``week`` containing ``ts``."""
+    when = datetime.fromtimestamp(float(ts), tz=timezone.utc)
+    if unit == "hour":
+        return when.strftime("%Y-%m-%dT%H:00Z")
+    if unit == "week":
+        when -= timedelta(days=when.weekday())
+    return when.strftime("%Y-%m-%d")
+
+
+def aggregate(messages: list[dict[str, Any]], scanned: int, aggregates: list[str], top: int = 10) -> list[dict[str, Any]]:
+    """Reduce ``messages`` to ``{"metric", "key", "count"}`` rows.
+
+    ``count`` reports how many messages were scanned and matched; ``users``
+    and ``reactions`` list the ``top`` posters and reactions (all when
+    ``top`` is 0); time buckets list message counts per period, oldest first.
+    """
+    rows: list[dict[str, Any]] = []
+    limit = top if top and top > 0 else None
+    for name in aggregates:
+        if name == "count":
+            rows.append({"metric": "scanned", "key": "", "count": scanned})
+            rows.append({"metric": "matched", "key": "", "count": len(messages)})
+        elif name == "users":
+            counts = Counter(m.get("user") or m.get("bot_id") or "unknown" for m in messages)
+            rows.extend({"metric": "user", "key": k, "count": n} for k, n in counts.most_common(limit))
+        elif name == "reactions":
+            counts: Counter = Counter()
+            for m in messages:
+                for r in m.get("reactions", []):
+                    counts[r.get("name", "")] += r.get("count", 0)
+            rows.extend({"metric": "reaction", "key": k, "count": n} for k, n in counts.most_common(limit))
+        else:
+            counts = Counter(bucket_start(m["ts"], name) for m in messages if m.get("ts"))
+            rows.extend({"metric": name, "key": k, "count": counts[k]} for k in sorted(counts))
+    return rows
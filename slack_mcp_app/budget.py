@@ -0,0 +1,232 @@
+"""
+Slack Tool Response Budgets
+Cap the size of tool responses; the rest of an oversized response is kept in
+a short-lived result cache and served part by part with ``continue_result``.
+"""
+
+import functools
+import inspect
+import json
+import os
+import secrets
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from .cache import TTLCache
+
+# Environment variable names
+RESPONSE_BUDGET_ENV = "SLACK_RESPONSE_BUDGET"
+RESPONSE_BUDGETS_ENV = "SLACK_RESPONSE_BUDGETS"
+RESPONSE_TTL_ENV = "SLACK_RESPONSE_TTL"
+RESPONSE_MAX_ENTRIES_ENV = "SLACK_RESPONSE_MAX_ENTRIES"
+
+DEFAULT_BUDGET = 64_000
+DEFAULT_TTL = 600.0
+DEFAULT_MAX_ENTRIES = 256
+# Budgets ending in ``t`` are in tokens, estimated at this many UTF-8 bytes each
+BYTES_PER_TOKEN = 4
+# Room kept in every part for the continuation footer
+FOOTER_RESERVE = 200
+MIN_PART_BYTES = 256
+
+# Tools whose output is never cut
+EXEMPT_TOOLS = {"continue_result"}
+
+
+def parse_budget(value: str) -> int:
+    """Parse ``"65536"`` (bytes) or ``"16000t"`` (tokens) into bytes; 0 means unlimited."""
+    value = value.strip().lower()
+    if value.endswith("t"):
+        return int(value[:-1]) * BYTES_PER_TOKEN
+    return int(value or 0)
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _split_line(line: str, limit: int) -> list[str]:
+    """Cut one over-long line into pieces of at most ``limit`` bytes."""
+    encoded = line.encode("utf-8")
+    pieces = []
+    while encoded:
+        piece = encoded[:limit].decode("utf-8", errors="ignore")
+        pieces.append(piece)
+        encoded = encoded[len(piece.encode("utf-8")):]
+    return pieces
+
+
+def _pack(items: list[str], limit: int, size: Callable[[str], int] = _size, base: int = 0) -> list[list[str]]:
+    """Group ``items`` greedily so each group's total size stays within ``limit``."""
+    groups: list[list[str]] = [[]]
+    used = base
+    for item in items:
+        item_size = size(item)
+        if groups[-1] and used + item_size > limit:
+            groups.append([])
+            used = base
+        groups[-1].append(item)
+        used += item_size
+    return groups
+
+
+def split_text(text: str, limit: int) -> list[str]:
+    lines: list[str] = []
+    for line in text.split("\n"):
+        lines.extend(_split_line(line, limit) if _size(line) > limit else [line])
+    return ["\n".join(group) for group in _pack(lines, limit, lambda line: _size(line) + 1)]
+
+
+def split_tsv(text: str, limit: int) -> list[str]:
+    """Split TSV rows into parts that each start with the header row."""
+    header, _, body = text.partition("\n")
+    rows = [piece for row in body.split("\n") for piece in (_split_line(row, limit) if _size(row) > limit else [row])]
+    groups = _pack(rows, limit, lambda row: _size(row) + 1, base=_size(header))
+    return ["\n".join([header, *group]) for group in groups]
+
+
+def split_json(text: str, limit: int) -> Optional[list[dict[str, Any]]]:
+    """Split an ``{"items": [...]}`` document into such documents, or ``None`` if it has another shape."""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+        return None
+    items = payload.pop("items")
+    encoded = [json.dumps(item, separators=(",", ":"), ensure_ascii=False) for item in items]
+    groups = _pack(list(range(len(items))), limit, lambda i: _size(encoded[i]) + 1, base=_size(json.dumps(payload)) + 12)
+    parts = [{"items": [items[i] for i in group]} for group in groups]
+    # ``next_cursor`` and similar keys describe the end of the listing
+    parts[-1].update(payload)
+    return parts
+
+
+@dataclass
+class _Stored:
+    owner: str
+    tool: str
+    parts: list[str]
+
+
+class ResponseBudget:
+    """Bound tool responses to a byte budget.
+
+    Responses over a tool's budget are split on line, row or item boundaries
+    (``tsv`` parts repeat the header row and ``json`` parts are complete
+    ``{"items": [...]}`` documents). The first part is returned with a
+    continuation token; the others are kept for ``ttl`` seconds and served
+    by :meth:`resume`, only to the workspace (``owner``) that made the call.
+    """
+
+    def __init__(
+        self,
+        budget: int = DEFAULT_BUDGET,
+        overrides: Optional[dict[str, int]] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.budget = budget
+        self.overrides = overrides or {}
+        self._results = TTLCache(max_entries, ttl)
+        self._counters = {"truncated": 0, "continued": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseBudget"]:
+        """Build the budget, or ``None`` when no tool has one.
+
+        ``SLACK_RESPONSE_BUDGETS`` overrides the default per tool, e.g.
+        ``list_emojis=16000,get_conversation_history=8000t``.
+        """
+        overrides = {}
+        for entry in os.getenv(RESPONSE_BUDGETS_ENV, "").split(","):
+            if "=" in entry:
+                tool, value = entry.split("=", 1)
+                overrides[tool.strip()] = parse_budget(value)
+        budget = parse_budget(os.getenv(RESPONSE_BUDGET_ENV, str(DEFAULT_BUDGET)))
+        if not budget and not any(overrides.values()):
+            return None
+        return cls(
+            budget,
+            overrides,
+            ttl=float(os.getenv(RESPONSE_TTL_ENV, DEFAULT_TTL)),
+            max_entries=int(os.getenv(RESPONSE_MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES)),
+        )
+
+    def limit(self, tool: str) -> int:
+        if tool in EXEMPT_TOOLS:
+            return 0
+        return self.overrides.get(tool, self.budget)
+
+    def wrap(
+        self, tool: str, func: Callable[..., Awaitable[str]], owner: Callable[[Any], str]
+    ) -> Callable[..., Awaitable[str]]:
+        """Apply the budget of ``tool`` to ``func``; ``owner(ctx)`` names the caller's workspace."""
+        default_format = inspect.signature(func).parameters.get("output_format")
+        default_format = default_format.default if default_format is not None else "text"
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> str:
+            result = await func(*args, **kwargs)
+            limit = self.limit(tool)
+            if not limit or not isinstance(result, str) or _size(result) <= limit:
+                return result
+            output_format = kwargs.get("output_format") or default_format
+            return self.truncate(tool, result, output_format, limit, owner(kwargs.get("ctx")))
+
+        return wrapper
+
+    def truncate(self, tool: str, result: str, output_format: str, limit: int, owner: str) -> str:
+        """Keep the parts after the first of ``result`` and return the first."""
+        part_limit = max(limit - FOOTER_RESERVE, MIN_PART_BYTES)
+        token = secrets.token_urlsafe(12)
+        documents = split_json(result, part_limit) if output_format == "json" else None
+        if documents is not None:
+            parts = [
+                json.dumps(
+                    {**doc, "continuation": f"{token}.{i + 1}"} if i + 1 < len(documents) else doc,
+                    separators=(",", ":"),
+                    ensure_ascii=False,
+                )
+                for i, doc in enumerate(documents)
+            ]
+        else:
+            chunks = split_tsv(result, part_limit) if output_format == "tsv" else split_text(result, part_limit)
+            parts = [
+                chunk + self._footer(output_format, f"{token}.{i + 1}", i + 1, len(chunks), limit)
+                if i + 1 < len(chunks)
+                else chunk
+                for i, chunk in enumerate(chunks)
+            ]
+        if len(parts) == 1:
+            return parts[0]
+        self._results.set(token, _Stored(owner, tool, parts))
+        self._counters["truncated"] += 1
+        return parts[0]
+
+    @staticmethod
+    def _footer(output_format: str, continuation: str, part: int, parts: int, limit: int) -> str:
+        if output_format == "tsv":
+            return f"\n#continuation\t{continuation}"
+        return (
+            f"\n... [part {part}/{parts}, cut at {limit} bytes] "
+            f'Call continue_result(token="{continuation}") for the rest.'
+        )
+
+    def resume(self, continuation: str, owner: str) -> Optional[str]:
+        """Return the part named by a continuation token, or ``None`` if unknown or expired."""
+        token, _, index = continuation.rpartition(".")
+        stored = self._results.get(token)
+        if stored is None or stored.owner != owner or not index.isdigit() or not 0 < int(index) < len(stored.parts):
+            self._counters["misses"] += 1
+            return None
+        self._counters["continued"] += 1
+        return stored.parts[int(index)]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "overrides": self.overrides,
+            "stored": len(self._results),
+            **self._counters,
+        }
@@ -0,0 +1,407 @@
+"""
+Slack Directory Cache
+In-process TTL/LRU caches for workspace users, channels and metadata,
+optionally shared between replicas through a state backend.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from .pagination import PageResult
+from .state import StateBackend
+
+# Environment variable names
+CACHE_USER_TTL_ENV = "SLACK_CACHE_USER_TTL"
+CACHE_CHANNEL_TTL_ENV = "SLACK_CACHE_CHANNEL_TTL"
+CACHE_MAX_ENTRIES_ENV = "SLACK_CACHE_MAX_ENTRIES"
+CACHE_LOCAL_TTL_ENV = "SLACK_CACHE_LOCAL_TTL"
+METADATA_TTL_ENV = "SLACK_METADATA_TTL"
+METADATA_MAX_STALE_ENV = "SLACK_METADATA_MAX_STALE"
+
+DEFAULT_USER_TTL = 300.0
+DEFAULT_CHANNEL_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 50_000
+# With a shared backend, seconds entries are also kept in-process
+DEFAULT_LOCAL_TTL = 5.0
+# Full listings are large and change more often than single records
+LISTING_TTL_FACTOR = 0.2
+LISTING_MAX_ENTRIES = 64
+# Workspace metadata (team info, emoji) changes rarely: refresh it in the
+# background after an hour, and stop serving it after a week without refresh
+DEFAULT_METADATA_TTL = 3600.0
+DEFAULT_METADATA_MAX_STALE = 7 * 24 * 3600.0
+# Rendered outputs memoized per metadata entry (output format/fields variants)
+METADATA_MAX_RENDERS = 16
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A bounded mapping whose entries expire after ``ttl`` seconds.
+
+    Entries are kept in least-recently-used order; inserting beyond
+    ``maxsize`` evicts the oldest entry. Hit, miss and eviction counters are
+    kept for sizing.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._data.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def keys(self) -> list[Hashable]:
+        return list(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MetadataEntry:
+    """A cached metadata value plus the tool outputs rendered from it."""
+
+    __slots__ = ("value", "fetched_at", "renders")
+
+    def __init__(self, value: Any, fetched_at: float) -> None:
+        self.value = value
+        self.fetched_at = fetched_at
+        self.renders: dict[Hashable, str] = {}
+
+
+class MetadataCache:
+    """Stale-while-revalidate cache for rarely changing workspace metadata.
+
+    Values younger than ``ttl`` are served as is. Older values are still
+    served immediately while a single background task refetches them; only
+    values past ``max_stale`` (or missing) make the caller wait. Tool output
+    rendered from an entry is memoized on it, so repeated calls return a
+    prebuilt string until the next refresh.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_METADATA_TTL,
+        max_stale: float = DEFAULT_METADATA_MAX_STALE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self._clock = clock
+        self._entries: dict[Hashable, MetadataEntry] = {}
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> MetadataEntry:
+        """Return the entry for ``key``, calling ``fetch`` to (re)load it."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.fetched_at
+            if age < self.ttl:
+                self._counters["hits"] += 1
+                return entry
+            if age < self.max_stale:
+                self._counters["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._start_refresh(key, fetch)
+                return entry
+        self._counters["misses"] += 1
+        task = self._refreshing.get(key) or self._start_refresh(key, fetch)
+        return await asyncio.shield(task)
+
+    def _start_refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def refresh() -> MetadataEntry:
+            try:
+                value = await fetch()
+                entry = self._entries[key] = MetadataEntry(value, self._clock())
+                self._counters["refreshes"] += 1
+                return entry
+            finally:
+                self._refreshing.pop(key, None)
+
+        task = self._refreshing[key] = asyncio.ensure_future(refresh())
+        task.add_done_callback(self._refresh_done)
+        return task
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        # A failed background refresh keeps the stale value; the next call retries
+        if not task.cancelled() and task.exception() is not None:
+            self._counters["refresh_errors"] += 1
+
+    def render(self, entry: MetadataEntry, variant: Hashable, build: Callable[[], str]) -> str:
+        """Return the output ``build`` renders for ``variant``, built once per entry."""
+        output = entry.renders.get(variant)
+        if output is None:
+            if len(entry.renders) >= METADATA_MAX_RENDERS:
+                entry.renders.clear()
+            output = entry.renders[variant] = build()
+        return output
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop ``key`` (or every entry) so the next call refetches it."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {"size": len(self._entries), "ttl": self.ttl, "refreshing": len(self._refreshing), **self._counters}
+
+
+class DirectoryCache:
+    """User and channel records keyed by ID with name/email secondary indexes.
+
+    Secondary indexes map to IDs only, so a record is stored once and an
+    index lookup that points at an expired record counts as a miss.
+
+    With a shared state ``backend`` (e.g. Redis) entries are written through
+    to it and local misses are looked up there, so replicas share lookups.
+    The in-process layer then keeps entries for at most ``local_ttl`` seconds
+    to bound staleness after another replica invalidates them.
+    """
+
+    def __init__(
+        self,
+        user_ttl: float = DEFAULT_USER_TTL,
+        channel_ttl: float = DEFAULT_CHANNEL_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        backend: Optional[StateBackend] = None,
+        namespace: str = "default",
+        local_ttl: float = DEFAULT_LOCAL_TTL,
+        metadata_ttl: float = DEFAULT_METADATA_TTL,
+        metadata_max_stale: float = DEFAULT_METADATA_MAX_STALE,
+    ) -> None:
+        self.backend = backend if backend is not None and backend.shared else None
+        self.namespace = namespace
+        self.user_ttl = user_ttl
+        self.channel_ttl = channel_ttl
+        self.listing_ttl = min(user_ttl, channel_ttl) * LISTING_TTL_FACTOR
+        local = (lambda ttl: min(ttl, local_ttl)) if self.backend else (lambda ttl: ttl)
+        self.users = TTLCache(max_entries, local(user_ttl))
+        self.user_index = TTLCache(max_entries * 2, local(user_ttl))
+        self.channels = TTLCache(max_entries, local(channel_ttl))
+        self.channel_index = TTLCache(max_entries, local(channel_ttl))
+        self.listings = TTLCache(LISTING_MAX_ENTRIES, local(self.listing_ttl))
+        # Kept in-process only: a stale value is served at once either way
+        self.metadata = MetadataCache(metadata_ttl, metadata_max_stale)
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @classmethod
+    def from_env(cls, backend: Optional[StateBackend] = None, namespace: str = "default") -> "DirectoryCache":
+        """Build a cache sized from ``SLACK_CACHE_*`` environment variables."""
+        return cls(
+            user_ttl=float(os.getenv(CACHE_USER_TTL_ENV, DEFAULT_USER_TTL)),
+            channel_ttl=float(os.getenv(CACHE_CHANNEL_TTL_ENV, DEFAULT_CHANNEL_TTL)),
+            max_entries=int(os.getenv(CACHE_MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES)),
+            backend=backend,
+            namespace=namespace,
+            local_ttl=float(os.getenv(CACHE_LOCAL_TTL_ENV, DEFAULT_LOCAL_TTL)),
+            metadata_ttl=float(os.getenv(METADATA_TTL_ENV, DEFAULT_METADATA_TTL)),
+            metadata_max_stale=float(os.getenv(METADATA_MAX_STALE_ENV, DEFAULT_METADATA_MAX_STALE)),
+        )
+
+    # -- shared backend ------------------------------------------------------
+
+    def _key(self, kind: str, key: Any) -> str:
+        return f"dir:{self.namespace}:{kind}:{key}"
+
+    async def _lookup(self, local: TTLCache, kind: str, key: Hashable, remote_key: Any = None) -> Any:
+        """Read ``key`` locally, then from the shared backend on a miss."""
+        value = local.get(key)
+        if value is not None or self.backend is None:
+            return value
+        raw = await self.backend.get(self._key(kind, key if remote_key is None else remote_key))
+        if raw is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        value = json.loads(raw)
+        local.set(key, value)
+        return value
+
+    async def _publish(self, entries: dict[str, Any], ttl: float) -> None:
+        if self.backend is not None and entries:
+            await self.backend.set_many(
+                {key: json.dumps(value, separators=(",", ":")) for key, value in entries.items()}, ttl
+            )
+
+    # -- users ---------------------------------------------------------------
+
+    async def get_user(self, user_id: str) -> Optional[dict[str, Any]]:
+        return await self._lookup(self.users, "user", user_id)
+
+    async def get_user_by_email(self, email: str) -> Optional[dict[str, Any]]:
+        email = email.lower()
+        user_id = await self._lookup(self.user_index, "user_email", ("email", email), email)
+        return await self.get_user(user_id) if user_id else None
+
+    async def get_user_by_name(self, name: str) -> Optional[dict[str, Any]]:
+        user_id = await self._lookup(self.user_index, "user_name", ("name", name), name)
+        return await self.get_user(user_id) if user_id else None
+
+    def _cache_user(self, user: dict[str, Any], remote: dict[str, Any]) -> None:
+        user_id = user.get("id")
+        if not user_id:
+            return
+        self.users.set(user_id, user)
+        remote[self._key("user", user_id)] = user
+        if user.get("name"):
+            self.user_index.set(("name", user["name"]), user_id)
+            remote[self._key("user_name", user["name"])] = user_id
+        email = (user.get("profile") or {}).get("email")
+        if email:
+            self.user_index.set(("email", email.lower()), user_id)
+            remote[self._key("user_email", email.lower())] = user_id
+
+    async def put_user(self, user: dict[str, Any]) -> None:
+        await self.put_users([user])
+
+    async def put_users(self, users: list[dict[str, Any]]) -> None:
+        remote: dict[str, Any] = {}
+        for user in users:
+            self._cache_user(user, remote)
+        await self._publish(remote, self.user_ttl)
+
+    async def invalidate_user(self, user_id: str) -> None:
+        self.users.pop(user_id)
+        if self.backend is not None:
+            await self.backend.delete(self._key("user", user_id))
+        await self.invalidate_listings("users")
+
+    # -- channels ------------------------------------------------------------
+
+    async def get_channel(self, channel_id: str) -> Optional[dict[str, Any]]:
+        return await self._lookup(self.channels, "channel", channel_id)
+
+    async def get_channel_by_name(self, name: str) -> Optional[dict[str, Any]]:
+        name = name.lstrip("#")
+        channel_id = await self._lookup(self.channel_index, "channel_name", name)
+        return await self.get_channel(channel_id) if channel_id else None
+
+    def _cache_channel(self, channel: dict[str, Any], remote: dict[str, Any]) -> None:
+        channel_id = channel.get("id")
+        if not channel_id:
+            return
+        self.channels.set(channel_id, channel)
+        remote[self._key("channel", channel_id)] = channel
+        if channel.get("name"):
+            self.channel_index.set(channel["name"], channel_id)
+            remote[self._key("channel_name", channel["name"])] = channel_id
+
+    async def put_channel(self, channel: dict[str, Any]) -> None:
+        await self.put_channels([channel])
+
+    async def put_channels(self, channels: list[dict[str, Any]]) -> None:
+        remote: dict[str, Any] = {}
+        for channel in channels:
+            self._cache_channel(channel, remote)
+        await self._publish(remote, self.channel_ttl)
+
+    async def invalidate_channel(self, channel_id: str) -> None:
+        """Drop a channel record and every cached channel listing."""
+        channel = self.channels.pop(channel_id)
+        if channel and channel.get("name"):
+            self.channel_index.pop(channel["name"])
+        if self.backend is not None:
+            keys = [self._key("channel", channel_id)]
+            if channel and channel.get("name"):
+                keys.append(self._key("channel_name", channel["name"]))
+            await self.backend.delete(*keys)
+        await self.invalidate_listings("channels")
+
+    # -- listings ------------------------------------------------------------
+
+    def _listing_key(self, kind: str, key: tuple) -> str:
+        return self._key(f"listing:{kind}", json.dumps(key, separators=(",", ":")))
+
+    async def get_listing(self, kind: str, *key: Hashable) -> Optional[PageResult]:
+        value = await self._lookup(
+            self.listings, f"listing:{kind}", (kind, *key), json.dumps(key, separators=(",", ":"))
+        )
+        if isinstance(value, dict):
+            # Entries read from the shared backend arrive as plain JSON
+            value = PageResult(**value)
+            self.listings.set((kind, *key), value)
+        return value
+
+    async def put_listing(self, kind: str, *key: Hashable, value: PageResult) -> None:
+        self.listings.set((kind, *key), value)
+        await self._publish({self._listing_key(kind, key): asdict(value)}, self.listing_ttl)
+
+    async def invalidate_listings(self, kind: str) -> None:
+        for cache_key in [k for k in self.listings.keys() if k[0] == kind]:
+            self.listings.pop(cache_key)
+        if self.backend is not None:
+            await self.backend.delete_pattern(self._key(f"listing:{kind}", "*"))
+
+    def clear(self) -> None:
+        for cache in (self.users, self.user_index, self.channels, self.channel_index, self.listings):
+            cache.clear()
+        self.metadata.invalidate()
+
+    def stats(self) -> dict[str, Any]:
+        stats = {
+            "users": self.users.stats(),
+            "user_index": self.user_index.stats(),
+            "channels": self.channels.stats(),
+            "channel_index": self.channel_index.stats(),
+            "listings": self.listings.stats(),
+            "metadata": self.metadata.stats(),
+        }
+        if self.backend is not None:
+            stats["shared"] = {"hits": self.shared_hits, "misses": self.shared_misses}
+        return stats
@@ -0,0 +1,124 @@
+"""
+Slack Client
+AsyncWebClient subclass that routes every Web API call through the shared
+request pipeline (connection pool, request coalescing, retries and circuit
+breaking, rate limit scheduling).
+"""
+
+from typing import Any, Optional, Union
+
+from aiohttp import ClientSession, FormData
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from .coalesce import SingleFlight, request_key
+from .http_pool import ConnectionPool
+from .metrics import Metrics
+from .ratelimit import RateLimitScheduler
+from .resilience import Resilience
+
+
+def _channel_of(*payloads: Optional[Union[dict, FormData]]) -> Optional[str]:
+    """Return the ``channel`` argument of a request, if any."""
+    for payload in payloads:
+        if isinstance(payload, dict) and payload.get("channel"):
+            return str(payload["channel"])
+    return None
+
+
+class SlackClient(AsyncWebClient):
+    """``AsyncWebClient`` whose calls are queued by a :class:`RateLimitScheduler`.
+
+    All generated SDK methods (``chat_postMessage``, ``users_info``...) funnel
+    into :meth:`api_call`, so tools keep using the regular SDK surface. When a
+    :class:`ConnectionPool` is given, requests always use its live session.
+    With a :class:`SingleFlight` group, identical concurrent read calls (same
+    method, arguments and token) are sent once and share the response.
+    A :class:`Resilience` layer retries transient failures, fails fast while
+    a method's circuit breaker is open and hedges slow reads; each of its
+    attempts is queued by the scheduler. Each HTTP request is timed by
+    :class:`Metrics` when one is given.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        scheduler: Optional[RateLimitScheduler] = None,
+        pool: Optional[ConnectionPool] = None,
+        single_flight: Optional[SingleFlight] = None,
+        metrics: Optional[Metrics] = None,
+        resilience: Optional[Resilience] = None,
+        scope: str = "default",
+        **kwargs: Any,
+    ) -> None:
+        self.pool = pool
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+        self.single_flight = single_flight
+        self.metrics = metrics
+        self.resilience = resilience
+        self.scope = scope
+
+    @property
+    def session(self) -> Optional[ClientSession]:  # type: ignore[override]
+        if self.pool is not None:
+            return self.pool.session
+        return self._session
+
+    @session.setter
+    def session(self, value: Optional[ClientSession]) -> None:
+        self._session = value
+
+    async def api_call(  # type: ignore[override]
+        self,
+        api_method: str,
+        *,
+        http_verb: str = "POST",
+        files: Optional[dict] = None,
+        data: Optional[Union[dict, FormData]] = None,
+        params: Optional[dict] = None,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        auth: Optional[dict] = None,
+    ) -> AsyncSlackResponse:
+        def request():
+            return super(SlackClient, self).api_call(
+                api_method,
+                http_verb=http_verb,
+                files=files,
+                data=data,
+                params=params,
+                json=json,
+                headers=headers,
+                auth=auth,
+            )
+
+        def call():
+            if self.metrics is None:
+                return request()
+            return self.metrics.observe_slack(api_method, request)
+
+        def scheduled():
+            if self.scheduler is None:
+                return call()
+            return self.scheduler.run(
+                api_method,
+                call,
+                scope=self.scope,
+                channel=_channel_of(params, json, data),
+            )
+
+        def resilient():
+            if self.resilience is None:
+                return scheduled()
+            # Streamed upload bodies can only be sent once
+            return self.resilience.run(
+                api_method, scheduled, retry=not files and not isinstance(data, FormData)
+            )
+
+        if self.single_flight is None or files:
+            return await resilient()
+        key = request_key(api_method, self.token, http_verb, data, params, json, auth)
+        if key is None:
+            return await resilient()
+        return await self.single_flight.do(key, resilient)
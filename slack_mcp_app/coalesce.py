@@ -0,0 +1,92 @@
+"""
+Slack Request Coalescing
+Single-flight layer that lets concurrent identical read calls share one request.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Environment variable names
+COALESCE_ENABLED_ENV = "SLACK_COALESCE_ENABLED"
+
+# Last segment of read-only Slack API methods (``users.info``,
+# ``conversations.history``, ``users.profile.get``...). Writes are never
+# coalesced: two identical posts must still produce two messages.
+READ_ACTIONS = {
+    "get",
+    "history",
+    "info",
+    "list",
+    "lookupByEmail",
+    "members",
+    "replies",
+    "test",
+}
+READ_PREFIXES = ("search.",)
+
+
+def is_read_method(api_method: str) -> bool:
+    """Return whether ``api_method`` is a side-effect free read."""
+    return (
+        api_method.rsplit(".", 1)[-1] in READ_ACTIONS
+        or api_method.startswith(READ_PREFIXES)
+    )
+
+
+def request_key(api_method: str, token: Optional[str], *payloads: Any) -> Optional[Hashable]:
+    """Build the coalescing key of a request, or ``None`` if it can't be shared.
+
+    Requests are identical when they hit the same method with the same token
+    and arguments. Payloads that are not plain JSON (uploads, form data) are
+    never coalesced.
+    """
+    if not is_read_method(api_method):
+        return None
+    try:
+        args = json.dumps(payloads, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return (token, api_method, args)
+
+
+class SingleFlight:
+    """Deduplicate identical in-flight calls.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same result (or exception). The call runs as its
+    own task, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._counters = {"calls": 0, "coalesced": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["SingleFlight"]:
+        """Build a single-flight group, or ``None`` when ``SLACK_COALESCE_ENABLED`` is false."""
+        if os.getenv(COALESCE_ENABLED_ENV, "true").lower() in ("0", "false", "no"):
+            return None
+        return cls()
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        self._counters["calls"] += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self._counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        calls = self._counters["calls"]
+        return {
+            "in_flight": len(self._in_flight),
+            "coalesce_rate": round(self._counters["coalesced"] / calls, 4) if calls else 0.0,
+            **self._counters,
+        }
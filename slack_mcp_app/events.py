@@ -0,0 +1,280 @@
+"""
+Slack Event Ingestion
+Apply Events API and Socket Mode events to the directory cache, metadata
+cache and message store as they happen, so reads stay fresh without polling.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Mapping, Optional
+
+from .cache import TTLCache
+
+if TYPE_CHECKING:
+    from .tenants import Tenant, TenantRegistry
+
+logger = logging.getLogger(__name__)
+
+# Environment variable names
+SLACK_SIGNING_SECRET_ENV = "SLACK_SIGNING_SECRET"
+SLACK_APP_TOKEN_ENV = "SLACK_APP_TOKEN"
+EVENTS_ENABLED_ENV = "SLACK_EVENTS_ENABLED"
+
+EVENTS_PATH = "/slack/events"
+# Signed requests older than this are refused as possible replays
+MAX_REQUEST_AGE = 300.0
+# Slack retries undelivered events for a few minutes; remember ids that long
+DEDUPE_TTL = 600.0
+DEDUPE_MAX_ENTRIES = 10_000
+
+# Events that change a channel record or channel listings
+CHANNEL_EVENTS = {
+    "channel_rename", "channel_archive", "channel_unarchive", "channel_created",
+    "channel_deleted", "group_rename", "group_archive", "group_unarchive", "group_deleted",
+}
+# Events that change team info, and the metadata cache key they invalidate
+METADATA_EVENTS = {"emoji_changed": "emoji", "team_rename": "team", "team_domain_change": "team"}
+
+
+def signature(secret: str, timestamp: str, body: bytes) -> str:
+    """Return the ``X-Slack-Signature`` value of a request body."""
+    base = b"v0:" + timestamp.encode() + b":" + body
+    return "v0=" + hmac.new(secret.encode(), base, hashlib.sha256).hexdigest()
+
+
+class EventIngestor:
+    """Keep local caches current from Slack events.
+
+    Events arrive either over HTTP (the Events API, verified with the app's
+    signing secret) or over a Socket Mode connection opened with an app-level
+    token; both are routed to the tenant whose workspace sent them. User,
+    channel and team changes update or invalidate the tenant's directory and
+    metadata caches. Messages, edits, deletions and reactions are written to
+    the message store for channels it already mirrors; the store's sync
+    cursor is left alone, so the next delta sync still catches anything
+    missed while events were not flowing.
+    """
+
+    def __init__(
+        self,
+        tenants: "TenantRegistry",
+        *,
+        signing_secret: Optional[str] = None,
+        app_token: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.tenants = tenants
+        self.signing_secret = signing_secret
+        self.app_token = app_token
+        self._clock = clock
+        self._seen = TTLCache(DEDUPE_MAX_ENTRIES, DEDUPE_TTL)
+        # team_id -> tenant id, learned from auth.test
+        self._teams: dict[str, str] = {}
+        self._teams_lock = asyncio.Lock()
+        self._socket: Any = None
+        self._counters: Counter = Counter()
+        self._handlers: dict[str, Callable[["Tenant", dict[str, Any]], Awaitable[None]]] = {
+            "message": self._on_message,
+            "user_change": self._on_user,
+            "team_join": self._on_user,
+            "reaction_added": self._on_reaction,
+            "reaction_removed": self._on_reaction,
+            "channel_left": self._on_channel,
+            "member_joined_channel": self._on_channel,
+            **dict.fromkeys(CHANNEL_EVENTS, self._on_channel),
+            **dict.fromkeys(METADATA_EVENTS, self._on_metadata),
+        }
+
+    @classmethod
+    def from_env(cls, tenants: "TenantRegistry") -> Optional["EventIngestor"]:
+        """Build an ingestor when a signing secret or app token is configured.
+
+        ``SLACK_EVENTS_ENABLED=false`` turns ingestion off even then.
+        """
+        if os.getenv(EVENTS_ENABLED_ENV, "true").lower() in ("0", "false", "no"):
+            return None
+        secret = os.getenv(SLACK_SIGNING_SECRET_ENV) or None
+        app_token = os.getenv(SLACK_APP_TOKEN_ENV) or None
+        if not secret and not app_token:
+            return None
+        return cls(tenants, signing_secret=secret, app_token=app_token)
+
+    # -- transports ----------------------------------------------------------
+
+    def verify(self, headers: Mapping[str, str], body: bytes) -> bool:
+        """Check the signature and age of an Events API request."""
+        if not self.signing_secret:
+            return False
+        timestamp = headers.get("x-slack-request-timestamp", "")
+        try:
+            age = abs(self._clock() - int(timestamp))
+        except ValueError:
+            return False
+        if age > MAX_REQUEST_AGE:
+            return False
+        expected = signature(self.signing_secret, timestamp, body)
+        return hmac.compare_digest(expected, headers.get("x-slack-signature", ""))
+
+    async def start(self) -> None:
+        """Open the Socket Mode connection once, if an app token is configured."""
+        if not self.app_token or self._socket is not None:
+            return
+        from slack_sdk.socket_mode.aiohttp import SocketModeClient
+        from slack_sdk.socket_mode.response import SocketModeResponse
+
+        async def listener(client: SocketModeClient, request: Any) -> None:
+            await client.send_socket_mode_response(SocketModeResponse(envelope_id=request.envelope_id))
+            if request.type == "events_api":
+                await self.handle(request.payload)
+
+        self._socket = SocketModeClient(app_token=self.app_token)
+        self._socket.socket_mode_request_listeners.append(listener)
+        await self._socket.connect()
+
+    async def stop(self) -> None:
+        if self._socket is not None:
+            await self._socket.close()
+            self._socket = None
+
+    # -- dispatch ------------------------------------------------------------
+
+    async def handle(self, payload: dict[str, Any]) -> None:
+        """Apply an ``event_callback`` envelope, once per ``event_id``."""
+        event = payload.get("event") or {}
+        event_id = payload.get("event_id")
+        if event_id:
+            if self._seen.get(event_id):
+                self._counters["duplicates"] += 1
+                return
+            self._seen.set(event_id, True)
+        handler = self._handlers.get(event.get("type", ""))
+        if handler is None:
+            self._counters["ignored"] += 1
+            return
+        team_id = payload.get("team_id") or event.get("team") or ""
+        tenant = await self._tenant_for(team_id)
+        if tenant is None:
+            self._counters["unknown_team"] += 1
+            return
+        try:
+            await handler(tenant, event)
+        except Exception:
+            # A failed event only costs freshness; the next sync or TTL expiry repairs it
+            logger.exception("Failed to apply Slack event %s", event.get("type"))
+            self._counters["errors"] += 1
+            return
+        self._counters[event["type"]] += 1
+
+    async def _tenant_for(self, team_id: str) -> Optional["Tenant"]:
+        if len(self.tenants.tokens) == 1:
+            return self.tenants.get(next(iter(self.tenants.tokens)))
+        if team_id not in self._teams:
+            async with self._teams_lock:
+                for tenant_id in self.tenants.tokens:
+                    if team_id in self._teams:
+                        break
+                    if tenant_id in self._teams.values():
+                        continue
+                    try:
+                        resp = await self.tenants.get(tenant_id).slack_bot.auth_test()
+                    except Exception:
+                        logger.warning("auth.test failed for tenant %s", tenant_id)
+                        continue
+                    self._teams[resp.get("team_id", "")] = tenant_id
+        tenant_id = self._teams.get(team_id)
+        return self.tenants.get(tenant_id) if tenant_id else None
+
+    # -- handlers ------------------------------------------------------------
+
+    async def _on_user(self, tenant: "Tenant", event: dict[str, Any]) -> None:
+        if tenant.directory and event.get("user", {}).get("id"):
+            await tenant.directory.put_user(event["user"])
+            await tenant.directory.invalidate_listings("users")
+
+    async def _on_channel(self, tenant: "Tenant", event: dict[str, Any]) -> None:
+        channel = event.get("channel")
+        channel_id = channel.get("id") if isinstance(channel, dict) else channel
+        if tenant.directory and channel_id:
+            await tenant.directory.invalidate_channel(channel_id)
+
+    async def _on_metadata(self, tenant: "Tenant", event: dict[str, Any]) -> None:
+        if tenant.directory:
+            tenant.directory.metadata.invalidate(METADATA_EVENTS[event["type"]])
+
+    async def _on_message(self, tenant: "Tenant", event: dict[str, Any]) -> None:
+        channel = event.get("channel", "")
+        store = tenant.store
+        if store is None or not store.enabled_for(channel):
+            return
+        subtype = event.get("subtype")
+        if subtype == "message_changed":
+            edited = event.get("message") or {}
+            if edited.get("ts"):
+                await store.apply(channel, edited["ts"], lambda old: {**old, **edited})
+        elif subtype == "message_deleted":
+            if event.get("deleted_ts"):
+                await store.apply(channel, event["deleted_ts"], lambda old: None)
+        elif event.get("ts") and not event.get("hidden"):
+            # The store mirrors channel history, where replies only appear when broadcast
+            thread_ts = event.get("thread_ts")
+            is_reply = bool(thread_ts) and thread_ts != event["ts"]
+            if not is_reply or subtype == "thread_broadcast":
+                message = {k: v for k, v in event.items() if k not in ("channel", "channel_type", "event_ts")}
+                await store.put(channel, message)
+            if is_reply:
+                await store.apply(channel, thread_ts, lambda parent: _count_reply(parent, event))
+
+    async def _on_reaction(self, tenant: "Tenant", event: dict[str, Any]) -> None:
+        item = event.get("item") or {}
+        store = tenant.store
+        if item.get("type") != "message" or store is None or not store.enabled_for(item.get("channel", "")):
+            return
+        added = event["type"] == "reaction_added"
+        await store.apply(
+            item["channel"],
+            item["ts"],
+            lambda message: _react(message, event.get("reaction", ""), event.get("user", ""), added),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "http": bool(self.signing_secret),
+            "socket_mode": self._socket is not None,
+            "teams": len(self._teams),
+            **self._counters,
+        }
+
+
+def _count_reply(parent: dict[str, Any], reply: dict[str, Any]) -> dict[str, Any]:
+    parent["reply_count"] = parent.get("reply_count", 0) + 1
+    parent["latest_reply"] = max(parent.get("latest_reply", "0"), reply["ts"], key=float)
+    if reply.get("user") and reply["user"] not in parent.setdefault("reply_users", []):
+        parent["reply_users"].append(reply["user"])
+    return parent
+
+
+def _react(message: dict[str, Any], name: str, user: str, added: bool) -> dict[str, Any]:
+    reactions = message.get("reactions", [])
+    reaction = next((r for r in reactions if r.get("name") == name), None)
+    if added:
+        if reaction is None:
+            reaction = {"name": name, "users": [], "count": 0}
+            reactions.append(reaction)
+        if user not in reaction["users"]:
+            reaction["users"].append(user)
+            reaction["count"] = reaction.get("count", 0) + 1
+    elif reaction is not None and user in reaction.get("users", []):
+        reaction["users"].remove(user)
+        reaction["count"] = max(reaction.get("count", 1) - 1, 0)
+        if not reaction["count"]:
+            reactions.remove(reaction)
+    if reactions:
+        message["reactions"] = reactions
+    else:
+        message.pop("reactions", None)
+    return message
@@ -0,0 +1,111 @@
+"""
+Slack Conversation Export
+Stream a channel's full history (optionally with thread replies) to NDJSON.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from mcp.server.fastmcp import Context
+
+from .pagination import paginate, report_progress
+
+# Environment variable names
+EXPORT_DIR_ENV = "SLACK_EXPORT_DIR"
+
+DEFAULT_EXPORT_DIR = "exports"
+# Progress notifications are sent at most once per this many messages
+PROGRESS_EVERY = 1000
+
+
+def resolve_export_path(output_path: str) -> Path:
+    """Resolve ``output_path`` inside ``SLACK_EXPORT_DIR``.
+
+    Raises ``ValueError`` if the path escapes the export directory.
+    """
+    base = Path(os.getenv(EXPORT_DIR_ENV, DEFAULT_EXPORT_DIR)).resolve()
+    target = (base / output_path).resolve()
+    if target != base and base not in target.parents:
+        raise ValueError(f"export path must be inside {base}")
+    return target
+
+
+async def iter_conversation(
+    slack,
+    channel: str,
+    *,
+    include_replies: bool = False,
+    oldest: Optional[str] = None,
+    latest: Optional[str] = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield a channel's history page by page, newest first.
+
+    With ``include_replies`` each page is followed by the replies of its
+    threaded messages (thread parents are not repeated).
+    """
+    kwargs: dict[str, Any] = {"channel": channel}
+    if oldest:
+        kwargs["oldest"] = oldest
+    if latest:
+        kwargs["latest"] = latest
+
+    async for page in paginate(
+        slack.conversations_history, "conversations.history", "messages", **kwargs
+    ):
+        yield page.items
+        if not include_replies:
+            continue
+        for parent in page.items:
+            if not parent.get("reply_count"):
+                continue
+            async for replies in paginate(
+                slack.conversations_replies,
+                "conversations.replies",
+                "messages",
+                channel=channel,
+                ts=parent["ts"],
+            ):
+                yield [m for m in replies.items if m.get("ts") != parent["ts"]]
+
+
+async def export_ndjson(
+    slack,
+    channel: str,
+    path: Path,
+    *,
+    include_replies: bool = False,
+    oldest: Optional[str] = None,
+    latest: Optional[str] = None,
+    ctx: Optional[Context] = None,
+) -> int:
+    """Write every message of ``channel`` to ``path`` as one JSON object per line.
+
+    Only one page is held in memory at a time. Returns the number of
+    messages written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    reported = 0
+    with path.open("w", encoding="utf-8") as fh:
+        async for batch in iter_conversation(
+            slack,
+            channel,
+            include_replies=include_replies,
+            oldest=oldest,
+            latest=latest,
+        ):
+            if not batch:
+                continue
+            chunk = "".join(
+                json.dumps(dict(m, channel=channel), separators=(",", ":")) + "\n"
+                for m in batch
+            )
+            await asyncio.to_thread(fh.write, chunk)
+            written += len(batch)
+            if written - reported >= PROGRESS_EVERY:
+                reported = written
+                await report_progress(ctx, written, None, f"{channel}: {written} messages exported")
+    return written
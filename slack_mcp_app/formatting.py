@@ -0,0 +1,88 @@
+"""
+Slack Tool Output Formatting
+Render tool results as human-readable text or compact TSV/JSON with field
+projection.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+OUTPUT_FORMATS = ("text", "tsv", "json")
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+Record = dict[str, Any]
+
+
+def parse_fields(fields: str, default: list[str]) -> list[str]:
+    """Split a comma separated field list, falling back to ``default``."""
+    selected = [f.strip() for f in (fields or "").split(",") if f.strip()]
+    return selected or default
+
+
+def project(record: Record, fields: list[str]) -> Record:
+    """Keep only ``fields`` of ``record`` (in that order), dropping empty values."""
+    return {f: record[f] for f in fields if record.get(f) not in (None, "")}
+
+
+def _tsv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def render(
+    records: Union[Record, list[Record]],
+    output_format: str,
+    fields: str,
+    default_fields: list[str],
+    text: Callable[[], str],
+    next_cursor: str = "",
+) -> str:
+    """Render ``records`` in the requested ``output_format``.
+
+    ``text`` builds the classic human-readable output and is only called for
+    the ``text`` format. A single record renders as a JSON object / one TSV
+    row; a list renders as ``{"items": [...]}`` / one row per record.
+    ``next_cursor`` is included when more results are available.
+    """
+    if output_format == "text":
+        return text()
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: unsupported output_format '{output_format}' (use one of {', '.join(OUTPUT_FORMATS)})"
+
+    selected = parse_fields(fields, default_fields)
+    single = isinstance(records, dict)
+    rows = [records] if single else records
+
+    if output_format == "json":
+        projected = [project(r, selected) for r in rows]
+        payload: Any = projected[0] if single else {"items": projected}
+        if next_cursor and not single:
+            payload["next_cursor"] = next_cursor
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+    lines = ["\t".join(selected)]
+    lines.extend("\t".join(_tsv_value(r.get(f)) for f in selected) for r in rows)
+    if next_cursor:
+        lines.append(f"#next_cursor\t{next_cursor}")
+    return "\n".join(lines)
+
+
+def render_status(
+    record: Record,
+    output_format: str,
+    fields: str,
+    text: str,
+    default_fields: Optional[list[str]] = None,
+) -> str:
+    """Render the result of a write action (``{"ok": True, ...}``)."""
+    return render(
+        record,
+        output_format,
+        fields,
+        default_fields or list(record),
+        lambda: text,
+    )
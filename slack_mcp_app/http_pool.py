@@ -0,0 +1,167 @@
+"""
+Slack HTTP Connection Pool
+A single keep-alive ``aiohttp`` session shared by every Slack client.
+"""
+
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    # Imported on first use: aiohttp is a large share of the server's import time
+    import aiohttp
+
+# Environment variable names
+HTTP_POOL_SIZE_ENV = "SLACK_HTTP_POOL_SIZE"
+HTTP_POOL_KEEPALIVE_ENV = "SLACK_HTTP_POOL_KEEPALIVE"
+HTTP_POOL_DNS_TTL_ENV = "SLACK_HTTP_POOL_DNS_TTL"
+HTTP_POOL_LINGER_ENV = "SLACK_HTTP_POOL_LINGER"
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_KEEPALIVE = 60.0
+DEFAULT_DNS_TTL = 300
+# Seconds the pool stays open after the last MCP session ends, so that
+# short-lived (stateless) sessions do not reconnect on every request.
+DEFAULT_LINGER = 30.0
+
+
+class ConnectionPool:
+    """Owns the ``aiohttp.ClientSession`` used for all Slack Web API calls.
+
+    MCP sessions ``acquire`` the pool when they start and ``release`` it when
+    they end; the underlying session is opened lazily and closed once no MCP
+    session has used it for ``linger`` seconds (or immediately on shutdown).
+    Connection reuse is tracked through ``aiohttp`` trace hooks.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        keepalive: float = DEFAULT_KEEPALIVE,
+        dns_ttl: int = DEFAULT_DNS_TTL,
+        linger: float = DEFAULT_LINGER,
+    ) -> None:
+        self.size = size
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.linger = linger
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._users = 0
+        self._close_task: Optional[asyncio.Task] = None
+        self._counters = {
+            "sessions_opened": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connections_queued": 0,
+            "requests": 0,
+            "request_errors": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "ConnectionPool":
+        """Build a pool tuned from ``SLACK_HTTP_POOL_*`` environment variables."""
+        return cls(
+            size=int(os.getenv(HTTP_POOL_SIZE_ENV, DEFAULT_POOL_SIZE)),
+            keepalive=float(os.getenv(HTTP_POOL_KEEPALIVE_ENV, DEFAULT_KEEPALIVE)),
+            dns_ttl=int(os.getenv(HTTP_POOL_DNS_TTL_ENV, DEFAULT_DNS_TTL)),
+            linger=float(os.getenv(HTTP_POOL_LINGER_ENV, DEFAULT_LINGER)),
+        )
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """The live session, opened on first use."""
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.size,
+                limit_per_host=self.size,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[self._trace_config()]
+            )
+            self._counters["sessions_opened"] += 1
+        return self._session
+
+    def _trace_config(self) -> "aiohttp.TraceConfig":
+        import aiohttp
+
+        def count(name: str):
+            async def hook(session, context, params) -> None:
+                self._counters[name] += 1
+
+            return hook
+
+        async def request_start(session, context, params) -> None:
+            self._counters["requests"] += 1
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+        async def request_done(session, context, params) -> None:
+            self._in_flight -= 1
+
+        async def request_failed(session, context, params) -> None:
+            self._in_flight -= 1
+            self._counters["request_errors"] += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(count("connections_created"))
+        trace.on_connection_reuseconn.append(count("connections_reused"))
+        trace.on_connection_queued_start.append(count("connections_queued"))
+        trace.on_dns_cache_hit.append(count("dns_cache_hits"))
+        trace.on_dns_cache_miss.append(count("dns_cache_misses"))
+        trace.on_request_start.append(request_start)
+        trace.on_request_end.append(request_done)
+        trace.on_request_exception.append(request_failed)
+        return trace
+
+    async def acquire(self) -> "aiohttp.ClientSession":
+        """Register an MCP session as a user of the pool."""
+        self._users += 1
+        if self._close_task is not None:
+            self._close_task.cancel()
+            self._close_task = None
+        return self.session
+
+    async def release(self) -> None:
+        """Drop a user; close the session after ``linger`` once unused."""
+        self._users = max(self._users - 1, 0)
+        if self._users:
+            return
+        if self.linger <= 0:
+            await self.close()
+        else:
+            self._close_task = asyncio.create_task(self._close_when_idle())
+
+    async def _close_when_idle(self) -> None:
+        try:
+            await asyncio.sleep(self.linger)
+        finally:
+            # Also runs when the task is cancelled on event loop shutdown
+            if self._users == 0:
+                await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> dict[str, Any]:
+        created = self._counters["connections_created"]
+        reused = self._counters["connections_reused"]
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "mcp_sessions": self._users,
+            "size": self.size,
+            "in_flight": self._in_flight,
+            "max_in_flight": self._max_in_flight,
+            "utilization": round(self._in_flight / self.size, 4) if self.size else 0.0,
+            "reuse_rate": round(reused / (created + reused), 4) if created + reused else 0.0,
+            **self._counters,
+        }
@@ -0,0 +1,381 @@
+"""
+Slack Write-Behind Jobs
+Durable on-disk queue that runs fire-and-forget Slack writes in background
+workers with retry, backoff and idempotency keys.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from slack_sdk.errors import SlackApiError
+
+# Environment variable names
+JOB_QUEUE_PATH_ENV = "SLACK_JOB_QUEUE_PATH"
+JOB_WORKERS_ENV = "SLACK_JOB_WORKERS"
+JOB_MAX_ATTEMPTS_ENV = "SLACK_JOB_MAX_ATTEMPTS"
+JOB_RETRY_BASE_ENV = "SLACK_JOB_RETRY_BASE"
+JOB_RETENTION_ENV = "SLACK_JOB_RETENTION"
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BASE = 1.0
+DEFAULT_RETENTION = 24 * 3600.0
+MAX_RETRY_DELAY = 300.0
+# Longest an idle worker sleeps before looking for due retries again
+POLL_INTERVAL = 5.0
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+# The write may or may not have reached Slack and is not repeated
+UNKNOWN = "unknown"
+
+# Slack errors worth retrying; anything else fails the job immediately
+TRANSIENT_ERRORS = {
+    "ratelimited", "internal_error", "fatal_error", "service_unavailable", "request_timeout", "circuit_open",
+}
+# Errors meaning the write already took effect (e.g. a retry after a lost response)
+SATISFIED_ERRORS = {"already_reacted", "already_pinned", "no_pin"}
+# Errors returned before Slack performed the write
+NOT_SENT_ERRORS = {"ratelimited", "circuit_open"}
+# Writes that can be repeated without a second side effect (or that report a
+# SATISFIED_ERRORS error); others, e.g. chat_postMessage, would post twice
+IDEMPOTENT_METHODS = {
+    "chat_delete", "chat_update", "conversations_setPurpose", "conversations_setTopic",
+    "pins_add", "pins_remove", "reactions_add", "reactions_remove",
+}
+# Methods whose success must drop the cached channel
+INVALIDATES_CHANNEL = {"conversations_setTopic", "conversations_setPurpose"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    action TEXT NOT NULL,
+    method TEXT NOT NULL,
+    args TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, not_before);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_idempotency
+    ON jobs (tenant, idempotency_key) WHERE idempotency_key != '';
+"""
+
+
+@dataclass
+class Job:
+    """A queued Slack write: ``method`` is an ``AsyncWebClient`` method name."""
+
+    id: str
+    tenant: str
+    action: str
+    method: str
+    args: dict[str, Any]
+    status: str = QUEUED
+    attempts: int = 0
+    idempotency_key: str = ""
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    result: Optional[dict[str, Any]] = field(default=None, repr=False)
+    error: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            tenant=row["tenant"],
+            action=row["action"],
+            method=row["method"],
+            args=json.loads(row["args"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            idempotency_key=row["idempotency_key"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+        )
+
+
+def classify(exc: BaseException) -> tuple[str, bool, float]:
+    """Return ``(error, retryable, retry_after)`` for a failed job attempt."""
+    if isinstance(exc, SlackApiError):
+        response = exc.response
+        error = response.get("error", "unknown error")
+        headers = getattr(response, "headers", None) or {}
+        retry_after = float(headers.get("Retry-After") or headers.get("retry-after") or 0)
+        status = getattr(response, "status_code", 200)
+        return error, status == 429 or status >= 500 or error in TRANSIENT_ERRORS, retry_after
+    import aiohttp
+
+    retryable = isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError, OSError))
+    return f"{type(exc).__name__}: {exc}", retryable, 0.0
+
+
+def not_sent(exc: BaseException) -> bool:
+    """Return whether a failed request provably never performed its write.
+
+    True for connection failures and for Slack (or the circuit breaker)
+    refusing the call up front; a timeout, reset or 5xx after the request
+    went out may still have taken effect.
+    """
+    if isinstance(exc, SlackApiError):
+        return exc.response.get("error") in NOT_SENT_ERRORS or getattr(exc.response, "status_code", 200) == 429
+    import aiohttp
+
+    return isinstance(exc, aiohttp.ClientConnectorError)
+
+
+def can_retry(method: str, exc: BaseException) -> bool:
+    """Return whether a write that failed with ``exc`` may be sent again."""
+    return method in IDEMPOTENT_METHODS or not_sent(exc)
+
+
+class JobQueue:
+    """SQLite-journalled queue of Slack writes executed by background workers.
+
+    Jobs are committed to disk before ``submit`` returns, so they survive a
+    restart. Transient failures are retried with jittered exponential
+    backoff, honouring ``Retry-After``, up to ``max_attempts`` - but a write
+    that is not idempotent (see ``IDEMPOTENT_METHODS``) is only sent again
+    when the failed attempt provably never reached Slack. When it might
+    have (a timeout after the request went out, or a restart while the job
+    was running) the job ends as ``unknown`` instead of risking a second
+    post. A non-empty idempotency key maps repeated submissions of a tenant
+    to the same job.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = DEFAULT_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_base: float = DEFAULT_RETRY_BASE,
+        retention: float = DEFAULT_RETENTION,
+    ) -> None:
+        self.path = path
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._runner: Optional[Callable[[Job], Awaitable[dict[str, Any]]]] = None
+        self._running = 0
+        self._purged_at = 0.0
+        self._counters = {"submitted": 0, "deduplicated": 0, "retried": 0, "done": 0, "failed": 0, "unknown": 0}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["JobQueue"]:
+        """Open the queue at ``SLACK_JOB_QUEUE_PATH``, or ``None`` if unset."""
+        path = os.getenv(JOB_QUEUE_PATH_ENV)
+        if not path:
+            return None
+        return cls(
+            path,
+            workers=int(os.getenv(JOB_WORKERS_ENV, DEFAULT_WORKERS)),
+            max_attempts=int(os.getenv(JOB_MAX_ATTEMPTS_ENV, DEFAULT_MAX_ATTEMPTS)),
+            retry_base=float(os.getenv(JOB_RETRY_BASE_ENV, DEFAULT_RETRY_BASE)),
+            retention=float(os.getenv(JOB_RETENTION_ENV, DEFAULT_RETENTION)),
+        )
+
+    async def _run(self, func, *args):
+        def locked():
+            with self._lock:
+                return func(*args)
+
+        return await asyncio.to_thread(locked)
+
+    # -- synchronous SQLite helpers (run in a worker thread) ----------------
+
+    def _insert(self, job: Job, now: float) -> tuple[Job, bool]:
+        cursor = self._conn.execute(
+            """
+            INSERT INTO jobs (id, tenant, action, method, args, idempotency_key,
+                              status, not_before, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+            """,
+            (job.id, job.tenant, job.action, job.method, json.dumps(job.args),
+             job.idempotency_key, QUEUED, now, now, now),
+        )
+        self._conn.commit()
+        if cursor.rowcount:
+            return self._get(job.id), True
+        row = self._conn.execute(
+            "SELECT * FROM jobs WHERE tenant = ? AND idempotency_key = ?",
+            (job.tenant, job.idempotency_key),
+        ).fetchone()
+        return Job.from_row(row), False
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def _claim(self, now: float) -> Optional[Job]:
+        row = self._conn.execute(
+            "SELECT id FROM jobs WHERE status = ? AND not_before <= ? ORDER BY not_before LIMIT 1",
+            (QUEUED, now),
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (RUNNING, now, row["id"]),
+        )
+        self._conn.commit()
+        return self._get(row["id"])
+
+    def _next_due(self) -> Optional[float]:
+        row = self._conn.execute(
+            "SELECT MIN(not_before) AS due FROM jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()
+        return row["due"]
+
+    def _finish(self, job_id: str, status: str, result: Optional[dict], error: Optional[str], not_before: float) -> None:
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, not_before = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, not_before, time.time(), job_id),
+        )
+        self._conn.commit()
+
+    def _recover(self) -> int:
+        """Requeue jobs interrupted by a restart, unless repeating them could post twice."""
+        placeholders = ",".join("?" * len(IDEMPOTENT_METHODS))
+        cursor = self._conn.execute(
+            f"UPDATE jobs SET status = ? WHERE status = ? AND method IN ({placeholders})",
+            (QUEUED, RUNNING, *IDEMPOTENT_METHODS),
+        )
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status = ?",
+            (UNKNOWN, "interrupted by a restart (may have been sent; not retried)", time.time(), RUNNING),
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    def _purge(self, before: float) -> None:
+        self._conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?", (DONE, FAILED, UNKNOWN, before)
+        )
+        self._conn.commit()
+
+    def _counts(self) -> dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+    # -- async API -----------------------------------------------------------
+
+    async def start(self, runner: Callable[[Job], Awaitable[dict[str, Any]]]) -> None:
+        """Start the workers once; ``runner`` performs a job and returns its result."""
+        if self._tasks:
+            return
+        self._runner = runner
+        await self._run(self._recover)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(
+        self,
+        tenant: str,
+        action: str,
+        method: str,
+        args: dict[str, Any],
+        idempotency_key: str = "",
+    ) -> Job:
+        """Journal a job and wake a worker; returns the (possibly existing) job."""
+        now = time.time()
+        job = Job(uuid.uuid4().hex, tenant, action, method, args, idempotency_key=idempotency_key)
+        job, created = await self._run(self._insert, job, now)
+        self._counters["submitted" if created else "deduplicated"] += 1
+        if now - self._purged_at > 3600:
+            self._purged_at = now
+            await self._run(self._purge, now - self.retention)
+        self._wake.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self._run(self._get, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            self._wake.clear()
+            job = await self._run(self._claim, time.time())
+            if job is None:
+                due = await self._run(self._next_due)
+                timeout = POLL_INTERVAL if due is None else min(max(due - time.time(), 0.0), POLL_INTERVAL)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._running += 1
+            try:
+                await self._execute(job)
+            finally:
+                self._running -= 1
+
+    async def _execute(self, job: Job) -> None:
+        try:
+            result = await self._runner(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error, retryable, retry_after = classify(e)
+            if error in SATISFIED_ERRORS:
+                await self._run(self._finish, job.id, DONE, None, None, 0.0)
+                self._counters["done"] += 1
+            elif retryable and not can_retry(job.method, e):
+                # Slack may have performed the write; sending it again could post twice
+                await self._run(self._finish, job.id, UNKNOWN, None, f"{error} (may have been sent; not retried)", 0.0)
+                self._counters["unknown"] += 1
+            elif retryable and job.attempts < self.max_attempts:
+                backoff = random.uniform(0, min(MAX_RETRY_DELAY, self.retry_base * 2 ** (job.attempts - 1)))
+                not_before = time.time() + max(backoff, retry_after)
+                await self._run(self._finish, job.id, QUEUED, None, error, not_before)
+                self._counters["retried"] += 1
+            else:
+                await self._run(self._finish, job.id, FAILED, None, error, 0.0)
+                self._counters["failed"] += 1
+            return
+        await self._run(self._finish, job.id, DONE, result, None, 0.0)
+        self._counters["done"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = self._counts()
+        return {
+            "workers": len(self._tasks),
+            "running": self._running,
+            "jobs": counts,
+            **self._counters,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,211 @@
+"""
+Slack MCP Metrics
+In-process latency histograms and counters for tools and Slack API calls,
+rendered in the Prometheus text exposition format.
+"""
+
+import bisect
+import functools
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from slack_sdk.errors import SlackApiError
+
+from .ratelimit import is_rate_limited
+
+T = TypeVar("T")
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Upper bounds (bytes) of the payload size histogram buckets
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        rows = []
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            rows.append((bound, total))
+        return rows
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Family:
+    """A metric name with one series per label set."""
+
+    def __init__(self, name: str, kind: str, help: str, factory: Callable[[], Any]) -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.factory = factory
+        self.series: dict[tuple[tuple[str, str], ...], Any] = {}
+
+    def get(self, **labels: str) -> Any:
+        key = tuple(sorted(labels.items()))
+        value = self.series.get(key)
+        if value is None:
+            value = self.series[key] = self.factory()
+        return value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.series.items()):
+            labels = dict(key)
+            if isinstance(value, Histogram):
+                for bound, count in value.cumulative():
+                    lines.append(f"{self.name}_bucket{_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {value.sum:.6f}")
+                lines.append(f"{self.name}_count{_labels(labels)} {value.count}")
+            else:
+                lines.append(f"{self.name}{_labels(labels)} {value}")
+        return lines
+
+
+class Metrics:
+    """Latency, error, payload size and concurrency metrics for the server.
+
+    Tools are wrapped with :meth:`instrument_tool` when they are registered;
+    :class:`~slack_mcp_app.client.SlackClient` reports each Slack HTTP request
+    through :meth:`observe_slack`.
+    """
+
+    def __init__(self) -> None:
+        self.tool_latency = _Family(
+            "slack_mcp_tool_duration_seconds", "histogram",
+            "Tool call latency.", lambda: Histogram(LATENCY_BUCKETS),
+        )
+        self.tool_calls = _Family(
+            "slack_mcp_tool_calls_total", "counter",
+            "Tool calls by outcome (ok, error, exception).", int,
+        )
+        self.tool_response_bytes = _Family(
+            "slack_mcp_tool_response_bytes", "histogram",
+            "Size of tool results.", lambda: Histogram(SIZE_BUCKETS),
+        )
+        self.tool_in_flight = _Family(
+            "slack_mcp_tool_in_flight", "gauge", "Tool calls currently running.", int,
+        )
+        self.slack_latency = _Family(
+            "slack_api_request_duration_seconds", "histogram",
+            "Slack Web API request latency (excluding rate limit queueing).",
+            lambda: Histogram(LATENCY_BUCKETS),
+        )
+        self.slack_requests = _Family(
+            "slack_api_requests_total", "counter",
+            "Slack Web API requests by outcome (ok, error, ratelimited, exception).", int,
+        )
+        self.slack_errors = _Family(
+            "slack_api_errors_total", "counter", "Slack Web API errors by error code.", int,
+        )
+        self.slack_response_bytes = _Family(
+            "slack_api_response_bytes", "histogram",
+            "Size of Slack Web API responses.", lambda: Histogram(SIZE_BUCKETS),
+        )
+        self.slack_in_flight = _Family(
+            "slack_api_in_flight", "gauge", "Slack Web API requests currently running.", int,
+        )
+
+    def instrument_tool(self, name: str, func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        """Wrap an async tool so every call is timed and counted.
+
+        The wrapper keeps the tool's signature, so FastMCP builds the same
+        schema and still injects the request context into ``ctx``.
+        """
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> str:
+            self.tool_in_flight.inc(1, tool=name)
+            start = time.perf_counter()
+            outcome = "exception"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "error" if isinstance(result, str) and result.startswith("Error") else "ok"
+                if isinstance(result, str):
+                    self.tool_response_bytes.get(tool=name).observe(len(result.encode("utf-8")))
+                return result
+            finally:
+                self.tool_latency.get(tool=name).observe(time.perf_counter() - start)
+                self.tool_calls.inc(tool=name, outcome=outcome)
+                self.tool_in_flight.inc(-1, tool=name)
+
+        return wrapper
+
+    async def observe_slack(self, api_method: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Execute one Slack HTTP request and record its latency and outcome."""
+        self.slack_in_flight.inc(1, method=api_method)
+        start = time.perf_counter()
+        outcome = "exception"
+        try:
+            response = await call()
+            outcome = "ok"
+            size = (getattr(response, "headers", None) or {}).get("content-length")
+            if size and str(size).isdigit():
+                self.slack_response_bytes.get(method=api_method).observe(int(size))
+            return response
+        except SlackApiError as e:
+            outcome = "ratelimited" if is_rate_limited(e) else "error"
+            self.slack_errors.inc(method=api_method, error=str(e.response.get("error", "unknown")))
+            raise
+        finally:
+            self.slack_latency.get(method=api_method).observe(time.perf_counter() - start)
+            self.slack_requests.inc(method=api_method, outcome=outcome)
+            self.slack_in_flight.inc(-1, method=api_method)
+
+    def render(self, extra: Optional[dict[str, float]] = None) -> str:
+        """Render every metric in the Prometheus text format.
+
+        ``extra`` adds untyped gauges (e.g. cache or pool counters); names
+        may carry labels (``name{label="value"}``).
+        """
+        lines: list[str] = []
+        for family in (
+            self.tool_latency,
+            self.tool_calls,
+            self.tool_response_bytes,
+            self.tool_in_flight,
+            self.slack_latency,
+            self.slack_requests,
+            self.slack_errors,
+            self.slack_response_bytes,
+            self.slack_in_flight,
+        ):
+            if family.series:
+                lines.extend(family.render())
+        typed: set[str] = set()
+        for name, value in (extra or {}).items():
+            family = name.split("{", 1)[0]
+            if family not in typed:
+                typed.add(family)
+                lines.append(f"# TYPE {family} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,154 @@
+"""
+Slack Pagination
+Cursor and page based pagination helpers for Slack Web API list methods.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from mcp.server.fastmcp import Context
+
+# Largest page size each list method accepts. Slack rejects or silently
+# clamps anything above these values.
+PAGE_SIZES = {
+    "conversations.list": 1000,
+    "conversations.history": 999,
+    "conversations.replies": 999,
+    "users.list": 1000,
+    "files.list": 1000,
+}
+DEFAULT_PAGE_SIZE = 200
+
+
+@dataclass
+class Page:
+    """A single page of items returned by a Slack list method."""
+
+    items: list[dict[str, Any]]
+    next_cursor: str = ""
+    response: dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+@dataclass
+class PageResult:
+    """Items collected across pages plus a token to resume from."""
+
+    items: list[dict[str, Any]]
+    next_cursor: str = ""
+
+
+def page_size_for(api_method: str) -> int:
+    """Return the largest page size Slack allows for ``api_method``."""
+    return PAGE_SIZES.get(api_method, DEFAULT_PAGE_SIZE)
+
+
+async def report_progress(
+    ctx: Optional[Context], progress: float, total: Optional[float], message: str
+) -> None:
+    """Send an MCP progress notification if the caller asked for one."""
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(progress, total, message)
+    except (AttributeError, ValueError):
+        # No active request (e.g. direct function call outside MCP)
+        pass
+
+
+async def paginate(
+    method: Callable[..., Awaitable[Any]],
+    api_method: str,
+    items_key: str,
+    *,
+    max_items: Optional[int] = None,
+    cursor: str = "",
+    ctx: Optional[Context] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Page]:
+    """Walk ``response_metadata.next_cursor`` and yield pages as they arrive.
+
+    ``method`` is a bound ``AsyncWebClient`` method such as
+    ``slack.conversations_list``. Each request asks for at most the number of
+    items still allowed by ``max_items`` so that the cursor of the last page
+    always points at the first item that was not returned.
+    """
+    page_size = page_size_for(api_method)
+    fetched = 0
+    next_cursor = cursor or ""
+
+    while True:
+        limit = page_size
+        if max_items is not None:
+            limit = min(page_size, max_items - fetched)
+            if limit <= 0:
+                return
+
+        request = dict(kwargs, limit=limit)
+        if next_cursor:
+            request["cursor"] = next_cursor
+
+        response = await method(**request)
+        items = response.get(items_key, []) or []
+        next_cursor = (response.get("response_metadata") or {}).get("next_cursor", "") or ""
+        fetched += len(items)
+
+        await report_progress(ctx, fetched, max_items, f"{api_method}: {fetched} fetched")
+        yield Page(items=items, next_cursor=next_cursor, response=getattr(response, "data", response))
+
+        if not next_cursor:
+            return
+
+
+async def paginate_pages(
+    method: Callable[..., Awaitable[Any]],
+    api_method: str,
+    items_key: str,
+    *,
+    max_items: Optional[int] = None,
+    cursor: str = "",
+    ctx: Optional[Context] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Page]:
+    """Walk legacy ``page``/``count`` paging (e.g. ``files.list``).
+
+    The resume token has the form ``"<page>:<count>"`` because Slack computes
+    page offsets from ``count``, which therefore must stay fixed across calls.
+    The ``max_items`` budget is rounded up to whole pages.
+    """
+    if cursor:
+        page_str, _, count_str = cursor.partition(":")
+        page, count = int(page_str), int(count_str or page_size_for(api_method))
+    else:
+        page = 1
+        count = page_size_for(api_method)
+        if max_items is not None:
+            count = max(1, min(count, max_items))
+    fetched = 0
+
+    while True:
+        response = await method(**dict(kwargs, count=count, page=page))
+        items = response.get(items_key, []) or []
+        paging = response.get("paging") or {}
+        fetched += len(items)
+
+        page += 1
+        has_more = bool(items) and page <= int(paging.get("pages", 0) or 0)
+        next_cursor = f"{page}:{count}" if has_more else ""
+
+        await report_progress(ctx, fetched, max_items, f"{api_method}: {fetched} fetched")
+        yield Page(items=items, next_cursor=next_cursor, response=getattr(response, "data", response))
+
+        if not has_more or (max_items is not None and fetched >= max_items):
+            return
+
+
+async def collect(pages: AsyncIterator[Page], max_items: Optional[int] = None) -> PageResult:
+    """Drain a page iterator into a single :class:`PageResult`."""
+    items: list[dict[str, Any]] = []
+    next_cursor = ""
+    async for page in pages:
+        items.extend(page.items)
+        next_cursor = page.next_cursor
+        if max_items is not None and len(items) >= max_items:
+            break
+    return PageResult(items=items, next_cursor=next_cursor)
@@ -0,0 +1,247 @@
+"""
+Slack Rate Limiting
+Tier-aware request scheduler shared by every Slack Web API call.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from slack_sdk.errors import SlackApiError
+
+from .state import StateBackend
+
+T = TypeVar("T")
+
+# Environment variable names
+RATE_LIMIT_ENABLED_ENV = "SLACK_RATE_LIMIT_ENABLED"
+RATE_LIMIT_MAX_RETRIES_ENV = "SLACK_RATE_LIMIT_MAX_RETRIES"
+
+# Requests per minute allowed by each Slack rate limit tier.
+# https://api.slack.com/apis/rate-limits
+TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+# chat.postMessage has a "special" limit: roughly one message per second per
+# channel, with a workspace-wide allowance of several hundred per minute.
+SPECIAL_RATE = 300
+CHANNEL_POST_RATE = 60
+DEFAULT_TIER = 3
+DEFAULT_MAX_RETRIES = 3
+# Slack tolerates short bursts above the per-minute rate
+BURST_SECONDS = 3.0
+
+METHOD_TIERS = {
+    "auth.test": 4,
+    "chat.delete": 3,
+    "chat.postMessage": "special",
+    "chat.scheduleMessage": 3,
+    "chat.update": 3,
+    "conversations.archive": 2,
+    "conversations.create": 2,
+    "conversations.history": 3,
+    "conversations.info": 3,
+    "conversations.join": 3,
+    "conversations.list": 2,
+    "conversations.replies": 3,
+    "conversations.setPurpose": 2,
+    "conversations.setTopic": 2,
+    "emoji.list": 2,
+    "files.completeUploadExternal": 4,
+    "files.getUploadURLExternal": 4,
+    "files.list": 3,
+    "files.upload": 2,
+    "pins.add": 2,
+    "pins.remove": 2,
+    "reactions.add": 3,
+    "reminders.add": 2,
+    "search.messages": 2,
+    "team.info": 3,
+    "users.info": 4,
+    "users.list": 2,
+    "users.lookupByEmail": 3,
+    "users.profile.set": 3,
+}
+
+# Methods that are additionally limited per channel
+CHANNEL_LIMITED_METHODS = {"chat.postMessage", "chat.postEphemeral", "chat.meMessage"}
+
+
+def method_rate(api_method: str) -> float:
+    """Return the allowed requests per minute for ``api_method``."""
+    tier = METHOD_TIERS.get(api_method, DEFAULT_TIER)
+    if tier == "special":
+        return SPECIAL_RATE
+    return TIER_RATES[tier]
+
+
+def retry_after_seconds(error: SlackApiError, default: float = 1.0) -> float:
+    """Extract ``Retry-After`` from a rate limited Slack response."""
+    headers = getattr(error.response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def is_rate_limited(error: SlackApiError) -> bool:
+    response = error.response
+    return getattr(response, "status_code", None) == 429 or (
+        hasattr(response, "get") and response.get("error") == "ratelimited"
+    )
+
+
+def bucket_params(per_minute: float, burst: float = BURST_SECONDS) -> tuple[float, float]:
+    """Return the GCRA ``(interval, tolerance)`` in seconds for a rate."""
+    interval = 60.0 / per_minute
+    return interval, max(burst * per_minute / 60.0 - 1, 0) * interval
+
+
+class TokenBucket:
+    """A token bucket implemented as a generic cell rate algorithm (GCRA).
+
+    Instead of counting tokens, the bucket tracks the theoretical arrival time
+    of the next request. ``reserve`` never rejects: it books the next slot and
+    returns how long the caller must wait for it, which makes concurrent
+    callers queue up in FIFO order.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        burst: float = BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval, self.tolerance = bucket_params(per_minute, burst)
+        self._clock = clock
+        self._tat = 0.0
+
+    def reserve(self) -> float:
+        now = self._clock()
+        tat = max(self._tat, now)
+        wait = max(tat - self.tolerance - now, 0.0)
+        self._tat = tat + self.interval
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket for ``seconds`` (e.g. after a ``Retry-After``)."""
+        self._tat = max(self._tat, self._clock() + seconds + self.tolerance)
+
+
+@dataclass
+class MethodStats:
+    """Scheduling counters for a single Slack API method."""
+
+    calls: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    ratelimited: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "avg_wait": round(self.total_wait / self.calls, 4) if self.calls else 0.0,
+            "max_wait": round(self.max_wait, 4),
+            "ratelimited": self.ratelimited,
+        }
+
+
+class RateLimitScheduler:
+    """Queue Slack API calls so they stay within Slack's rate limit tiers.
+
+    Every method has its own bucket sized from :data:`METHOD_TIERS`; posting
+    methods also take a slot from a per-channel bucket. Buckets are keyed by a
+    ``scope`` (one per workspace) because Slack applies limits per app per
+    workspace. A 429 pauses the method's bucket for ``Retry-After`` seconds and
+    the call is queued again instead of failing.
+
+    With a shared state ``backend`` the buckets live in the backend, so all
+    replicas draw from the same budget.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backend: Optional[StateBackend] = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backend = backend if backend is not None and backend.shared else None
+        self._buckets: dict[tuple[str, ...], TokenBucket] = {}
+        self._stats: dict[str, MethodStats] = {}
+
+    @classmethod
+    def from_env(cls, backend: Optional[StateBackend] = None) -> Optional["RateLimitScheduler"]:
+        """Build a scheduler, or ``None`` when ``SLACK_RATE_LIMIT_ENABLED`` is false."""
+        if os.getenv(RATE_LIMIT_ENABLED_ENV, "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            max_retries=int(os.getenv(RATE_LIMIT_MAX_RETRIES_ENV, DEFAULT_MAX_RETRIES)),
+            backend=backend,
+        )
+
+    def _bucket(self, key: tuple[str, ...], per_minute: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(per_minute)
+        return bucket
+
+    async def _take(self, key: tuple[str, ...], per_minute: float, pause: float = 0.0) -> float:
+        """Reserve a slot in (or with ``pause``, block) the bucket ``key``."""
+        if self.backend is not None:
+            interval, tolerance = bucket_params(per_minute)
+            return await self.backend.gcra("rl:" + ":".join(key), interval, tolerance, pause)
+        bucket = self._bucket(key, per_minute)
+        if pause:
+            bucket.pause(pause)
+            return 0.0
+        return bucket.reserve()
+
+    async def _reserve(self, scope: str, api_method: str, channel: Optional[str]) -> float:
+        wait = await self._take((scope, api_method), method_rate(api_method))
+        if channel and api_method in CHANNEL_LIMITED_METHODS:
+            channel_wait = await self._take((scope, "channel", channel), CHANNEL_POST_RATE)
+            wait = max(wait, channel_wait)
+        return wait
+
+    async def run(
+        self,
+        api_method: str,
+        call: Callable[[], Awaitable[T]],
+        *,
+        scope: str = "default",
+        channel: Optional[str] = None,
+    ) -> T:
+        """Wait for a free slot, then execute ``call``; retry on HTTP 429."""
+        stats = self._stats.setdefault(api_method, MethodStats())
+        attempt = 0
+        while True:
+            wait = await self._reserve(scope, api_method, channel)
+            stats.calls += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            if wait > 0:
+                stats.queued += 1
+                stats.max_queued = max(stats.max_queued, stats.queued)
+                try:
+                    await asyncio.sleep(wait)
+                finally:
+                    stats.queued -= 1
+
+            try:
+                return await call()
+            except SlackApiError as e:
+                if not is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                stats.ratelimited += 1
+                await self._take(
+                    (scope, api_method), method_rate(api_method), pause=retry_after_seconds(e)
+                )
+
+    def stats(self) -> dict[str, Any]:
+        return {method: s.as_dict() for method, s in sorted(self._stats.items())}
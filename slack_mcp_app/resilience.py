@@ -0,0 +1,321 @@
+"""
+Slack Request Resilience
+Jittered retries, per-method circuit breakers and hedged reads around Slack
+Web API calls.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from slack_sdk.errors import SlackApiError
+
+from .coalesce import is_read_method
+from .jobs import classify
+from .ratelimit import is_rate_limited
+
+T = TypeVar("T")
+
+# Environment variable names
+RESILIENCE_ENABLED_ENV = "SLACK_RESILIENCE_ENABLED"
+RETRY_MAX_ATTEMPTS_ENV = "SLACK_RETRY_MAX_ATTEMPTS"
+RETRY_BASE_ENV = "SLACK_RETRY_BASE"
+BREAKER_FAILURE_RATE_ENV = "SLACK_BREAKER_FAILURE_RATE"
+BREAKER_MIN_CALLS_ENV = "SLACK_BREAKER_MIN_CALLS"
+BREAKER_WINDOW_ENV = "SLACK_BREAKER_WINDOW"
+BREAKER_COOLDOWN_ENV = "SLACK_BREAKER_COOLDOWN"
+HEDGE_METHODS_ENV = "SLACK_HEDGE_METHODS"
+HEDGE_MIN_DELAY_ENV = "SLACK_HEDGE_MIN_DELAY"
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BASE = 0.25
+MAX_RETRY_DELAY = 5.0
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_MIN_CALLS = 20
+DEFAULT_WINDOW = 60.0
+DEFAULT_COOLDOWN = 30.0
+# Latency-critical single-object reads; a slow one is raced by a second request
+DEFAULT_HEDGE_METHODS = "users.info,users.lookupByEmail,conversations.info,conversations.replies"
+DEFAULT_HEDGE_MIN_DELAY = 0.05
+# The hedge fires once a request is slower than this percentile of recent ones
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_SAMPLES = 200
+
+# Writes that can be repeated without a second side effect
+IDEMPOTENT_WRITES = {
+    "chat.update",
+    "conversations.join",
+    "conversations.setPurpose",
+    "conversations.setTopic",
+    "users.profile.set",
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Return whether a failure points at Slack or the network (5xx, timeouts...).
+
+    Rate limits are excluded: the scheduler already waits them out, and they
+    say nothing about Slack's health.
+    """
+    if isinstance(exc, SlackApiError) and is_rate_limited(exc):
+        return False
+    return classify(exc)[1]
+
+
+def _not_sent(exc: BaseException) -> bool:
+    """Return whether a request failed before reaching Slack (safe to resend)."""
+    import aiohttp
+
+    return isinstance(exc, aiohttp.ClientConnectorError)
+
+
+def circuit_open_error(api_method: str, retry_after: float) -> SlackApiError:
+    response = {"ok": False, "error": "circuit_open", "method": api_method, "retry_after": round(retry_after, 1)}
+    return SlackApiError(f"Circuit open for {api_method}; failing fast", response)
+
+
+class CircuitBreaker:
+    """Failure-rate breaker for one Slack method.
+
+    Outcomes of the last ``window`` seconds are kept. Once at least
+    ``min_calls`` were seen and the share of transient failures reaches
+    ``failure_rate``, the breaker opens and calls fail fast for ``cooldown``
+    seconds. Then one probe call is let through (half open): success closes
+    the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        window: float = DEFAULT_WINDOW,
+        cooldown: float = DEFAULT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at >= self.cooldown:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_after(self) -> float:
+        return 0.0 if self._opened_at is None else max(self._opened_at + self.cooldown - self._clock(), 0.0)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """Give up a probe slot without an outcome (e.g. the call was cancelled)."""
+        self._probing = False
+
+    def record(self, ok: bool) -> None:
+        now = self._clock()
+        if self._opened_at is not None:
+            self._probing = False
+            if ok:
+                self._opened_at = None
+                self._outcomes.clear()
+                self._failures = 0
+            else:
+                self._opened_at = now
+            return
+        self._outcomes.append((now, ok))
+        self._failures += not ok
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._failures -= not self._outcomes.popleft()[1]
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+            self._opened_at = now
+            self.opened += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failures": self._failures,
+            "failure_rate": round(self._failures / calls, 4) if calls else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class Resilience:
+    """Retry, circuit breaking and hedging for Slack Web API calls.
+
+    Transient failures (5xx, network errors, timeouts) of reads and
+    idempotent writes are retried with jittered exponential backoff, up to
+    ``max_attempts`` attempts. Other writes are only resent when the
+    connection failed before the request reached Slack, so a message is
+    never posted twice. Each method has a :class:`CircuitBreaker`; while it
+    is open, calls fail fast with a ``circuit_open`` Slack error instead of
+    adding load to a degraded API. Reads in ``hedge_methods`` are raced by
+    a second request when the first is slower than the method's recent p95
+    latency; the first answer wins.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_base: float = DEFAULT_RETRY_BASE,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        window: float = DEFAULT_WINDOW,
+        cooldown: float = DEFAULT_COOLDOWN,
+        hedge_methods: Optional[set[str]] = None,
+        hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.hedge_methods = set(DEFAULT_HEDGE_METHODS.split(",")) if hedge_methods is None else hedge_methods
+        self.hedge_min_delay = hedge_min_delay
+        self._breaker_args = (failure_rate, min_calls, window, cooldown, clock)
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[str, deque[float]] = {}
+        self._counters = {"retries": 0, "hedged": 0, "hedge_wins": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["Resilience"]:
+        """Build the layer, or ``None`` when ``SLACK_RESILIENCE_ENABLED`` is false."""
+        if os.getenv(RESILIENCE_ENABLED_ENV, "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            max_attempts=int(os.getenv(RETRY_MAX_ATTEMPTS_ENV, DEFAULT_MAX_ATTEMPTS)),
+            retry_base=float(os.getenv(RETRY_BASE_ENV, DEFAULT_RETRY_BASE)),
+            failure_rate=float(os.getenv(BREAKER_FAILURE_RATE_ENV, DEFAULT_FAILURE_RATE)),
+            min_calls=int(os.getenv(BREAKER_MIN_CALLS_ENV, DEFAULT_MIN_CALLS)),
+            window=float(os.getenv(BREAKER_WINDOW_ENV, DEFAULT_WINDOW)),
+            cooldown=float(os.getenv(BREAKER_COOLDOWN_ENV, DEFAULT_COOLDOWN)),
+            hedge_methods={m.strip() for m in os.getenv(HEDGE_METHODS_ENV, DEFAULT_HEDGE_METHODS).split(",") if m.strip()},
+            hedge_min_delay=float(os.getenv(HEDGE_MIN_DELAY_ENV, DEFAULT_HEDGE_MIN_DELAY)),
+        )
+
+    def breaker(self, api_method: str) -> CircuitBreaker:
+        breaker = self._breakers.get(api_method)
+        if breaker is None:
+            breaker = self._breakers[api_method] = CircuitBreaker(*self._breaker_args)
+        return breaker
+
+    def retryable(self, api_method: str, exc: BaseException) -> bool:
+        if not is_transient(exc):
+            return False
+        if is_read_method(api_method) or api_method in IDEMPOTENT_WRITES:
+            return True
+        return _not_sent(exc)
+
+    def hedge_delay(self, api_method: str) -> Optional[float]:
+        """Seconds to wait before hedging ``api_method``, or ``None`` to not hedge."""
+        samples = self._latencies.get(api_method)
+        if api_method not in self.hedge_methods or not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return max(self.hedge_min_delay, ordered[int(len(ordered) * HEDGE_PERCENTILE) - 1])
+
+    async def run(self, api_method: str, call: Callable[[], Awaitable[T]], *, retry: bool = True) -> T:
+        """Execute ``call`` under the method's breaker, retrying and hedging when allowed.
+
+        Pass ``retry=False`` for requests whose body can't be sent twice
+        (streamed uploads).
+        """
+        breaker = self.breaker(api_method)
+        attempt = 0
+        while True:
+            attempt += 1
+            if not breaker.allow():
+                self._counters["rejected"] += 1
+                raise circuit_open_error(api_method, breaker.retry_after())
+            try:
+                delay = self.hedge_delay(api_method) if retry and breaker.state == CLOSED else None
+                if delay is None:
+                    return await self._attempt(api_method, call, breaker)
+                return await self._hedged(api_method, call, breaker, delay)
+            except Exception as e:
+                if not retry or attempt >= self.max_attempts or not self.retryable(api_method, e):
+                    raise
+            self._counters["retries"] += 1
+            await asyncio.sleep(random.uniform(0, min(MAX_RETRY_DELAY, self.retry_base * 2 ** (attempt - 1))))
+
+    async def _attempt(self, api_method: str, call: Callable[[], Awaitable[T]], breaker: CircuitBreaker) -> T:
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            # Application errors (channel_not_found...) still mean Slack is answering
+            breaker.record(not is_transient(e))
+            raise
+        breaker.record(True)
+        self._latencies.setdefault(api_method, deque(maxlen=LATENCY_SAMPLES)).append(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, api_method: str, call: Callable[[], Awaitable[T]], breaker: CircuitBreaker, delay: float) -> T:
+        first = asyncio.ensure_future(self._attempt(api_method, call, breaker))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+            self._counters["hedged"] += 1
+            second = asyncio.ensure_future(self._attempt(api_method, call, breaker))
+            pending.add(second)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._counters["hedge_wins"] += task is second
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "breakers": {method: b.as_dict() for method, b in sorted(self._breakers.items())},
+        }
+
+    def gauges(self) -> dict[str, float]:
+        """Prometheus gauges: breaker state per method (0 closed, 1 half open, 2 open) and counters."""
+        gauges = {
+            "slack_api_retries_total": self._counters["retries"],
+            "slack_api_hedged_total": self._counters["hedged"],
+            "slack_api_hedge_wins_total": self._counters["hedge_wins"],
+            "slack_api_circuit_rejected_total": self._counters["rejected"],
+        }
+        for method, breaker in sorted(self._breakers.items()):
+            gauges[f'slack_api_circuit_state{{method="{method}"}}'] = STATE_VALUES[breaker.state]
+        return gauges
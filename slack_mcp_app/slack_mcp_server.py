@@ -1,53 +1,178 @@
+import json
 import os
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from slack_sdk.web.async_client import AsyncWebClient
+_import_started = time.perf_counter()
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 
 from mcp.server.fastmcp import Context, FastMCP
-from . import tools
+from .budget import ResponseBudget
+from .cache import DirectoryCache
+from .coalesce import SingleFlight
+from .events import EVENTS_PATH, EventIngestor
+from .http_pool import ConnectionPool
+from .jobs import INVALIDATES_CHANNEL, Job, JobQueue
+from .metrics import CONTENT_TYPE, Metrics
+from .ratelimit import RateLimitScheduler
+from .resilience import Resilience
+from .state import StateBackend, backend_from_env
+from .store import MessageStore
+from .tenants import DEFAULT_TENANT, TENANTS_ENV, TenantRegistry
+
+# The Slack SDK, aiohttp and the tool implementations are imported when the
+# first MCP session starts, keeping them off the cold start path.
+if TYPE_CHECKING:
+    from slack_sdk.web.async_client import AsyncWebClient
+
+    from .client import SlackClient
 
 __all__ = ["mcp"]
 
 SLACK_BOT_TOKEN_ENV = "SLACK_BOT_TOKEN"
 SLACK_USER_TOKEN_ENV = "SLACK_USER_TOKEN"
+# Override the Web API endpoint (e.g. a proxy or the benchmark's fake Slack)
+SLACK_API_BASE_URL_ENV = "SLACK_API_BASE_URL"
 
 
 @dataclass
 class AppContext:
-    """Application lifecycle context."""
+    """Application lifecycle context.
+
+    The client fields belong to the default workspace; tools resolve the
+    workspace of each request through ``tenants``.
+    """
+
+    slack_bot: Optional["AsyncWebClient"] = None
+    slack_user: Optional["AsyncWebClient"] = None
+    directory: Optional[DirectoryCache] = None
+    scheduler: Optional[RateLimitScheduler] = None
+    store: Optional[MessageStore] = None
+    state: Optional[StateBackend] = None
+    jobs: Optional[JobQueue] = None
+    responses: Optional[ResponseBudget] = None
+    tenants: Optional[TenantRegistry] = None
+
+
+# The lifespan below runs once per MCP session, so state that must be shared
+# across sessions lives at module scope and is handed to every AppContext.
+# State that replicas must agree on goes through the shared state backend.
+state_backend = backend_from_env()
+directory_cache = DirectoryCache.from_env(state_backend)
+scheduler = RateLimitScheduler.from_env(state_backend)
+single_flight = SingleFlight.from_env()
+connection_pool = ConnectionPool.from_env()
+resilience = Resilience.from_env()
+message_store = MessageStore.from_env()
+job_queue = JobQueue.from_env()
+response_budget = ResponseBudget.from_env()
+metrics = Metrics()
+
+
+def create_slack_client(token: str, scope: str = DEFAULT_TENANT) -> "SlackClient":
+    """Build a Slack client wired to the shared pool, coalescing and rate limit scheduler.
+
+    ``scope`` is the workspace (tenant) whose rate limit budget the client uses.
+    """
+    from slack_sdk.web.async_client import AsyncWebClient
 
-    slack_bot: AsyncWebClient
-    slack_user: Optional[AsyncWebClient] = None
+    from .client import SlackClient
+
+    return SlackClient(
+        token=token,
+        scope=scope,
+        base_url=os.getenv(SLACK_API_BASE_URL_ENV, AsyncWebClient.BASE_URL),
+        scheduler=scheduler,
+        pool=connection_pool,
+        single_flight=single_flight,
+        metrics=metrics,
+        resilience=resilience,
+    )
+
+
+# Message stores by tenant; every workspace has its own database
+tenant_stores: dict[str, Optional[MessageStore]] = {DEFAULT_TENANT: message_store}
+
+
+def tenant_store(tenant: str) -> Optional[MessageStore]:
+    if tenant not in tenant_stores:
+        tenant_stores[tenant] = MessageStore.from_env(tenant)
+    return tenant_stores[tenant]
+
+
+tenants = TenantRegistry.from_env(
+    create_slack_client,
+    directory_factory=lambda tenant: (
+        directory_cache if tenant == DEFAULT_TENANT else DirectoryCache.from_env(state_backend, tenant)
+    ),
+    store_factory=tenant_store,
+    scheduler=scheduler,
+    state=state_backend,
+    jobs=job_queue,
+    responses=response_budget,
+)
+event_ingestor = EventIngestor.from_env(tenants)
+
+
+async def run_job(job: Job) -> dict:
+    """Perform a queued write with the client of the workspace that submitted it."""
+    tenant = tenants.get(job.tenant)
+    await connection_pool.acquire()
+    try:
+        resp = await getattr(tenant.slack_bot, job.method)(**job.args)
+    finally:
+        await connection_pool.release()
+    if job.method in INVALIDATES_CHANNEL and tenant.directory:
+        await tenant.directory.invalidate_channel(job.args["channel"])
+    return {k: resp[k] for k in ("channel", "ts") if k in resp}
 
 
 @asynccontextmanager
 async def lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     """Initialise and clean up shared resources for the server.
 
-    Loads the Slack bot token from the environment and instantiates an
-    async Slack WebClient that is shared between all tool calls. The
-    client is closed gracefully on application shutdown.
+    Workspace clients come from the shared tenant registry: the default
+    workspace uses ``SLACK_BOT_TOKEN``/``SLACK_USER_TOKEN`` and further
+    workspaces are configured through ``SLACK_TENANTS``. Clients queue their
+    calls through the shared rate limit scheduler (one budget per workspace)
+    and send them over one pooled keep-alive HTTP session, which is released
+    when the session ends and closed once it is unused. Background job
+    workers and the Socket Mode event connection are started with the first
+    session and keep running.
     """
 
-    bot_token = os.getenv(SLACK_BOT_TOKEN_ENV)
-    if not bot_token:
+    if not tenants.tokens:
         raise RuntimeError(
-            f"{SLACK_BOT_TOKEN_ENV} environment variable must be set to run the Slack MCP server"
+            f"{SLACK_BOT_TOKEN_ENV} (or {TENANTS_ENV}) environment variable must be set to run the Slack MCP server"
         )
 
-    user_token = os.getenv(SLACK_USER_TOKEN_ENV)
-
-    slack_bot_client = AsyncWebClient(token=bot_token)
-    slack_user_client = AsyncWebClient(token=user_token) if user_token else None
+    register_tools()
+    await connection_pool.acquire()
+    if job_queue is not None:
+        await job_queue.start(run_job)
+    if event_ingestor is not None:
+        await event_ingestor.start()
+    default = tenants.get(DEFAULT_TENANT) if DEFAULT_TENANT in tenants.tokens else None
 
     try:
-        yield AppContext(slack_bot=slack_bot_client, slack_user=slack_user_client)
+        yield AppContext(
+            slack_bot=default.slack_bot if default else None,
+            slack_user=default.slack_user if default else None,
+            directory=directory_cache,
+            scheduler=scheduler,
+            store=message_store,
+            state=state_backend,
+            jobs=job_queue,
+            responses=response_budget,
+            tenants=tenants,
+        )
     finally:
-        # AsyncWebClient doesn't have a close() method, it's handled automatically
-        pass
+        await connection_pool.release()
 
 
 mcp = FastMCP(
@@ -58,55 +183,158 @@ mcp = FastMCP(
 )
 
 
-# Auto-register all tools from the tools module
+# Tools exposed by the server; each is implemented by ``tools.<name>``
 tool_registry = [
     # Channel & User Management
-    ("list_channels", "List public Slack channels that the bot has access to.", tools.list_channels),
-    ("list_users", "List users in the Slack workspace.", tools.list_users),
-    ("get_user_info", "Get detailed information about a user.", tools.get_user_info),
-    ("find_user_by_email", "Find a user by their email address.", tools.find_user_by_email),
+    ("list_channels", "List public Slack channels that the bot has access to."),
+    ("list_users", "List users in the Slack workspace."),
+    ("get_user_info", "Get detailed information about a user."),
+    ("find_user_by_email", "Find a user by their email address."),
     
     # Messaging
-    ("send_message", "Send a message to a Slack channel.", tools.send_message),
-    ("reply_to_message", "Reply to a specific thread in a Slack channel.", tools.reply_to_message),
-    ("delete_message", "Delete a message from a Slack channel.", tools.delete_message),
-    ("schedule_message", "Schedule a message for later delivery.", tools.schedule_message),
+    ("send_message", "Send a message to a Slack channel."),
+    ("send_messages_bulk", "Send messages to many Slack channels concurrently in one call."),
+    ("reply_to_message", "Reply to a specific thread in a Slack channel."),
+    ("delete_message", "Delete a message from a Slack channel."),
+    ("schedule_message", "Schedule a message for later delivery."),
     
     # Reactions & Interactions
-    ("add_reaction", "Add a reaction emoji to a message in Slack.", tools.add_reaction),
-    ("pin_message", "Pin a message to a channel.", tools.pin_message),
-    ("unpin_message", "Unpin a message from a channel.", tools.unpin_message),
+    ("add_reaction", "Add a reaction emoji to a message in Slack."),
+    ("pin_message", "Pin a message to a channel."),
+    ("unpin_message", "Unpin a message from a channel."),
     
     # File Operations
-    ("upload_file", "Upload a file to Slack channels.", tools.upload_file),
-    ("list_files", "List files in the workspace.", tools.list_files),
+    ("upload_file", "Upload one or more files to Slack channels (streamed, chunked uploads)."),
+    ("list_files", "List files in the workspace."),
     
     # Conversation & History
-    ("get_conversation_history", "Get conversation history from a channel.", tools.get_conversation_history),
-    ("get_thread_replies", "Get replies in a message thread.", tools.get_thread_replies),
+    ("get_conversation_history", "Get conversation history from a channel."),
+    ("get_thread_replies", "Get replies in a message thread."),
+    ("get_channel_threads", "Get channel history with all thread replies fetched concurrently and nested under their parents."),
+    ("export_conversation", "Export a channel's full history (optionally with thread replies) to an NDJSON file."),
+    ("sync_channel_history", "Sync a channel's history into the local message store."),
     
     # Search (User Token Required)
-    ("search_messages", "Search for messages across Slack workspace (requires user token).", tools.search_messages),
+    ("search_messages", "Search for messages across Slack workspace (requires user token)."),
+    ("search_local", "Full-text search over locally synced messages (bot token only)."),
     
     # User Status & Reminders (User Token Required)
-    ("set_user_status", "Set user status (requires user token).", tools.set_user_status),
-    ("create_reminder", "Create a reminder (requires user token).", tools.create_reminder),
+    ("set_user_status", "Set user status (requires user token)."),
+    ("create_reminder", "Create a reminder (requires user token)."),
     
     # Channel Management
-    ("create_channel", "Create a new channel.", tools.create_channel),
-    ("archive_channel", "Archive a channel.", tools.archive_channel),
-    ("set_channel_topic", "Set a channel's topic.", tools.set_channel_topic),
-    ("set_channel_description", "Set a channel's description/purpose.", tools.set_channel_description),
-    ("join_channel", "Join a channel with the bot (requires bot to be invited first).", tools.join_channel),
+    ("create_channel", "Create a new channel."),
+    ("archive_channel", "Archive a channel."),
+    ("set_channel_topic", "Set a channel's topic."),
+    ("set_channel_description", "Set a channel's description/purpose."),
+    ("join_channel", "Join a channel with the bot (requires bot to be invited first)."),
     
     # Workspace Info
-    ("get_team_info", "Get information about the team/workspace.", tools.get_team_info),
-    ("list_emojis", "List custom emojis in the workspace.", tools.list_emojis),
+    ("get_team_info", "Get information about the team/workspace."),
+    ("list_emojis", "List custom emojis in the workspace."),
+    
+    # Background Jobs
+    ("get_job_status", "Get the status of a write queued with background=true."),
+    
+    # Batch
+    ("batch", "Run several read tools (user info, history, threads, ...) concurrently in one call."),
+    ("continue_result", "Get the next part of a response that was cut at its size budget."),
 ]
 
-# Register all tools dynamically
-for tool_name, description, tool_func in tool_registry:
-    mcp.tool(description=description)(tool_func)
+# Seconds spent in each startup phase, reported under ``/stats``
+startup: dict[str, float] = {}
+
+
+def _tenant_of(ctx: Optional[Context]) -> str:
+    """Return the workspace a tool call belongs to (the owner of its stored response parts)."""
+    try:
+        return tenants.resolve(ctx.request_context)
+    except (AttributeError, ValueError, PermissionError):
+        return DEFAULT_TENANT
+
+
+def register_tools() -> None:
+    """Import the tool implementations and register them, timing every call.
+
+    Runs once, when the first MCP session starts, so that the server binds
+    its port and answers health checks without loading the tools module.
+    """
+    if "tools_s" in startup:
+        return
+    started = time.perf_counter()
+    from . import tools
+
+    for tool_name, description in tool_registry:
+        func = getattr(tools, tool_name)
+        if response_budget is not None:
+            func = response_budget.wrap(tool_name, func, _tenant_of)
+        mcp.tool(description=description)(metrics.instrument_tool(tool_name, func))
+    startup["tools_s"] = round(time.perf_counter() - started, 4)
+
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Expose cache and scheduler counters so shared resources can be sized."""
+    return JSONResponse(
+        {
+            "directory_cache": directory_cache.stats(),
+            "rate_limits": scheduler.stats() if scheduler else {},
+            "coalescing": single_flight.stats() if single_flight else {},
+            "resilience": resilience.stats() if resilience else {},
+            "http_pool": connection_pool.stats(),
+            "tenants": tenants.stats(),
+            "state": state_backend.stats(),
+            "jobs": job_queue.stats() if job_queue else {},
+            "responses": response_budget.stats() if response_budget else {},
+            "events": event_ingestor.stats() if event_ingestor else {},
+            "startup": startup,
+        }
+    )
+
+
+@mcp.custom_route(EVENTS_PATH, methods=["POST"])
+async def slack_events(request: Request) -> JSONResponse:
+    """Events API endpoint: verify the request and apply its event to local caches."""
+    if event_ingestor is None or not event_ingestor.signing_secret:
+        return JSONResponse({"error": "event ingestion is not enabled"}, status_code=404)
+    body = await request.body()
+    if not event_ingestor.verify(request.headers, body):
+        return JSONResponse({"error": "invalid signature"}, status_code=401)
+    payload = json.loads(body)
+    if payload.get("type") == "url_verification":
+        return JSONResponse({"challenge": payload.get("challenge")})
+    if payload.get("type") == "event_callback":
+        await event_ingestor.handle(payload)
+    return JSONResponse({"ok": True})
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    """Liveness probe used by the container and App Runner health checks."""
+    return JSONResponse({"status": "ok"})
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Expose tool and Slack API latency histograms in the Prometheus format."""
+    pool = connection_pool.stats()
+    cache = directory_cache.stats().values()
+    extra = {
+        "slack_http_pool_in_flight": pool["in_flight"],
+        "slack_http_pool_utilization": pool["utilization"],
+        "slack_http_pool_reuse_rate": pool["reuse_rate"],
+        "slack_directory_cache_hits": sum(t["hits"] for t in cache),
+        "slack_directory_cache_misses": sum(t["misses"] for t in cache),
+    }
+    if single_flight:
+        extra["slack_api_coalesced_total"] = single_flight.stats()["coalesced"]
+    if resilience:
+        extra.update(resilience.gauges())
+    return PlainTextResponse(metrics.render(extra), media_type=CONTENT_TYPE)
+
+
+startup["import_s"] = round(time.perf_counter() - _import_started, 4)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+"""
+Slack MCP Shared State
+Pluggable key/value backend for state that replicas must share: rate limit
+buckets, directory cache entries and idempotency keys.
+"""
+
+import fnmatch
+import os
+import time
+from typing import Any, Callable, Optional
+
+# Environment variable names
+STATE_BACKEND_ENV = "SLACK_STATE_BACKEND"
+STATE_REDIS_URL_ENV = "SLACK_STATE_REDIS_URL"
+STATE_PREFIX_ENV = "SLACK_STATE_PREFIX"
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+DEFAULT_PREFIX = "slack-mcp:"
+
+# Generic cell rate algorithm (see ratelimit.TokenBucket), evaluated
+# atomically on the server against its own clock so replicas agree.
+# KEYS[1] = bucket; ARGV = interval, tolerance, pause seconds (0 = reserve)
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local pause = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+local wait = 0
+if pause > 0 then
+  tat = math.max(tat, now + pause + tolerance)
+else
+  tat = math.max(tat, now)
+  wait = math.max(tat - tolerance - now, 0)
+  tat = tat + interval
+end
+local ttl = math.ceil((tat - now + 1) * 1000)
+redis.call('SET', KEYS[1], tostring(tat), 'PX', ttl)
+return tostring(wait)
+"""
+
+
+class MemoryBackend:
+    """Process-local backend; the default when a single replica runs."""
+
+    shared = False
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._data: dict[str, tuple[float, str]] = {}
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._live(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._data[key] = (self._clock() + ttl, value)
+
+    async def set_many(self, entries: dict[str, str], ttl: float) -> None:
+        expires_at = self._clock() + ttl
+        for key, value in entries.items():
+            self._data[key] = (expires_at, value)
+
+    async def set_if_absent(self, key: str, value: str, ttl: float) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._data[key] = (self._clock() + ttl, value)
+        return True
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def delete_pattern(self, pattern: str) -> None:
+        for key in [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]:
+            del self._data[key]
+
+    async def gcra(self, key: str, interval: float, tolerance: float, pause: float = 0.0) -> float:
+        now = self._clock()
+        tat = float(self._live(key) or 0.0)
+        wait = 0.0
+        if pause > 0:
+            tat = max(tat, now + pause + tolerance)
+        else:
+            tat = max(tat, now)
+            wait = max(tat - tolerance - now, 0.0)
+            tat += interval
+        self._data[key] = (tat + 1, str(tat))
+        return wait
+
+    async def close(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._data)}
+
+
+class RedisBackend:
+    """Backend stored in Redis (or any server speaking its protocol).
+
+    ``client`` is a ``redis.asyncio.Redis``-compatible object, which lets the
+    backend run against a local fake. All keys are namespaced by ``prefix``.
+    """
+
+    shared = True
+
+    def __init__(self, client: Any, prefix: str = DEFAULT_PREFIX) -> None:
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = DEFAULT_PREFIX) -> "RedisBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "the redis state backend requires the 'redis' package (pip install redis)"
+            ) from e
+        return cls(redis.from_url(url, decode_responses=True), prefix)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    async def set_many(self, entries: dict[str, str], ttl: float) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in entries.items():
+                pipe.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+            await pipe.execute()
+
+    async def set_if_absent(self, key: str, value: str, ttl: float) -> bool:
+        return bool(await self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1), nx=True))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + k for k in keys))
+
+    async def delete_pattern(self, pattern: str) -> None:
+        keys = [k async for k in self.client.scan_iter(match=self.prefix + pattern, count=500)]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def gcra(self, key: str, interval: float, tolerance: float, pause: float = 0.0) -> float:
+        wait = await self.client.eval(_GCRA_SCRIPT, 1, self.prefix + key, interval, tolerance, pause)
+        return float(wait)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+StateBackend = MemoryBackend | RedisBackend
+
+
+def backend_from_env() -> StateBackend:
+    """Build the backend selected by ``SLACK_STATE_BACKEND`` (``memory`` or ``redis``)."""
+    kind = os.getenv(STATE_BACKEND_ENV, "memory").lower()
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "redis":
+        return RedisBackend.from_url(
+            os.getenv(STATE_REDIS_URL_ENV, DEFAULT_REDIS_URL),
+            os.getenv(STATE_PREFIX_ENV, DEFAULT_PREFIX),
+        )
+    raise RuntimeError(f"unknown {STATE_BACKEND_ENV} '{kind}' (use memory or redis)")
@@ -0,0 +1,523 @@
+"""
+Slack Message Store
+Embedded SQLite store that mirrors channel history with incremental sync
+and a full-text search index.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from mcp.server.fastmcp import Context
+
+from .pagination import collect, paginate
+
+# Environment variable names
+MESSAGE_STORE_PATH_ENV = "SLACK_MESSAGE_STORE_PATH"
+MESSAGE_STORE_CHANNELS_ENV = "SLACK_MESSAGE_STORE_CHANNELS"
+MESSAGE_STORE_SYNC_INTERVAL_ENV = "SLACK_MESSAGE_STORE_SYNC_INTERVAL"
+MESSAGE_STORE_INITIAL_LIMIT_ENV = "SLACK_MESSAGE_STORE_INITIAL_LIMIT"
+MESSAGE_STORE_REFRESH_WINDOW_ENV = "SLACK_MESSAGE_STORE_REFRESH_WINDOW"
+
+DEFAULT_SYNC_INTERVAL = 5.0
+DEFAULT_INITIAL_LIMIT = 1000
+# Newest stored messages fetched again on every sync to pick up edits,
+# deletions, reactions and reply counts
+DEFAULT_REFRESH_WINDOW = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    thread_ts TEXT,
+    user TEXT,
+    text TEXT,
+    reply_count INTEGER NOT NULL DEFAULT 0,
+    raw TEXT NOT NULL,
+    UNIQUE (channel, ts)
+);
+CREATE INDEX IF NOT EXISTS messages_user ON messages (user, ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    channel TEXT PRIMARY KEY,
+    newest_ts TEXT,
+    oldest_ts TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+# External-content FTS5 index over messages.text, kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF text ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+_TERM_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    """A locally indexed message matching a search query."""
+
+    channel: str
+    ts: str
+    user: Optional[str]
+    snippet: str
+    rank: float
+
+
+@dataclass
+class SyncState:
+    """How much of a channel's history the store holds."""
+
+    channel: str
+    newest_ts: Optional[str] = None
+    oldest_ts: Optional[str] = None
+    complete: bool = False
+    synced_at: float = 0.0
+
+
+class MessageStore:
+    """Local mirror of ``conversations.history`` keyed by ``(channel, ts)``.
+
+    The first sync of a channel fetches its most recent messages; every
+    later sync asks Slack for messages newer than the newest stored ``ts``
+    plus the ``refresh_window`` newest stored messages, which are replaced
+    by Slack's current copy (or dropped if Slack no longer has them).
+    Changes to older messages are only seen through events (or a ``full``
+    resync). ``oldest_ts``/``complete`` record how far back the local copy
+    reaches so reads outside that window can fall back to the API.
+    SQLite work runs in a worker thread behind a lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        channels: Optional[set[str]] = None,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        refresh_window: int = DEFAULT_REFRESH_WINDOW,
+    ) -> None:
+        self.path = path
+        self.channels = channels
+        self.sync_interval = sync_interval
+        self.initial_limit = initial_limit
+        self.refresh_window = refresh_window
+        self._lock = threading.Lock()
+        self._sync_locks: dict[str, asyncio.Lock] = {}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        has_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+        ).fetchone()
+        self._conn.executescript(FTS_SCHEMA)
+        if not has_fts:
+            # Index messages stored before the search index existed
+            self._conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, namespace: str = "default") -> Optional["MessageStore"]:
+        """Open the store at ``SLACK_MESSAGE_STORE_PATH``, or ``None`` if unset.
+
+        Every workspace (``namespace``) other than the default one gets its
+        own database next to that path (``messages.db`` ->
+        ``messages.<namespace>.db``), so workspaces never see each other's
+        messages. ``SLACK_MESSAGE_STORE_CHANNELS`` is a comma separated list
+        of channel IDs to mirror; empty or ``*`` mirrors every channel that
+        is read.
+        """
+        path = os.getenv(MESSAGE_STORE_PATH_ENV)
+        if not path:
+            return None
+        if namespace != "default":
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{re.sub(r'[^A-Za-z0-9_-]', '_', namespace)}{ext}"
+        channels_env = os.getenv(MESSAGE_STORE_CHANNELS_ENV, "").strip()
+        channels = None
+        if channels_env and channels_env != "*":
+            channels = {c.strip() for c in channels_env.split(",") if c.strip()}
+        return cls(
+            path,
+            channels=channels,
+            sync_interval=float(os.getenv(MESSAGE_STORE_SYNC_INTERVAL_ENV, DEFAULT_SYNC_INTERVAL)),
+            initial_limit=int(os.getenv(MESSAGE_STORE_INITIAL_LIMIT_ENV, DEFAULT_INITIAL_LIMIT)),
+            refresh_window=int(os.getenv(MESSAGE_STORE_REFRESH_WINDOW_ENV, DEFAULT_REFRESH_WINDOW)),
+        )
+
+    def enabled_for(self, channel: str) -> bool:
+        return self.channels is None or channel in self.channels
+
+    async def _run(self, func, *args):
+        def locked():
+            with self._lock:
+                return func(*args)
+
+        return await asyncio.to_thread(locked)
+
+    # -- synchronous SQLite helpers (run in a worker thread) ----------------
+
+    def _get_state(self, channel: str) -> SyncState:
+        row = self._conn.execute(
+            "SELECT * FROM sync_state WHERE channel = ?", (channel,)
+        ).fetchone()
+        if row is None:
+            return SyncState(channel)
+        return SyncState(
+            channel,
+            newest_ts=row["newest_ts"],
+            oldest_ts=row["oldest_ts"],
+            complete=bool(row["complete"]),
+            synced_at=row["synced_at"],
+        )
+
+    def _refresh_from(self, channel: str) -> Optional[str]:
+        """Return the ``ts`` of the oldest message in the refresh window."""
+        row = self._conn.execute(
+            "SELECT ts FROM messages WHERE channel = ? ORDER BY ts DESC LIMIT 1 OFFSET ?",
+            (channel, self.refresh_window - 1),
+        ).fetchone()
+        if row is not None:
+            return row["ts"]
+        row = self._conn.execute("SELECT MIN(ts) AS ts FROM messages WHERE channel = ?", (channel,)).fetchone()
+        return row["ts"]
+
+    def _save(
+        self,
+        channel: str,
+        messages: list[dict[str, Any]],
+        state: SyncState,
+        prune: Optional[tuple[str, str]] = None,
+    ) -> None:
+        if prune:
+            # Messages in the refreshed range that Slack didn't return were deleted
+            self._conn.execute(
+                """
+                DELETE FROM messages WHERE channel = ? AND ts >= ? AND ts <= ?
+                AND ts NOT IN (SELECT value FROM json_each(?))
+                """,
+                (channel, *prune, json.dumps([m["ts"] for m in messages if m.get("ts")])),
+            )
+        self._upsert(channel, messages)
+        self._conn.execute(
+            """
+            INSERT INTO sync_state (channel, newest_ts, oldest_ts, complete, synced_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (channel) DO UPDATE SET
+                newest_ts = excluded.newest_ts, oldest_ts = excluded.oldest_ts,
+                complete = excluded.complete, synced_at = excluded.synced_at
+            """,
+            (channel, state.newest_ts, state.oldest_ts, int(state.complete), state.synced_at),
+        )
+        self._conn.commit()
+
+    def _upsert(self, channel: str, messages: list[dict[str, Any]]) -> None:
+        self._conn.executemany(
+            """
+            INSERT INTO messages (channel, ts, thread_ts, user, text, reply_count, raw)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (channel, ts) DO UPDATE SET
+                thread_ts = excluded.thread_ts, user = excluded.user,
+                text = excluded.text, reply_count = excluded.reply_count,
+                raw = excluded.raw
+            """,
+            [
+                (
+                    channel,
+                    m["ts"],
+                    m.get("thread_ts"),
+                    m.get("user") or m.get("bot_id"),
+                    m.get("text", ""),
+                    int(m.get("reply_count", 0) or 0),
+                    json.dumps(m, separators=(",", ":")),
+                )
+                for m in messages
+                if m.get("ts")
+            ],
+        )
+
+    def _apply(self, channel: str, ts: str, change) -> bool:
+        """Rewrite a stored message with ``change(message)``; ``None`` deletes it."""
+        row = self._conn.execute(
+            "SELECT raw FROM messages WHERE channel = ? AND ts = ?", (channel, ts)
+        ).fetchone()
+        if row is None:
+            return False
+        message = change(json.loads(row["raw"]))
+        if message is None:
+            self._conn.execute("DELETE FROM messages WHERE channel = ? AND ts = ?", (channel, ts))
+        else:
+            self._upsert(channel, [message])
+        self._conn.commit()
+        return True
+
+    def _put(self, channel: str, message: dict[str, Any]) -> bool:
+        if not self._get_state(channel).synced_at:
+            return False
+        self._upsert(channel, [message])
+        self._conn.commit()
+        return True
+
+    def _query(
+        self,
+        channel: str,
+        limit: int,
+        oldest: Optional[str],
+        latest: Optional[str],
+    ) -> list[dict[str, Any]]:
+        sql = "SELECT raw FROM messages WHERE channel = ?"
+        args: list[Any] = [channel]
+        if oldest:
+            sql += " AND ts > ?"
+            args.append(oldest)
+        if latest:
+            sql += " AND ts < ?"
+            args.append(latest)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        args.append(limit)
+        return [json.loads(row["raw"]) for row in self._conn.execute(sql, args)]
+
+    def _search(
+        self,
+        match: str,
+        channel: Optional[str],
+        user: Optional[str],
+        after: Optional[str],
+        before: Optional[str],
+        limit: int,
+    ) -> list[SearchHit]:
+        sql = """
+            SELECT m.channel, m.ts, m.user,
+                   snippet(messages_fts, 0, '*', '*', '...', 16) AS snippet,
+                   messages_fts.rank AS rank
+            FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+            WHERE messages_fts MATCH ?
+        """
+        args: list[Any] = [match]
+        if channel:
+            sql += " AND m.channel = ?"
+            args.append(channel)
+        if user:
+            sql += " AND m.user = ?"
+            args.append(user)
+        if after:
+            sql += " AND m.ts > ?"
+            args.append(after)
+        if before:
+            sql += " AND m.ts < ?"
+            args.append(before)
+        sql += " ORDER BY messages_fts.rank LIMIT ?"
+        args.append(limit)
+        return [
+            SearchHit(row["channel"], row["ts"], row["user"], row["snippet"], row["rank"])
+            for row in self._conn.execute(sql, args)
+        ]
+
+    # -- async API -----------------------------------------------------------
+
+    async def get_state(self, channel: str) -> SyncState:
+        return await self._run(self._get_state, channel)
+
+    async def sync(
+        self,
+        slack,
+        channel: str,
+        *,
+        full: bool = False,
+        force: bool = False,
+        ctx: Optional[Context] = None,
+    ) -> SyncState:
+        """Bring the local copy of ``channel`` up to date.
+
+        Messages newer than the newest stored ``ts`` are requested, together
+        with the refresh window. With ``full`` every stored message is
+        refreshed and the history is backfilled down to the first message.
+        """
+        lock = self._sync_locks.setdefault(channel, asyncio.Lock())
+        async with lock:
+            state = await self.get_state(channel)
+            if not full and not force and time.time() - state.synced_at < self.sync_interval:
+                return state
+
+            prune = None
+            if state.newest_ts:
+                # Delta: everything after the newest message we hold, and
+                # the refresh window (with ``full``, every stored message) again
+                since = None
+                if full:
+                    since = state.oldest_ts
+                elif self.refresh_window > 0:
+                    since = await self._run(self._refresh_from, channel)
+                started = f"{time.time():.6f}"
+                result = await collect(
+                    paginate(
+                        slack.conversations_history,
+                        "conversations.history",
+                        "messages",
+                        ctx=ctx,
+                        channel=channel,
+                        oldest=since or state.newest_ts,
+                        inclusive=bool(since),
+                    )
+                )
+                if since:
+                    # Messages stored by events after the request started are kept
+                    prune = (since, started)
+            else:
+                result = await collect(
+                    paginate(
+                        slack.conversations_history,
+                        "conversations.history",
+                        "messages",
+                        max_items=self.initial_limit,
+                        ctx=ctx,
+                        channel=channel,
+                    ),
+                    self.initial_limit,
+                )
+                state.complete = not result.next_cursor
+            messages = result.items
+
+            if full and not state.complete:
+                backfill = await collect(
+                    paginate(
+                        slack.conversations_history,
+                        "conversations.history",
+                        "messages",
+                        ctx=ctx,
+                        channel=channel,
+                        latest=_min_ts(state.oldest_ts, messages),
+                    )
+                )
+                messages = messages + backfill.items
+                state.complete = True
+
+            timestamps = [m["ts"] for m in messages if m.get("ts")]
+            if timestamps:
+                state.newest_ts = max([*timestamps, state.newest_ts or ""])
+                state.oldest_ts = min([*timestamps, *([state.oldest_ts] if state.oldest_ts else [])])
+            state.synced_at = time.time()
+            await self._run(self._save, channel, messages, state, prune)
+            return state
+
+    async def read(
+        self,
+        channel: str,
+        limit: int,
+        oldest: Optional[str] = None,
+        latest: Optional[str] = None,
+    ) -> Optional[list[dict[str, Any]]]:
+        """Return messages newest first, or ``None`` if the store can't answer.
+
+        The store can answer when the requested window lies within the
+        synced range, or when it already holds ``limit`` matching messages.
+        """
+        state = await self.get_state(channel)
+        if not state.synced_at:
+            return None
+        messages = await self._run(self._query, channel, limit, oldest, latest)
+        if len(messages) >= limit or state.complete:
+            return messages
+        if oldest and state.oldest_ts and oldest >= state.oldest_ts:
+            return messages
+        return None
+
+    async def put(self, channel: str, message: dict[str, Any]) -> bool:
+        """Store a message delivered by an event, if ``channel`` is mirrored.
+
+        Sync state is left alone, so the next delta sync still covers any
+        events that were missed.
+        """
+        return await self._run(self._put, channel, message)
+
+    async def apply(self, channel: str, ts: str, change) -> bool:
+        """Apply ``change`` to a stored message (``None`` result deletes it)."""
+        return await self._run(self._apply, channel, ts, change)
+
+    async def search(
+        self,
+        query: str,
+        *,
+        channel: Optional[str] = None,
+        user: Optional[str] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[SearchHit]:
+        """Full-text search over stored messages, best matches (BM25) first.
+
+        ``query`` is split into words that must all match; a trailing ``*``
+        makes a word a prefix match. ``after``/``before`` accept a Slack ``ts``
+        or an ISO date.
+        """
+        match = to_match_expression(query)
+        if not match:
+            return []
+        return await self._run(
+            self._search,
+            match,
+            channel,
+            user,
+            to_ts(after),
+            to_ts(before),
+            limit,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _min_ts(oldest_ts: Optional[str], messages: list[dict[str, Any]]) -> Optional[str]:
+    candidates = [m["ts"] for m in messages if m.get("ts")]
+    if oldest_ts:
+        candidates.append(oldest_ts)
+    return min(candidates) if candidates else None
+
+
+def to_match_expression(query: str) -> str:
+    """Turn free text into an FTS5 expression of quoted (AND-ed) terms."""
+    terms = []
+    for term in _TERM_RE.findall(query):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def to_ts(value: Optional[str]) -> Optional[str]:
+    """Normalise a Slack ``ts`` or ISO date/datetime into a ``ts`` string."""
+    if not value:
+        return None
+    if "-" not in value:
+        return value
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return f"{parsed.timestamp():.6f}"
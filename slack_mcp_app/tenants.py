@@ -0,0 +1,231 @@
+"""
+Slack Workspace Tenants
+Route each MCP request to the Slack workspace (tenant) it belongs to, with
+lazily created and evicted per-tenant clients and caches.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .budget import ResponseBudget
+from .cache import DirectoryCache
+from .jobs import JobQueue
+from .ratelimit import RateLimitScheduler
+from .state import StateBackend
+from .store import MessageStore
+
+if TYPE_CHECKING:
+    from slack_sdk.web.async_client import AsyncWebClient
+
+# Environment variable names
+SLACK_BOT_TOKEN_ENV = "SLACK_BOT_TOKEN"
+SLACK_USER_TOKEN_ENV = "SLACK_USER_TOKEN"
+API_KEYS_ENV = "SLACK_MCP_API_KEYS"
+TENANTS_ENV = "SLACK_TENANTS"
+TENANTS_FILE_ENV = "SLACK_TENANTS_FILE"
+TENANT_MAX_ACTIVE_ENV = "SLACK_TENANT_MAX_ACTIVE"
+TENANT_IDLE_TTL_ENV = "SLACK_TENANT_IDLE_TTL"
+
+# Tenant served from SLACK_BOT_TOKEN / SLACK_USER_TOKEN and used when a
+# request carries no API key
+DEFAULT_TENANT = "default"
+DEFAULT_MAX_ACTIVE = 100
+DEFAULT_IDLE_TTL = 900.0
+
+
+@dataclass
+class TenantTokens:
+    bot_token: str
+    user_token: Optional[str] = None
+    # Keys MCP clients present (``Authorization: Bearer <key>``) to use this tenant
+    api_keys: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Tenant:
+    """Per-workspace resources, shaped like the server's ``AppContext``."""
+
+    id: str
+    slack_bot: "AsyncWebClient"
+    slack_user: Optional["AsyncWebClient"] = None
+    directory: Optional[DirectoryCache] = None
+    scheduler: Optional[RateLimitScheduler] = None
+    store: Optional[MessageStore] = None
+    state: Optional[StateBackend] = None
+    jobs: Optional[JobQueue] = None
+    responses: Optional[ResponseBudget] = None
+    last_used: float = 0.0
+
+
+def load_tenant_tokens() -> dict[str, TenantTokens]:
+    """Read tenant tokens from the environment.
+
+    ``SLACK_TENANTS`` (or the file named by ``SLACK_TENANTS_FILE``) holds a
+    JSON object ``{"tenant": {"bot_token": ..., "user_token": ...,
+    "api_keys": [...]}}``. ``SLACK_BOT_TOKEN``/``SLACK_USER_TOKEN`` define
+    the ``default`` tenant, whose API keys (if any) are the comma separated
+    ``SLACK_MCP_API_KEYS``.
+    """
+    raw = os.getenv(TENANTS_ENV)
+    if not raw and os.getenv(TENANTS_FILE_ENV):
+        raw = Path(os.environ[TENANTS_FILE_ENV]).read_text()
+    tokens = {
+        tenant: TenantTokens(
+            bot_token=conf["bot_token"],
+            user_token=conf.get("user_token"),
+            api_keys=list(conf.get("api_keys", [])),
+        )
+        for tenant, conf in json.loads(raw or "{}").items()
+    }
+    if os.getenv(SLACK_BOT_TOKEN_ENV):
+        tokens.setdefault(
+            DEFAULT_TENANT,
+            TenantTokens(
+                os.environ[SLACK_BOT_TOKEN_ENV],
+                os.getenv(SLACK_USER_TOKEN_ENV),
+                [k.strip() for k in os.getenv(API_KEYS_ENV, "").split(",") if k.strip()],
+            ),
+        )
+    return tokens
+
+
+def _digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class TenantRegistry:
+    """Resolve tenants per request and keep their clients warm.
+
+    The tenant of an HTTP request is chosen by the API key it presents
+    (``Authorization: Bearer <key>``), never by a name the client picks:
+    each key is configured for exactly one tenant. Requests without a key
+    go to the default tenant unless it has keys of its own; requests
+    without an HTTP transport (stdio) are trusted and use the default
+    tenant.
+
+    Clients are created on first use and evicted after ``idle_ttl`` seconds
+    without requests, or least recently used first once more than
+    ``max_active`` tenants are active. All tenants share the process-wide
+    HTTP pool; rate limit budgets are isolated by using the tenant id as the
+    scheduler scope, and ``store_factory`` gives every tenant its own message
+    store.
+    """
+
+    def __init__(
+        self,
+        tokens: dict[str, TenantTokens],
+        client_factory: Callable[[str, str], "AsyncWebClient"],
+        *,
+        directory_factory: Callable[[str], Optional[DirectoryCache]] = lambda tenant: DirectoryCache.from_env(),
+        store_factory: Callable[[str], Optional[MessageStore]] = lambda tenant: None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        state: Optional[StateBackend] = None,
+        jobs: Optional[JobQueue] = None,
+        responses: Optional[ResponseBudget] = None,
+        max_active: int = DEFAULT_MAX_ACTIVE,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tokens = tokens
+        self.max_active = max_active
+        self.idle_ttl = idle_ttl
+        self._client_factory = client_factory
+        self._directory_factory = directory_factory
+        self._store_factory = store_factory
+        self._scheduler = scheduler
+        self._state = state
+        self._jobs = jobs
+        self._responses = responses
+        self._clock = clock
+        self._active: "OrderedDict[str, Tenant]" = OrderedDict()
+        self._keys = {_digest(key): tenant for tenant, conf in tokens.items() for key in conf.api_keys}
+        self._counters = {"created": 0, "evicted": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls, client_factory: Callable[[str, str], "AsyncWebClient"], **kwargs: Any) -> "TenantRegistry":
+        return cls(
+            load_tenant_tokens(),
+            client_factory,
+            max_active=int(os.getenv(TENANT_MAX_ACTIVE_ENV, DEFAULT_MAX_ACTIVE)),
+            idle_ttl=float(os.getenv(TENANT_IDLE_TTL_ENV, DEFAULT_IDLE_TTL)),
+            **kwargs,
+        )
+
+    def resolve(self, request_context: Any) -> str:
+        """Return the tenant id of an MCP request.
+
+        Raises ``PermissionError`` for an unknown API key, or for a request
+        without one when the default tenant requires a key.
+        """
+        request = getattr(request_context, "request", None)
+        headers = getattr(request, "headers", None)
+        if headers is None:
+            return DEFAULT_TENANT
+        scheme, _, api_key = (headers.get("authorization") or "").partition(" ")
+        if scheme.lower() == "bearer" and api_key.strip():
+            tenant = self._keys.get(_digest(api_key.strip()))
+            if tenant is None:
+                self._counters["rejected"] += 1
+                raise PermissionError("Unknown API key")
+            return tenant
+        default = self.tokens.get(DEFAULT_TENANT)
+        if default is None or default.api_keys:
+            self._counters["rejected"] += 1
+            raise PermissionError("An API key is required (Authorization: Bearer <key>)")
+        return DEFAULT_TENANT
+
+    def get(self, tenant_id: str) -> Tenant:
+        """Return the tenant's resources, creating them on first use."""
+        now = self._clock()
+        self._evict_idle(now)
+        tenant = self._active.get(tenant_id)
+        if tenant is None:
+            tokens = self.tokens.get(tenant_id)
+            if tokens is None:
+                raise RuntimeError(f"Unknown Slack tenant '{tenant_id}'")
+            tenant = Tenant(
+                id=tenant_id,
+                slack_bot=self._client_factory(tokens.bot_token, tenant_id),
+                slack_user=(
+                    self._client_factory(tokens.user_token, tenant_id) if tokens.user_token else None
+                ),
+                directory=self._directory_factory(tenant_id),
+                scheduler=self._scheduler,
+                store=self._store_factory(tenant_id),
+                state=self._state,
+                jobs=self._jobs,
+                responses=self._responses,
+            )
+            self._active[tenant_id] = tenant
+            self._counters["created"] += 1
+            while len(self._active) > self.max_active:
+                self._active.popitem(last=False)
+                self._counters["evicted"] += 1
+        self._active.move_to_end(tenant_id)
+        tenant.last_used = now
+        return tenant
+
+    def for_request(self, request_context: Any) -> Tenant:
+        return self.get(self.resolve(request_context))
+
+    def _evict_idle(self, now: float) -> None:
+        while self._active:
+            tenant = next(iter(self._active.values()))
+            if now - tenant.last_used < self.idle_ttl:
+                break
+            self._active.popitem(last=False)
+            self._counters["evicted"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "configured": len(self.tokens),
+            "active": len(self._active),
+            "max_active": self.max_active,
+            **self._counters,
+        }
@@ -3,45 +3,362 @@ Slack MCP Tools
 All MCP tool implementations for Slack operations.
 """
 
+import asyncio
+import inspect
+import json
 import os
+import re
+from typing import Any, Awaitable, Callable
+import aiohttp
 from mcp.server.fastmcp import Context
+from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
+from .analytics import MessageFilter, aggregate, parse_aggregates
+from .cache import DirectoryCache
+from .export import export_ndjson, resolve_export_path
+from .formatting import render, render_status
+from .jobs import DONE, FAILED, UNKNOWN
+from .pagination import collect, paginate, paginate_pages, report_progress
+from .store import MessageStore
+from .tenants import DEFAULT_TENANT
+from .uploads import UploadSource, upload_files
+
 # Environment variable names
 SLACK_BOT_TOKEN_ENV = "SLACK_BOT_TOKEN"
 SLACK_USER_TOKEN_ENV = "SLACK_USER_TOKEN"
 
+# Seconds an idempotency key remembers the result of its request
+IDEMPOTENCY_TTL = 24 * 3600
+# Seconds an idempotency key stays reserved while its request runs; if the
+# process dies mid-call the key frees up after this instead of a day
+IDEMPOTENCY_LEASE = 120
+
+
+def _get_app_context(ctx: Context | None):
+    """Helper to retrieve the request's workspace context or ``None`` outside a request.
+
+    With a tenant registry in the lifespan context this is the ``Tenant``
+    the request is routed to, which exposes the same fields as ``AppContext``.
+    """
+    if ctx is None:
+        return None
+    try:
+        request_context = ctx.request_context
+        app = request_context.lifespan_context
+    except (AttributeError, ValueError):
+        return None
+    tenants = getattr(app, "tenants", None)
+    if tenants is None:
+        return app
+    return tenants.for_request(request_context)
+
+
+# Clients used when a tool runs outside an MCP request, keyed by token so
+# repeated direct calls reuse one client instead of building a new one.
+_fallback_clients: dict[str, AsyncWebClient] = {}
+
+
+def _fallback_client(token: str) -> AsyncWebClient:
+    """Return a cached client wired to the server's shared HTTP pool."""
+    client = _fallback_clients.get(token)
+    if client is None:
+        # Imported lazily: the server module imports this module at load time
+        from .slack_mcp_server import create_slack_client
+
+        client = _fallback_clients[token] = create_slack_client(token)
+    return client
+
 
 def _get_slack_bot(ctx: Context) -> AsyncWebClient:
     """Helper to retrieve the Bot Slack client from the lifespan context."""
-    if ctx is None or ctx.lifespan_context is None:
-        # Fallback to create a new client if context is not available
+    app = _get_app_context(ctx)
+    if app is None:
+        # Fallback to the shared client if context is not available
         token = os.getenv(SLACK_BOT_TOKEN_ENV)
         if not token:
             raise RuntimeError(
                 f"{SLACK_BOT_TOKEN_ENV} environment variable must be set"
             )
-        return AsyncWebClient(token=token)
+        return _fallback_client(token)
 
-    return ctx.lifespan_context.slack_bot
+    return app.slack_bot
 
 
 def _get_slack_user(ctx: Context) -> AsyncWebClient:
     """Helper to retrieve the User Slack client from the lifespan context."""
-    if (
-        ctx is None
-        or ctx.lifespan_context is None
-        or ctx.lifespan_context.slack_user is None
-    ):
-        # Fallback to create a new client if context is not available
-        token = os.getenv(SLACK_USER_TOKEN_ENV)
+    app = _get_app_context(ctx)
+    if app is None or app.slack_user is None:
+        # Fallback to the shared client if context is not available; a
+        # workspace without a user token never borrows the default one.
+        token = os.getenv(SLACK_USER_TOKEN_ENV) if app is None else None
         if not token:
             raise RuntimeError(
                 f"{SLACK_USER_TOKEN_ENV} environment variable must be set for user operations"
             )
-        return AsyncWebClient(token=token)
+        return _fallback_client(token)
+
+    return app.slack_user
+
+
+def _get_directory(ctx: Context | None) -> DirectoryCache | None:
+    """Helper to retrieve the shared directory cache, if the server provides one."""
+    app = _get_app_context(ctx)
+    return getattr(app, "directory", None)
+
+
+def _get_store(ctx: Context | None, channel: str) -> MessageStore | None:
+    """Helper to retrieve the local message store if it mirrors ``channel``."""
+    store = getattr(_get_app_context(ctx), "store", None)
+    if store is not None and store.enabled_for(channel):
+        return store
+    return None
+
+
+async def _invalidate_channel(ctx: Context | None, channel: str) -> None:
+    """Drop cached state for a channel after a write that changes it."""
+    directory = _get_directory(ctx)
+    if directory:
+        await directory.invalidate_channel(channel)
+
+
+async def _once(ctx: Context | None, scope: str, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a Slack write at most once per idempotency ``key``.
+
+    A repeated key (from a client retry, possibly on another replica) replays
+    the stored response instead of calling Slack again. While the call runs
+    the key is only leased for ``IDEMPOTENCY_LEASE`` seconds; failed calls
+    release it so they can be retried.
+    """
+    app = _get_app_context(ctx)
+    state = getattr(app, "state", None)
+    if not key or state is None:
+        return await call()
+    state_key = f"idem:{getattr(app, 'id', 'default')}:{scope}:{key}"
+    if not await state.set_if_absent(state_key, "", IDEMPOTENCY_LEASE):
+        previous = await state.get(state_key)
+        if previous:
+            return json.loads(previous)
+        return {"ok": False, "error": f"a request with idempotency_key '{key}' is already in progress"}
+    try:
+        resp = await call()
+    except BaseException:
+        await state.delete(state_key)
+        raise
+    if resp.get("ok"):
+        await state.set(state_key, json.dumps(dict(resp.data if hasattr(resp, "data") else resp)), IDEMPOTENCY_TTL)
+    else:
+        await state.delete(state_key)
+    return resp
+
+
+async def _background(
+    ctx: Context | None,
+    action: str,
+    method: str,
+    args: dict[str, Any],
+    output_format: str,
+    fields: str,
+    idempotency_key: str = "",
+) -> str:
+    """Queue a Slack write on the durable job queue and report its job ID."""
+    app = _get_app_context(ctx)
+    jobs = getattr(app, "jobs", None)
+    if jobs is None:
+        return "Error: background jobs are not enabled (set SLACK_JOB_QUEUE_PATH)"
+    job = await jobs.submit(getattr(app, "id", DEFAULT_TENANT), action, method, args, idempotency_key)
+    return render_status(
+        {"ok": True, "job_id": job.id, "status": job.status},
+        output_format,
+        fields,
+        f"Queued as job {job.id} ({job.status}). Check it with get_job_status.",
+    )
+
+
+def _budget(limit: int) -> int | None:
+    """Translate a tool ``limit`` argument into a pagination budget (0 = no cap)."""
+    return limit if limit and limit > 0 else None
+
+
+def _with_cursor(lines: list[str], next_cursor: str) -> list[str]:
+    """Append the resume token so callers can continue where this call stopped."""
+    if next_cursor:
+        lines.append(f"Next cursor: {next_cursor}")
+    return lines
+
+
+# =============================================================================
+# USER RESOLUTION
+# =============================================================================
+# Message tools accept ``resolve_users`` to replace author IDs and ``<@U…>``
+# mentions with display names, looked up once per response.
+
+MENTION_PATTERN = re.compile(r"<@([UW][A-Z0-9]+)(?:\|[^>]*)?>")
+# Misses above this count are resolved from ``users.list`` pages instead of
+# one ``users.info`` call each
+USERS_LIST_THRESHOLD = 25
+# ``users.list`` is Tier 2 without burst; users still missing after this many
+# pages (external, deleted or bot IDs never appear) fall back to ``users.info``
+USERS_LIST_MAX_PAGES = 3
+USER_LOOKUP_CONCURRENCY = 8
+
+
+def _display_name(user: dict) -> str:
+    profile = user.get("profile", {})
+    return profile.get("display_name") or profile.get("real_name") or user.get("name") or user.get("id", "")
+
+
+async def _user_names(ctx: Context | None, user_ids: set[str]) -> dict[str, str]:
+    """Map ``user_ids`` to display names using the directory cache, then Slack.
+
+    Users missing from the cache are fetched in bulk (up to
+    ``USERS_LIST_MAX_PAGES`` ``users.list`` pages, stopping once all are
+    found) when there are many of them; whatever is still missing is looked
+    up with concurrent ``users.info`` calls. IDs that can't be resolved are
+    left out of the result.
+    """
+    directory = _get_directory(ctx)
+    ids = sorted(user_ids)
+    cached = await asyncio.gather(*(directory.get_user(u) for u in ids)) if directory else [None] * len(ids)
+    names = {u: _display_name(user) for u, user in zip(ids, cached) if user}
+    missing = {u for u in ids if u not in names}
+    if not missing:
+        return names
+
+    slack = _get_slack_bot(ctx)
+    found: list[dict] = []
+    semaphore = asyncio.Semaphore(USER_LOOKUP_CONCURRENCY)
+
+    async def lookup(user_id: str) -> dict | None:
+        async with semaphore:
+            try:
+                return (await slack.users_info(user=user_id)).get("user")
+            except SlackApiError:
+                return None
+
+    if len(missing) >= USERS_LIST_THRESHOLD:
+        pages = 0
+        try:
+            async for page in paginate(slack.users_list, "users.list", "members"):
+                found.extend(page.items)
+                missing -= {u.get("id") for u in page.items}
+                pages += 1
+                if not missing or pages >= USERS_LIST_MAX_PAGES:
+                    break
+        except SlackApiError:
+            # Resolution is best effort; look the rest up one by one
+            pass
+    found.extend(u for u in await asyncio.gather(*(lookup(u) for u in missing)) if u)
+
+    if directory and found:
+        await directory.put_users(found)
+    names.update((u["id"], _display_name(u)) for u in found if u.get("id") in user_ids)
+    return names
+
+
+async def _mentioned_names(ctx: Context | None, messages: list[dict]) -> dict[str, str]:
+    """Resolve every author and mentioned user of ``messages`` in one lookup."""
+    user_ids = {m["user"] for m in messages if m.get("user")}
+    for msg in messages:
+        user_ids.update(MENTION_PATTERN.findall(msg.get("text") or ""))
+    return await _user_names(ctx, user_ids) if user_ids else {}
+
+
+def _with_names(msg: dict, names: dict[str, str]) -> dict:
+    """Return a copy of ``msg`` with ``user_name`` set and mentions rewritten to ``@name``."""
+
+    def mention(match: re.Match) -> str:
+        name = names.get(match.group(1))
+        return f"@{name}" if name else match.group(0)
+
+    return dict(
+        msg,
+        text=MENTION_PATTERN.sub(mention, msg.get("text") or ""),
+        user_name=names.get(msg.get("user")),
+    )
+
+
+async def _resolve_users(ctx: Context | None, messages: list[dict]) -> list[dict]:
+    names = await _mentioned_names(ctx, messages)
+    return [_with_names(m, names) for m in messages]
+
+
+def _author(msg: dict) -> str:
+    return msg.get("user_name") or msg.get("user", "unknown")
+
+
+def _message_fields(default: list[str], resolve_users: bool) -> list[str]:
+    """Add ``user_name`` after ``user`` to a default projection when names were resolved."""
+    if not resolve_users or "user" not in default:
+        return default
+    i = default.index("user") + 1
+    return [*default[:i], "user_name", *default[i:]]
+
+
+# =============================================================================
+# OUTPUT RECORDS
+# =============================================================================
+# Flat records used by the compact ``tsv``/``json`` output formats. Every tool
+# accepts ``output_format`` ("text", "tsv" or "json") and ``fields``, a comma
+# separated projection applied to these records.
+
+def _channel_record(channel: dict) -> dict:
+    return {
+        "id": channel.get("id"),
+        "name": channel.get("name"),
+        "is_private": channel.get("is_private"),
+        "is_archived": channel.get("is_archived"),
+        "num_members": channel.get("num_members"),
+        "topic": (channel.get("topic") or {}).get("value"),
+        "purpose": (channel.get("purpose") or {}).get("value"),
+        "created": channel.get("created"),
+    }
 
-    return ctx.lifespan_context.slack_user
+
+def _user_record(user: dict) -> dict:
+    profile = user.get("profile", {})
+    return {
+        "id": user.get("id"),
+        "name": user.get("name"),
+        "real_name": profile.get("real_name") or user.get("real_name"),
+        "display_name": profile.get("display_name"),
+        "email": profile.get("email"),
+        "title": profile.get("title"),
+        "status": profile.get("status_text"),
+        "tz": user.get("tz"),
+        "is_bot": user.get("is_bot"),
+        "is_admin": user.get("is_admin"),
+        "deleted": user.get("deleted"),
+    }
+
+
+def _message_record(msg: dict) -> dict:
+    return {
+        "ts": msg.get("ts"),
+        "user": msg.get("user") or msg.get("bot_id"),
+        "user_name": msg.get("user_name"),
+        "text": msg.get("text"),
+        "thread_ts": msg.get("thread_ts"),
+        "reply_count": msg.get("reply_count"),
+        "reactions": ",".join(
+            f"{r.get('name')}:{r.get('count', 0)}" for r in msg.get("reactions", [])
+        ),
+        "files": len(msg.get("files", [])) or None,
+        "subtype": msg.get("subtype"),
+    }
+
+
+def _file_record(file: dict) -> dict:
+    return {
+        "id": file.get("id"),
+        "name": file.get("name"),
+        "filetype": file.get("filetype"),
+        "title": file.get("title"),
+        "size": file.get("size"),
+        "user": file.get("user"),
+        "created": file.get("created"),
+        "permalink": file.get("permalink"),
+    }
 
 
 # =============================================================================
@@ -49,40 +366,121 @@ def _get_slack_user(ctx: Context) -> AsyncWebClient:
 # =============================================================================
 
 async def list_channels(
-    limit: int = 100, ctx: Context | None = None
+    limit: int = 100,
+    cursor: str = "",
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """List public Slack channels that the bot has access to."""
-    slack = _get_slack_bot(ctx)
-    response = await slack.conversations_list(limit=limit, exclude_archived=True)
-    channels = response.get("channels", [])
-    lines = [f"{c['id']} | {c['name']}" for c in channels]
-    return "\n".join(lines)
+    """List public Slack channels that the bot has access to.
+
+    ``limit`` caps the number of channels returned (0 = all). When more remain,
+    the output ends with a ``Next cursor`` token to pass back as ``cursor``.
+    """
+    directory = _get_directory(ctx)
+    result = await directory.get_listing("channels", limit, cursor) if directory else None
+    if result is None:
+        slack = _get_slack_bot(ctx)
+        budget = _budget(limit)
+        result = await collect(
+            paginate(
+                slack.conversations_list,
+                "conversations.list",
+                "channels",
+                max_items=budget,
+                cursor=cursor,
+                ctx=ctx,
+                exclude_archived=True,
+            ),
+            budget,
+        )
+        if directory:
+            await directory.put_channels(result.items)
+            await directory.put_listing("channels", limit, cursor, value=result)
+
+    def text() -> str:
+        lines = [f"{c['id']} | {c['name']}" for c in result.items]
+        return "\n".join(_with_cursor(lines, result.next_cursor))
+
+    return render(
+        [_channel_record(c) for c in result.items],
+        output_format,
+        fields,
+        ["id", "name"],
+        text,
+        result.next_cursor,
+    )
 
 
 async def list_users(
-    limit: int = 100, ctx: Context | None = None
+    limit: int = 100,
+    cursor: str = "",
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """List users in the Slack workspace."""
-    slack = _get_slack_bot(ctx)
-    response = await slack.users_list(limit=limit)
-    users = response.get("members", [])
-    lines = []
-    for user in users:
-        if not user.get("deleted", False):
+    """List users in the Slack workspace.
+
+    ``limit`` caps the number of members fetched (0 = all). When more remain,
+    the output ends with a ``Next cursor`` token to pass back as ``cursor``.
+    """
+    directory = _get_directory(ctx)
+    result = await directory.get_listing("users", limit, cursor) if directory else None
+    if result is None:
+        slack = _get_slack_bot(ctx)
+        budget = _budget(limit)
+        result = await collect(
+            paginate(
+                slack.users_list,
+                "users.list",
+                "members",
+                max_items=budget,
+                cursor=cursor,
+                ctx=ctx,
+            ),
+            budget,
+        )
+        if directory:
+            await directory.put_users(result.items)
+            await directory.put_listing("users", limit, cursor, value=result)
+    users = [u for u in result.items if not u.get("deleted", False)]
+
+    def text() -> str:
+        lines = []
+        for user in users:
             name = user.get("real_name", user.get("name", "Unknown"))
             lines.append(f"{user['id']} | {name}")
-    return "\n".join(lines)
+        return "\n".join(_with_cursor(lines, result.next_cursor))
+
+    return render(
+        [_user_record(u) for u in users],
+        output_format,
+        fields,
+        ["id", "real_name"],
+        text,
+        result.next_cursor,
+    )
 
 
 async def get_user_info(
-    user_id: str, ctx: Context | None = None
+    user_id: str,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Get detailed information about a user."""
-    slack = _get_slack_bot(ctx)
-    response = await slack.users_info(user=user_id)
-    
-    if response.get("ok"):
+    directory = _get_directory(ctx)
+    user = await directory.get_user(user_id) if directory else None
+    if user is None:
+        slack = _get_slack_bot(ctx)
+        response = await slack.users_info(user=user_id)
+        if not response.get("ok"):
+            return f"Error: {response.get('error', 'unknown error')}"
         user = response.get("user", {})
+        if directory:
+            await directory.put_user(user)
+    
+    def text() -> str:
         profile = user.get("profile", {})
         
         info = []
@@ -95,22 +493,41 @@ async def get_user_info(
         info.append(f"Timezone: {user.get('tz', 'N/A')}")
         
         return "\n".join(info)
-    else:
-        return f"Error: {response.get('error', 'unknown error')}"
+
+    return render(
+        _user_record(user),
+        output_format,
+        fields,
+        ["id", "name", "real_name", "email", "title", "status", "tz"],
+        text,
+    )
 
 
 async def find_user_by_email(
-    email: str, ctx: Context | None = None
+    email: str,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Find a user by their email address."""
-    slack = _get_slack_bot(ctx)
-    response = await slack.users_lookupByEmail(email=email)
-    
-    if response.get("ok"):
+    directory = _get_directory(ctx)
+    user = await directory.get_user_by_email(email) if directory else None
+    if user is None:
+        slack = _get_slack_bot(ctx)
+        response = await slack.users_lookupByEmail(email=email)
+        if not response.get("ok"):
+            return f"Error: {response.get('error', 'user not found')}"
         user = response.get("user", {})
-        return f"User found: {user.get('id')} | {user.get('name')} | {user.get('real_name', '')}"
-    else:
-        return f"Error: {response.get('error', 'user not found')}"
+        if directory:
+            await directory.put_user(user)
+    
+    return render(
+        _user_record(user),
+        output_format,
+        fields,
+        ["id", "name", "real_name"],
+        lambda: f"User found: {user.get('id')} | {user.get('name')} | {user.get('real_name', '')}",
+    )
 
 
 # =============================================================================
@@ -118,57 +535,181 @@ async def find_user_by_email(
 # =============================================================================
 
 async def send_message(
-    channel: str, text: str, ctx: Context | None = None
+    channel: str,
+    text: str,
+    idempotency_key: str = "",
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Send a message to a Slack channel."""
+    """Send a message to a Slack channel.
+
+    Retries carrying the same ``idempotency_key`` return the first result
+    instead of posting again. With ``background`` the message is queued and
+    a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "send_message", "chat_postMessage", {"channel": channel, "text": text},
+            output_format, fields, idempotency_key,
+        )
     slack = _get_slack_bot(ctx)
-    resp = await slack.chat_postMessage(channel=channel, text=text)
+    resp = await _once(
+        ctx,
+        "send_message",
+        idempotency_key,
+        lambda: slack.chat_postMessage(channel=channel, text=text),
+    )
     
     if resp.get("ok"):
-        return f"Message sent successfully. Timestamp: {resp.get('ts', '')}"
+        return render_status(
+            {"ok": True, "channel": resp.get("channel", channel), "ts": resp.get("ts", "")},
+            output_format,
+            fields,
+            f"Message sent successfully. Timestamp: {resp.get('ts', '')}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
+async def send_messages_bulk(
+    messages: list[dict[str, str]] | None = None,
+    channels: list[str] | None = None,
+    text: str = "",
+    max_concurrency: int = 20,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Send messages to many channels in one call.
+
+    Pass ``messages`` as ``[{"channel": ..., "text": ...}]`` for per-target
+    text, or ``channels`` plus a shared ``text``. Posts run concurrently and
+    are paced by the shared rate limit scheduler.
+    """
+    slack = _get_slack_bot(ctx)
+    targets = [(m.get("channel", ""), m.get("text") or text) for m in messages or []]
+    targets += [(channel, text) for channel in channels or []]
+    if not targets:
+        return "Error: no messages to send"
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def post(channel: str, body: str) -> dict:
+        if not channel or not body:
+            return {"channel": channel or "-", "ok": False, "error": "missing channel or text"}
+        async with semaphore:
+            try:
+                resp = await slack.chat_postMessage(channel=channel, text=body)
+            except SlackApiError as e:
+                return {"channel": channel, "ok": False, "error": e.response.get("error", "unknown error")}
+            except Exception as e:
+                # A network failure on one target must not hide what the others did
+                return {"channel": channel, "ok": False, "error": str(e) or type(e).__name__}
+        if resp.get("ok"):
+            return {"channel": channel, "ok": True, "ts": resp.get("ts", "")}
+        return {"channel": channel, "ok": False, "error": resp.get("error", "unknown error")}
+
+    results = await asyncio.gather(*(post(channel, body) for channel, body in targets))
+
+    def table() -> str:
+        sent = sum(1 for r in results if r["ok"])
+        rows = [
+            f"{r['channel']} | ok | {r['ts']}" if r["ok"] else f"{r['channel']} | error | {r['error']}"
+            for r in results
+        ]
+        return "\n".join([f"Sent {sent}/{len(rows)}", *rows])
+
+    return render(results, output_format, fields, ["channel", "ok", "ts", "error"], table)
+
+
 async def reply_to_message(
-    channel: str, thread_ts: str, text: str, ctx: Context | None = None
+    channel: str,
+    thread_ts: str,
+    text: str,
+    idempotency_key: str = "",
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Reply to a specific thread in a Slack channel."""
+    """Reply to a specific thread in a Slack channel.
+
+    With ``background`` the reply is queued and a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "reply_to_message", "chat_postMessage",
+            {"channel": channel, "text": text, "thread_ts": thread_ts},
+            output_format, fields, idempotency_key,
+        )
     slack = _get_slack_bot(ctx)
-    resp = await slack.chat_postMessage(
-        channel=channel, text=text, thread_ts=thread_ts
+    resp = await _once(
+        ctx,
+        "reply_to_message",
+        idempotency_key,
+        lambda: slack.chat_postMessage(channel=channel, text=text, thread_ts=thread_ts),
     )
     
     if resp.get("ok"):
-        return f"Reply sent successfully. Timestamp: {resp.get('ts', '')}"
+        return render_status(
+            {"ok": True, "channel": resp.get("channel", channel), "ts": resp.get("ts", ""), "thread_ts": thread_ts},
+            output_format,
+            fields,
+            f"Reply sent successfully. Timestamp: {resp.get('ts', '')}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def delete_message(
-    channel: str, ts: str, ctx: Context | None = None
+    channel: str,
+    ts: str,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Delete a message from a Slack channel."""
     slack = _get_slack_bot(ctx)
     resp = await slack.chat_delete(channel=channel, ts=ts)
     
     if resp.get("ok"):
-        return "Message deleted successfully"
+        return render_status(
+            {"ok": True, "channel": channel, "ts": ts},
+            output_format,
+            fields,
+            "Message deleted successfully",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def schedule_message(
-    channel: str, text: str, post_at: int, ctx: Context | None = None
+    channel: str,
+    text: str,
+    post_at: int,
+    idempotency_key: str = "",
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Schedule a message for later delivery."""
     slack = _get_slack_bot(ctx)
-    resp = await slack.chat_scheduleMessage(
-        channel=channel, text=text, post_at=post_at
+    resp = await _once(
+        ctx,
+        "schedule_message",
+        idempotency_key,
+        lambda: slack.chat_scheduleMessage(channel=channel, text=text, post_at=post_at),
     )
     
     if resp.get("ok"):
-        return f"Message scheduled successfully. ID: {resp.get('scheduled_message_id', '')}"
+        return render_status(
+            {"ok": True, "scheduled_message_id": resp.get("scheduled_message_id", ""), "post_at": post_at},
+            output_format,
+            fields,
+            f"Message scheduled successfully. ID: {resp.get('scheduled_message_id', '')}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
@@ -178,40 +719,83 @@ async def schedule_message(
 # =============================================================================
 
 async def add_reaction(
-    channel: str, timestamp: str, name: str, ctx: Context | None = None
+    channel: str,
+    timestamp: str,
+    name: str,
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Add a reaction emoji to a message in Slack."""
+    """Add a reaction emoji to a message in Slack.
+
+    With ``background`` the change is queued and a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "add_reaction", "reactions_add",
+            {"channel": channel, "timestamp": timestamp, "name": name},
+            output_format, fields,
+        )
     slack = _get_slack_bot(ctx)
     resp = await slack.reactions_add(channel=channel, timestamp=timestamp, name=name)
     
     if resp.get("ok"):
-        return "Reaction added successfully"
+        return render_status({"ok": True}, output_format, fields, "Reaction added successfully")
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def pin_message(
-    channel: str, timestamp: str, ctx: Context | None = None
+    channel: str,
+    timestamp: str,
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Pin a message to a channel."""
+    """Pin a message to a channel.
+
+    With ``background`` the change is queued and a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "pin_message", "pins_add",
+            {"channel": channel, "timestamp": timestamp},
+            output_format, fields,
+        )
     slack = _get_slack_bot(ctx)
     resp = await slack.pins_add(channel=channel, timestamp=timestamp)
     
     if resp.get("ok"):
-        return "Message pinned successfully"
+        return render_status({"ok": True}, output_format, fields, "Message pinned successfully")
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def unpin_message(
-    channel: str, timestamp: str, ctx: Context | None = None
+    channel: str,
+    timestamp: str,
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Unpin a message from a channel."""
+    """Unpin a message from a channel.
+
+    With ``background`` the change is queued and a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "unpin_message", "pins_remove",
+            {"channel": channel, "timestamp": timestamp},
+            output_format, fields,
+        )
     slack = _get_slack_bot(ctx)
     resp = await slack.pins_remove(channel=channel, timestamp=timestamp)
     
     if resp.get("ok"):
-        return "Message unpinned successfully"
+        return render_status({"ok": True}, output_format, fields, "Message unpinned successfully")
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
@@ -227,30 +811,56 @@ async def upload_file(
     filename: str = None,
     title: str = None,
     initial_comment: str = None,
-    ctx: Context | None = None
+    file_paths: list[str] | None = None,
+    thread_ts: str = None,
+    max_concurrency: int = 4,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None
 ) -> str:
-    """Upload a file to Slack channels."""
+    """Upload one or more files to Slack channels.
+
+    Files are streamed from disk in chunks through Slack's external upload
+    flow, so large files don't have to fit in memory. ``file_paths`` uploads
+    several files concurrently and shares them in a single message.
+    """
     slack = _get_slack_bot(ctx)
     
-    kwargs = {"channels": channels}
-    if file_path:
-        kwargs["file"] = file_path
-    if content:
-        kwargs["content"] = content
-    if filename:
-        kwargs["filename"] = filename
-    if title:
-        kwargs["title"] = title
-    if initial_comment:
-        kwargs["initial_comment"] = initial_comment
-    
-    resp = await slack.files_upload(**kwargs)
+    try:
+        sources = [UploadSource.from_path(path) for path in file_paths or []]
+        if file_path:
+            sources.insert(0, UploadSource.from_path(file_path, filename, title))
+        elif content:
+            sources.insert(0, UploadSource.from_content(content, filename, title))
+        if not sources:
+            return "Error: provide file_path, file_paths or content"
+        
+        files = await upload_files(
+            slack,
+            sources,
+            channels=[c.strip() for c in channels.split(",") if c.strip()],
+            initial_comment=initial_comment,
+            thread_ts=thread_ts,
+            max_concurrency=max_concurrency,
+            ctx=ctx,
+        )
+    except (OSError, RuntimeError, aiohttp.ClientError) as e:
+        return f"Error: {e}"
     
-    if resp.get("ok"):
-        file_info = resp.get("file", {})
-        return f"File uploaded successfully. ID: {file_info.get('id', '')}"
-    else:
-        return f"Error: {resp.get('error', 'unknown error')}"
+    if len(files) == 1:
+        return render_status(
+            {"ok": True, "id": files[0].get("id", "")},
+            output_format,
+            fields,
+            f"File uploaded successfully. ID: {files[0].get('id', '')}",
+        )
+    return render(
+        [{"id": f.get("id"), "title": f.get("title")} for f in files],
+        output_format,
+        fields,
+        ["id", "title"],
+        lambda: f"Files uploaded successfully. IDs: {', '.join(f.get('id', '') for f in files)}",
+    )
 
 
 async def list_files(
@@ -258,84 +868,393 @@ async def list_files(
     channel: str = None, 
     types: str = "all", 
     count: int = 100,
-    ctx: Context | None = None
+    cursor: str = "",
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None
 ) -> str:
-    """List files in the workspace."""
+    """List files in the workspace.
+
+    ``count`` caps the number of files returned (0 = all), rounded up to whole
+    pages. When more remain, the output ends with a ``Next cursor`` token.
+    """
     slack = _get_slack_bot(ctx)
     
-    kwargs = {"types": types, "count": count}
+    kwargs = {"types": types}
     if user:
         kwargs["user"] = user
     if channel:
         kwargs["channel"] = channel
     
-    resp = await slack.files_list(**kwargs)
+    budget = _budget(count)
+    result = await collect(
+        paginate_pages(
+            slack.files_list,
+            "files.list",
+            "files",
+            max_items=budget,
+            cursor=cursor,
+            ctx=ctx,
+            **kwargs,
+        ),
+    )
     
-    if resp.get("ok"):
-        files = resp.get("files", [])
+    def text() -> str:
         lines = []
-        for file in files:
+        for file in result.items:
             lines.append(f"ID: {file.get('id')} | Name: {file.get('name', 'N/A')} | Type: {file.get('filetype', 'N/A')}")
-        return "\n".join(lines) if lines else "No files found"
-    else:
-        return f"Error: {resp.get('error', 'unknown error')}"
+        if not lines:
+            return "No files found"
+        return "\n".join(_with_cursor(lines, result.next_cursor))
+
+    return render(
+        [_file_record(f) for f in result.items],
+        output_format,
+        fields,
+        ["id", "name", "filetype"],
+        text,
+        result.next_cursor,
+    )
 
 
 # =============================================================================
 # CONVERSATION & HISTORY TOOLS
 # =============================================================================
 
+async def _read_history(
+    ctx: Context | None, slack: AsyncWebClient, channel: str, limit: int, oldest: str | None, latest: str | None
+) -> list[dict]:
+    """Read a window of up to ``limit`` messages, following every history page.
+
+    Served from the local message store when it mirrors the window; raises
+    ``SlackApiError`` when Slack has to be asked and fails.
+    """
+    store = _get_store(ctx, channel)
+    if store is not None:
+        await store.sync(slack, channel, ctx=ctx)
+        messages = await store.read(channel, limit, oldest=oldest, latest=latest)
+        if messages is not None:
+            return messages
+
+    kwargs = {"channel": channel}
+    if oldest:
+        kwargs["oldest"] = oldest
+    if latest:
+        kwargs["latest"] = latest
+    result = await collect(
+        paginate(slack.conversations_history, "conversations.history", "messages", max_items=_budget(limit), **kwargs),
+        _budget(limit),
+    )
+    return result.items
+
+
 async def get_conversation_history(
     channel: str, 
     limit: int = 100, 
     oldest: str = None, 
     latest: str = None,
-    ctx: Context | None = None
+    resolve_users: bool = False,
+    user: str = "",
+    pattern: str = "",
+    has_reactions: bool = False,
+    has_files: bool = False,
+    aggregate_by: str = "",
+    top: int = 10,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None
 ) -> str:
-    """Get conversation history from a channel."""
+    """Get conversation history from a channel.
+
+    When the local message store mirrors the channel, only new messages are
+    fetched from Slack and the result is read from the store.
+    ``resolve_users`` replaces author IDs and mentions with display names.
+
+    Filters are evaluated on the server over the newest ``limit`` messages
+    (following history pages as needed) and only matches are returned:
+    ``user`` (comma separated IDs), ``pattern`` (case-insensitive regex on
+    the text), ``has_reactions`` and ``has_files``. ``aggregate_by`` returns
+    counts instead of messages, as ``metric``/``key``/``count`` rows; it is a
+    comma separated list of ``count`` (scanned and matched), ``users`` and
+    ``reactions`` (the ``top`` entries, 0 for all) and ``hour``, ``day`` or
+    ``week`` (UTC time buckets).
+    """
     slack = _get_slack_bot(ctx)
+    try:
+        message_filter = MessageFilter.parse(user, pattern, has_reactions, has_files)
+        aggregates = parse_aggregates(aggregate_by)
+    except ValueError as e:
+        return f"Error: {e}"
+    if message_filter.active or aggregates:
+        try:
+            scanned = await _read_history(ctx, slack, channel, limit, oldest, latest)
+        except SlackApiError as e:
+            return f"Error: {e.response.get('error', 'unknown error')}"
+        messages = [m for m in scanned if message_filter.matches(m)]
+        if aggregates:
+            return await _render_aggregates(
+                ctx, aggregate(messages, len(scanned), aggregates, top), resolve_users, output_format, fields
+            )
+        if resolve_users:
+            messages = await _resolve_users(ctx, messages)
+        return render(
+            [_message_record(m) for m in messages],
+            output_format,
+            fields,
+            _message_fields(["ts", "user", "text"], resolve_users),
+            lambda: _format_history(messages),
+        )
+
+    messages = None
+    store = _get_store(ctx, channel)
+    if store is not None:
+        await store.sync(slack, channel, ctx=ctx)
+        messages = await store.read(channel, limit, oldest=oldest, latest=latest)
     
-    kwargs = {"channel": channel, "limit": limit}
-    if oldest:
-        kwargs["oldest"] = oldest
-    if latest:
-        kwargs["latest"] = latest
-    
-    resp = await slack.conversations_history(**kwargs)
-    
-    if resp.get("ok"):
+    if messages is None:
+        kwargs = {"channel": channel, "limit": limit}
+        if oldest:
+            kwargs["oldest"] = oldest
+        if latest:
+            kwargs["latest"] = latest
+        
+        resp = await slack.conversations_history(**kwargs)
+        if not resp.get("ok"):
+            return f"Error: {resp.get('error', 'unknown error')}"
         messages = resp.get("messages", [])
+    if resolve_users:
+        messages = await _resolve_users(ctx, messages)
+    
+    return render(
+        [_message_record(m) for m in messages],
+        output_format,
+        fields,
+        _message_fields(["ts", "user", "text"], resolve_users),
+        lambda: _format_history(messages),
+    )
+
+
+async def _render_aggregates(
+    ctx: Context | None, rows: list[dict], resolve_users: bool, output_format: str, fields: str
+) -> str:
+    default_fields = ["metric", "key", "count"]
+    if resolve_users:
+        names = await _user_names(ctx, {r["key"] for r in rows if r["metric"] == "user"})
+        for row in rows:
+            if row["metric"] == "user":
+                row["name"] = names.get(row["key"], "")
+        default_fields.insert(2, "name")
+
+    def text() -> str:
         lines = []
-        for msg in messages:
-            user = msg.get("user", "unknown")
-            text = msg.get("text", "")
-            ts = msg.get("ts", "")
-            lines.append(f"[{ts}] {user}: {text}")
+        for row in rows:
+            label = f"{row['key']} ({row['name']})" if row.get("name") else row["key"]
+            lines.append(f"{row['metric']} {label}: {row['count']}" if label else f"{row['metric']}: {row['count']}")
         return "\n".join(lines) if lines else "No messages found"
-    else:
-        return f"Error: {resp.get('error', 'unknown error')}"
+
+    return render(rows, output_format, fields, default_fields, text)
+
+
+def _format_history(messages: list[dict]) -> str:
+    lines = []
+    for msg in messages:
+        user = _author(msg)
+        text = msg.get("text", "")
+        ts = msg.get("ts", "")
+        lines.append(f"[{ts}] {user}: {text}")
+    return "\n".join(lines) if lines else "No messages found"
+
+
+async def sync_channel_history(
+    channel: str,
+    full: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Sync a channel into the local message store.
+
+    Fetches messages newer than the newest stored one and refreshes the
+    most recent ones; with ``full`` every stored message is refreshed and the
+    whole history is backfilled as well.
+    """
+    store = _get_store(ctx, channel)
+    if store is None:
+        return f"Error: local message store is not enabled for {channel}"
+    state = await store.sync(_get_slack_bot(ctx), channel, full=full, force=True, ctx=ctx)
+    coverage = "complete" if state.complete else f"from {state.oldest_ts or 'n/a'}"
+    return render_status(
+        {"ok": True, "channel": channel, "newest_ts": state.newest_ts, "oldest_ts": state.oldest_ts, "complete": state.complete},
+        output_format,
+        fields,
+        f"Synced {channel}. Newest: {state.newest_ts or 'n/a'} | History: {coverage}",
+    )
+
+
+async def export_conversation(
+    channel: str,
+    output_path: str,
+    include_replies: bool = False,
+    oldest: str = None,
+    latest: str = None,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Export a channel's full history to an NDJSON file.
+
+    ``output_path`` is relative to the server's export directory. Pages are
+    written as they arrive, so memory use does not grow with channel size.
+    """
+    try:
+        path = resolve_export_path(output_path)
+    except ValueError as e:
+        return f"Error: {e}"
+    
+    slack = _get_slack_bot(ctx)
+    written = await export_ndjson(
+        slack,
+        channel,
+        path,
+        include_replies=include_replies,
+        oldest=oldest,
+        latest=latest,
+        ctx=ctx,
+    )
+    return render_status(
+        {"ok": True, "channel": channel, "path": str(path), "messages": written},
+        output_format,
+        fields,
+        f"Exported {written} messages from {channel} to {path}",
+    )
 
 
 async def get_thread_replies(
-    channel: str, ts: str, limit: int = 100, ctx: Context | None = None
+    channel: str,
+    ts: str,
+    limit: int = 100,
+    resolve_users: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Get replies in a message thread."""
+    """Get replies in a message thread.
+
+    ``resolve_users`` replaces author IDs and mentions with display names.
+    """
     slack = _get_slack_bot(ctx)
     resp = await slack.conversations_replies(channel=channel, ts=ts, limit=limit)
     
     if resp.get("ok"):
         messages = resp.get("messages", [])
-        lines = []
-        for msg in messages:
-            user = msg.get("user", "unknown")
-            text = msg.get("text", "")
-            thread_ts = msg.get("thread_ts", "")
-            lines.append(f"[{thread_ts}] {user}: {text}")
-        return "\n".join(lines) if lines else "No replies found"
+        if resolve_users:
+            messages = await _resolve_users(ctx, messages)
+
+        def text() -> str:
+            lines = []
+            for msg in messages:
+                user = _author(msg)
+                text = msg.get("text", "")
+                thread_ts = msg.get("thread_ts", "")
+                lines.append(f"[{thread_ts}] {user}: {text}")
+            return "\n".join(lines) if lines else "No replies found"
+
+        return render(
+            [_message_record(m) for m in messages],
+            output_format,
+            fields,
+            _message_fields(["ts", "user", "text"], resolve_users),
+            text,
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
+async def get_channel_threads(
+    channel: str,
+    limit: int = 100,
+    oldest: str = None,
+    latest: str = None,
+    threads_only: bool = False,
+    max_concurrency: int = 8,
+    resolve_users: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Get a window of channel history with every thread's replies nested under its parent.
+
+    ``limit`` bounds the history window; replies of all threaded parents
+    (``reply_count > 0``) in it are fetched concurrently, at most
+    ``max_concurrency`` threads at a time, following every page. JSON output
+    nests replies under ``replies``; TSV output lists replies after their
+    parent with ``thread_ts`` set. ``resolve_users`` replaces author IDs and
+    mentions with display names.
+    """
+    slack = _get_slack_bot(ctx)
+    try:
+        messages = await _read_history(ctx, slack, channel, limit, oldest, latest)
+    except SlackApiError as e:
+        return f"Error: {e.response.get('error', 'unknown error')}"
+
+    parents = [m for m in messages if int(m.get("reply_count") or 0) > 0]
+    if threads_only:
+        messages = parents
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    done = 0
+
+    async def fetch(parent: dict) -> tuple[list[dict], str]:
+        nonlocal done
+        async with semaphore:
+            try:
+                result = await collect(
+                    paginate(slack.conversations_replies, "conversations.replies", "messages", channel=channel, ts=parent["ts"]),
+                    None,
+                )
+            except SlackApiError as e:
+                return [], e.response.get("error", "unknown error")
+        done += 1
+        await report_progress(ctx, done, len(parents), f"{done}/{len(parents)} threads fetched")
+        # The first message of conversations.replies is the parent itself
+        return [r for r in result.items if r.get("ts") != parent["ts"]], ""
+
+    fetched = await asyncio.gather(*(fetch(p) for p in parents))
+    if resolve_users:
+        # One lookup for parents and replies together
+        names = await _mentioned_names(ctx, messages + [r for replies, _ in fetched for r in replies])
+        messages = [_with_names(m, names) for m in messages]
+        fetched = [([_with_names(r, names) for r in replies], error) for replies, error in fetched]
+    threads = {p["ts"]: replies for p, replies in zip(parents, fetched)}
+
+    records = []
+    for msg in messages:
+        record = _message_record(msg)
+        replies, error = threads.get(msg.get("ts"), ([], ""))
+        if output_format == "json":
+            record["replies"] = [_message_record(r) for r in replies]
+            record["replies_error"] = error
+            records.append(record)
+        else:
+            records.append(record)
+            records.extend(_message_record(r) for r in replies)
+
+    def text() -> str:
+        lines = []
+        for msg in messages:
+            lines.append(f"[{msg.get('ts', '')}] {_author(msg)}: {msg.get('text', '')}")
+            replies, error = threads.get(msg.get("ts"), ([], ""))
+            if error:
+                lines.append(f"    (replies unavailable: {error})")
+            for reply in replies:
+                lines.append(f"    [{reply.get('ts', '')}] {_author(reply)}: {reply.get('text', '')}")
+        return "\n".join(lines) if lines else "No messages found"
+
+    default_fields = ["ts", "user", "text", "reply_count", "replies", "replies_error"]
+    if output_format != "json":
+        default_fields = ["ts", "thread_ts", "user", "text"]
+    return render(records, output_format, fields, _message_fields(default_fields, resolve_users), text)
+
+
 # =============================================================================
 # SEARCH TOOLS (USER TOKEN REQUIRED)
 # =============================================================================
@@ -345,9 +1264,15 @@ async def search_messages(
     sort: str = "timestamp",
     sort_dir: str = "desc",
     count: int = 20,
-    ctx: Context | None = None,
+    resolve_users: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Search for messages across Slack workspace (requires user token)."""
+    """Search for messages across Slack workspace (requires user token).
+
+    ``resolve_users`` replaces author IDs and mentions with display names.
+    """
     slack = _get_slack_user(ctx)
     resp = await slack.search_messages(
         query=query, sort=sort, sort_dir=sort_dir, count=count
@@ -355,17 +1280,77 @@ async def search_messages(
 
     if resp.get("ok"):
         messages = resp.get("messages", {}).get("matches", [])
-        result = []
-        for msg in messages:
-            result.append(f"Channel: {msg.get('channel', {}).get('name', 'unknown')}")
-            result.append(f"User: {msg.get('user', 'unknown')}")
-            result.append(f"Text: {msg.get('text', '')}")
-            result.append("---")
-        return "\n".join(result) if result else "No messages found"
+        if resolve_users:
+            messages = await _resolve_users(ctx, messages)
+
+        def text() -> str:
+            result = []
+            for msg in messages:
+                result.append(f"Channel: {msg.get('channel', {}).get('name', 'unknown')}")
+                result.append(f"User: {_author(msg)}")
+                result.append(f"Text: {msg.get('text', '')}")
+                result.append("---")
+            return "\n".join(result) if result else "No messages found"
+
+        records = [
+            dict(
+                _message_record(m),
+                channel=(m.get("channel") or {}).get("name"),
+                channel_id=(m.get("channel") or {}).get("id"),
+                permalink=m.get("permalink"),
+            )
+            for m in messages
+        ]
+        return render(records, output_format, fields, _message_fields(["channel", "user", "text"], resolve_users), text)
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
+async def search_local(
+    query: str,
+    channel: str = "",
+    user: str = "",
+    after: str = "",
+    before: str = "",
+    limit: int = 20,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Search messages in the local message store (works with a bot token only).
+
+    Only channels synced into the store are searchable. ``after``/``before``
+    accept a Slack timestamp or an ISO date.
+    """
+    store = getattr(_get_app_context(ctx), "store", None)
+    if store is None:
+        return "Error: local message store is not enabled"
+    
+    try:
+        hits = await store.search(
+            query,
+            channel=channel or None,
+            user=user or None,
+            after=after or None,
+            before=before or None,
+            limit=limit,
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    
+    def text() -> str:
+        lines = [f"[{h.channel} {h.ts}] {h.user or 'unknown'}: {h.snippet}" for h in hits]
+        return "\n".join(lines) if lines else "No messages found"
+
+    return render(
+        [vars(h) for h in hits],
+        output_format,
+        fields,
+        ["channel", "ts", "user", "snippet"],
+        text,
+    )
+
+
 # =============================================================================
 # USER STATUS & REMINDER TOOLS (USER TOKEN REQUIRED)
 # =============================================================================
@@ -374,7 +1359,9 @@ async def set_user_status(
     status_text: str,
     status_emoji: str = "",
     status_expiration: int = 0,
-    ctx: Context | None = None,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Set user status (requires user token)."""
     slack = _get_slack_user(ctx)
@@ -388,7 +1375,7 @@ async def set_user_status(
     resp = await slack.users_profile_set(profile=profile)
 
     if resp.get("ok"):
-        return "Status updated successfully"
+        return render_status({"ok": True}, output_format, fields, "Status updated successfully")
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
@@ -397,7 +1384,9 @@ async def create_reminder(
     text: str,
     time: str,
     user: str = "",
-    ctx: Context | None = None,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Create a reminder (requires user token)."""
     slack = _get_slack_user(ctx)
@@ -405,7 +1394,12 @@ async def create_reminder(
 
     if resp.get("ok"):
         reminder = resp.get("reminder", {})
-        return f"Reminder created with ID: {reminder.get('id', 'unknown')}"
+        return render_status(
+            {"ok": True, "id": reminder.get("id", "unknown")},
+            output_format,
+            fields,
+            f"Reminder created with ID: {reminder.get('id', 'unknown')}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
@@ -415,7 +1409,11 @@ async def create_reminder(
 # =============================================================================
 
 async def create_channel(
-    name: str, is_private: bool = False, ctx: Context | None = None
+    name: str,
+    is_private: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Create a new channel."""
     slack = _get_slack_bot(ctx)
@@ -423,59 +1421,126 @@ async def create_channel(
     
     if resp.get("ok"):
         channel = resp.get("channel", {})
-        return f"Channel created successfully. ID: {channel.get('id')} | Name: #{channel.get('name')}"
+        directory = _get_directory(ctx)
+        if directory:
+            await directory.put_channel(channel)
+            await directory.invalidate_listings("channels")
+        return render_status(
+            {"ok": True, "id": channel.get("id"), "name": channel.get("name")},
+            output_format,
+            fields,
+            f"Channel created successfully. ID: {channel.get('id')} | Name: #{channel.get('name')}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def archive_channel(
-    channel: str, ctx: Context | None = None
+    channel: str,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Archive a channel."""
     slack = _get_slack_bot(ctx)
     resp = await slack.conversations_archive(channel=channel)
+    await _invalidate_channel(ctx, channel)
     
     if resp.get("ok"):
-        return f"Channel {channel} archived successfully"
+        return render_status(
+            {"ok": True, "channel": channel},
+            output_format,
+            fields,
+            f"Channel {channel} archived successfully",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def set_channel_topic(
-    channel: str, topic: str, ctx: Context | None = None
+    channel: str,
+    topic: str,
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Set a channel's topic."""
+    """Set a channel's topic.
+
+    With ``background`` the change is queued and a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "set_channel_topic", "conversations_setTopic",
+            {"channel": channel, "topic": topic},
+            output_format, fields,
+        )
     slack = _get_slack_bot(ctx)
     resp = await slack.conversations_setTopic(channel=channel, topic=topic)
+    await _invalidate_channel(ctx, channel)
     
     if resp.get("ok"):
-        return f"Topic set successfully for {channel}"
+        return render_status(
+            {"ok": True, "channel": channel},
+            output_format,
+            fields,
+            f"Topic set successfully for {channel}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def set_channel_description(
-    channel: str, purpose: str, ctx: Context | None = None
+    channel: str,
+    purpose: str,
+    background: bool = False,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
-    """Set a channel's description/purpose."""
+    """Set a channel's description/purpose.
+
+    With ``background`` the change is queued and a job ID is returned immediately.
+    """
+    if background:
+        return await _background(
+            ctx, "set_channel_description", "conversations_setPurpose",
+            {"channel": channel, "purpose": purpose},
+            output_format, fields,
+        )
     slack = _get_slack_bot(ctx)
     resp = await slack.conversations_setPurpose(channel=channel, purpose=purpose)
+    await _invalidate_channel(ctx, channel)
     
     if resp.get("ok"):
-        return f"Description set successfully for {channel}"
+        return render_status(
+            {"ok": True, "channel": channel},
+            output_format,
+            fields,
+            f"Description set successfully for {channel}",
+        )
     else:
         return f"Error: {resp.get('error', 'unknown error')}"
 
 
 async def join_channel(
-    channel: str, ctx: Context | None = None
+    channel: str,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
 ) -> str:
     """Join a channel with the bot (requires bot to be invited first)."""
     slack = _get_slack_bot(ctx)
     resp = await slack.conversations_join(channel=channel)
+    await _invalidate_channel(ctx, channel)
 
     if resp.get("ok"):
-        return f"Successfully joined channel {channel}"
+        return render_status(
+            {"ok": True, "channel": channel},
+            output_format,
+            fields,
+            f"Successfully joined channel {channel}",
+        )
     else:
         return f"Error joining channel: {resp.get('error', 'unknown error')}"
 
@@ -484,30 +1549,234 @@ async def join_channel(
 # WORKSPACE INFO TOOLS
 # =============================================================================
 
-async def get_team_info(ctx: Context | None = None) -> str:
-    """Get information about the team/workspace."""
+async def _metadata(
+    ctx: Context | None,
+    key: str,
+    variant: tuple,
+    fetch: Callable[[], Awaitable[Any]],
+    build: Callable[[Any], str],
+) -> str:
+    """Serve workspace metadata from the stale-while-revalidate cache.
+
+    ``build`` renders the tool output from the fetched value; it runs once per
+    cached value and output ``variant``.
+    """
+    directory = _get_directory(ctx)
+    if directory is None:
+        return build(await fetch())
+    entry = await directory.metadata.get(key, fetch)
+    return directory.metadata.render(entry, variant, lambda: build(entry.value))
+
+
+async def get_team_info(
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Get information about the team/workspace.
+
+    Served from memory and refreshed in the background once stale.
+    """
     slack = _get_slack_bot(ctx)
-    resp = await slack.team_info()
-    
-    if resp.get("ok"):
-        team = resp.get("team", {})
-        info = []
-        info.append(f"Name: {team.get('name', 'N/A')}")
-        info.append(f"Domain: {team.get('domain', 'N/A')}")
-        info.append(f"Email Domain: {team.get('email_domain', 'N/A')}")
-        return "\n".join(info)
-    else:
-        return f"Error: {resp.get('error', 'unknown error')}"
 
+    async def fetch() -> dict:
+        return (await slack.team_info()).get("team", {})
+
+    def build(team: dict) -> str:
+        def text() -> str:
+            info = []
+            info.append(f"Name: {team.get('name', 'N/A')}")
+            info.append(f"Domain: {team.get('domain', 'N/A')}")
+            info.append(f"Email Domain: {team.get('email_domain', 'N/A')}")
+            return "\n".join(info)
+
+        record = {
+            "id": team.get("id"),
+            "name": team.get("name"),
+            "domain": team.get("domain"),
+            "email_domain": team.get("email_domain"),
+        }
+        return render(record, output_format, fields, ["name", "domain", "email_domain"], text)
+
+    return await _metadata(ctx, "team", (output_format, fields), fetch, build)
+
+
+async def list_emojis(
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """List custom emojis in the workspace.
 
-async def list_emojis(ctx: Context | None = None) -> str:
-    """List custom emojis in the workspace."""
+    Served from memory and refreshed in the background once stale.
+    """
     slack = _get_slack_bot(ctx)
-    resp = await slack.emoji_list()
-    
-    if resp.get("ok"):
-        emojis = resp.get("emoji", {})
-        lines = [f":{name}: - {url}" for name, url in emojis.items()]
-        return "\n".join(lines) if lines else "No custom emojis found"
-    else:
-        return f"Error: {resp.get('error', 'unknown error')}" 
\ No newline at end of file
+
+    async def fetch() -> dict:
+        return (await slack.emoji_list()).get("emoji", {})
+
+    def build(emojis: dict) -> str:
+        def text() -> str:
+            lines = [f":{name}: - {url}" for name, url in emojis.items()]
+            return "\n".join(lines) if lines else "No custom emojis found"
+
+        return render(
+            [{"name": name, "url": url} for name, url in emojis.items()],
+            output_format,
+            fields,
+            ["name", "url"],
+            text,
+        )
+
+    return await _metadata(ctx, "emoji", (output_format, fields), fetch, build)
+
+
+# =============================================================================
+# BACKGROUND JOB TOOLS
+# =============================================================================
+
+async def get_job_status(
+    job_id: str,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Get the status of a write queued with ``background=true``."""
+    app = _get_app_context(ctx)
+    jobs = getattr(app, "jobs", None)
+    if jobs is None:
+        return "Error: background jobs are not enabled (set SLACK_JOB_QUEUE_PATH)"
+    job = await jobs.get(job_id)
+    if job is None or job.tenant != getattr(app, "id", DEFAULT_TENANT):
+        return f"Error: job '{job_id}' not found"
+
+    record = {
+        "job_id": job.id,
+        "action": job.action,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        **(job.result or {}),
+    }
+
+    def text() -> str:
+        lines = [f"Job {job.id} ({job.action}): {job.status}", f"Attempts: {job.attempts}"]
+        if job.status == DONE and job.result:
+            lines.extend(f"{key}: {value}" for key, value in job.result.items())
+        elif job.error:
+            label = "Error" if job.status in (FAILED, UNKNOWN) else "Last error"
+            lines.append(f"{label}: {job.error}")
+        return "\n".join(lines)
+
+    return render(record, output_format, fields, list(record), text)
+
+
+# =============================================================================
+# BATCH TOOLS
+# =============================================================================
+
+# Read-only tools ``batch`` may run; writes keep their own tools so that a
+# retried batch can never post twice
+BATCH_TOOLS = (
+    "list_channels",
+    "list_users",
+    "get_user_info",
+    "find_user_by_email",
+    "list_files",
+    "get_conversation_history",
+    "get_thread_replies",
+    "get_channel_threads",
+    "search_messages",
+    "search_local",
+    "get_team_info",
+    "list_emojis",
+    "get_job_status",
+)
+MAX_BATCH_REQUESTS = 50
+
+
+async def batch(
+    requests: list[dict[str, Any]],
+    max_concurrency: int = 8,
+    output_format: str = "text",
+    fields: str = "",
+    ctx: Context = None,
+) -> str:
+    """Run several read tools in one call.
+
+    ``requests`` is a list of ``{"id": ..., "tool": ..., "args": {...}}``;
+    ``tool`` names one of the read tools (``get_user_info``,
+    ``get_conversation_history``, ``get_thread_replies``, ...) and ``args``
+    are its arguments. Requests run concurrently, at most ``max_concurrency``
+    at a time, and each result is returned under its ``id`` (the request's
+    position when omitted). A failed request reports its error without
+    failing the others. ``args`` inherit ``output_format`` unless they set
+    their own; JSON results of JSON requests are embedded as objects.
+    """
+    if not requests:
+        return "Error: no requests to run"
+    if len(requests) > MAX_BATCH_REQUESTS:
+        return f"Error: at most {MAX_BATCH_REQUESTS} requests per batch (got {len(requests)})"
+    ids = [str(r.get("id") or i) for i, r in enumerate(requests)]
+    if len(set(ids)) != len(ids):
+        return "Error: request ids must be unique"
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(request_id: str, request: dict[str, Any]) -> dict:
+        tool = request.get("tool", "")
+        record = {"id": request_id, "tool": tool, "ok": False, "result": ""}
+        if tool not in BATCH_TOOLS:
+            record["result"] = f"Error: '{tool}' can't be batched (use one of {', '.join(BATCH_TOOLS)})"
+            return record
+        func = globals()[tool]
+        args = {"output_format": output_format, **(request.get("args") or {}), "ctx": ctx}
+        try:
+            inspect.signature(func).bind(**args)
+        except TypeError as e:
+            record["result"] = f"Error: {e}"
+            return record
+        async with semaphore:
+            try:
+                result = await func(**args)
+            except SlackApiError as e:
+                result = f"Error: {e.response.get('error', 'unknown error')}"
+            except Exception as e:
+                result = f"Error: {type(e).__name__}: {e}"
+        record["ok"] = not result.startswith("Error:")
+        record["result"] = result
+        if output_format == "json" and args["output_format"] == "json" and record["ok"]:
+            record["result"] = json.loads(result)
+        return record
+
+    results = await asyncio.gather(*(run(i, r) for i, r in zip(ids, requests)))
+
+    def text() -> str:
+        sections = [f"### {r['id']} ({r['tool']})\n{r['result']}" for r in results]
+        ok = sum(1 for r in results if r["ok"])
+        return "\n\n".join([f"Ran {len(results)} requests: {ok} ok, {len(results) - ok} failed", *sections])
+
+    return render(results, output_format, fields, ["id", "tool", "ok", "result"], text)
+
+
+# =============================================================================
+# RESPONSE CONTINUATION TOOLS
+# =============================================================================
+
+async def continue_result(
+    token: str,
+    ctx: Context = None,
+) -> str:
+    """Get the next part of a response that was cut at its size budget.
+
+    ``token`` is the continuation token of the previous part. Parts keep the
+    output format of the original call and expire a few minutes after it.
+    """
+    app = _get_app_context(ctx)
+    responses = getattr(app, "responses", None)
+    if responses is None:
+        return "Error: response budgets are not enabled"
+    part = responses.resume(token, getattr(app, "id", DEFAULT_TENANT))
+    if part is None:
+        return f"Error: continuation '{token}' not found or expired"
+    return part
@@ -0,0 +1,147 @@
+"""
+Slack File Uploads
+Stream files to Slack through the external upload flow
+(``files.getUploadURLExternal`` -> upload -> ``files.completeUploadExternal``).
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+import aiohttp
+from mcp.server.fastmcp import Context
+
+from .pagination import report_progress
+
+# Environment variable names
+UPLOAD_CHUNK_SIZE_ENV = "SLACK_UPLOAD_CHUNK_SIZE"
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Progress notifications are sent at most once per this fraction of the total
+PROGRESS_STEP = 0.05
+
+
+def chunk_size() -> int:
+    return int(os.getenv(UPLOAD_CHUNK_SIZE_ENV, DEFAULT_CHUNK_SIZE))
+
+
+@dataclass
+class UploadSource:
+    """A file to upload, read from disk or from an in-memory string."""
+
+    filename: str
+    size: int
+    path: Optional[Path] = None
+    content: Optional[bytes] = None
+    title: Optional[str] = None
+
+    @classmethod
+    def from_path(cls, path: str, filename: Optional[str] = None, title: Optional[str] = None) -> "UploadSource":
+        """Describe a file on disk; raises ``OSError`` if it can't be read."""
+        file = Path(path)
+        return cls(filename=filename or file.name, size=file.stat().st_size, path=file, title=title)
+
+    @classmethod
+    def from_content(cls, content: str, filename: Optional[str] = None, title: Optional[str] = None) -> "UploadSource":
+        data = content.encode("utf-8")
+        return cls(filename=filename or "content.txt", size=len(data), content=data, title=title)
+
+    async def chunks(self, size: int) -> AsyncIterator[bytes]:
+        """Yield the file ``size`` bytes at a time; at most one chunk is held in memory."""
+        if self.content is not None:
+            for start in range(0, len(self.content), size):
+                yield self.content[start:start + size]
+            return
+        fh = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            while chunk := await asyncio.to_thread(fh.read, size):
+                yield chunk
+        finally:
+            await asyncio.to_thread(fh.close)
+
+
+class UploadProgress:
+    """Aggregate bytes sent across concurrent uploads into MCP progress notifications."""
+
+    def __init__(self, total: int, ctx: Optional[Context] = None) -> None:
+        self.total = total
+        self.sent = 0
+        self._ctx = ctx
+        self._reported = 0
+
+    async def advance(self, sent: int) -> None:
+        self.sent += sent
+        if self.sent == self.total or self.sent - self._reported >= self.total * PROGRESS_STEP:
+            self._reported = self.sent
+            await report_progress(self._ctx, self.sent, self.total, f"{self.sent}/{self.total} bytes uploaded")
+
+
+async def _stream(source: UploadSource, progress: UploadProgress, size: int) -> AsyncIterator[bytes]:
+    async for chunk in source.chunks(size):
+        yield chunk
+        await progress.advance(len(chunk))
+
+
+async def upload_external(
+    slack,
+    session: aiohttp.ClientSession,
+    source: UploadSource,
+    progress: UploadProgress,
+) -> dict[str, Any]:
+    """Upload one file and return its ``{"id", "title"}`` entry for completion."""
+    resp = await slack.files_getUploadURLExternal(filename=source.filename, length=source.size)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=slack.timeout, sock_read=slack.timeout)
+    async with session.post(
+        resp["upload_url"],
+        data=_stream(source, progress, chunk_size()),
+        headers={"Content-Length": str(source.size), "Content-Type": "application/octet-stream"},
+        timeout=timeout,
+    ) as upload:
+        if upload.status != 200:
+            raise RuntimeError(f"upload of {source.filename} failed with HTTP {upload.status}")
+    return {"id": resp["file_id"], "title": source.title or source.filename}
+
+
+async def upload_files(
+    slack,
+    sources: list[UploadSource],
+    *,
+    channels: Optional[list[str]] = None,
+    initial_comment: Optional[str] = None,
+    thread_ts: Optional[str] = None,
+    max_concurrency: int = 4,
+    ctx: Optional[Context] = None,
+) -> list[dict[str, Any]]:
+    """Upload ``sources`` concurrently and share them in one message.
+
+    File bodies are streamed in ``SLACK_UPLOAD_CHUNK_SIZE`` chunks, so memory
+    use does not depend on file size. Returns the completed file objects.
+    """
+    progress = UploadProgress(sum(s.size for s in sources), ctx)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    owned = None
+    session = getattr(slack, "session", None)
+    if session is None or session.closed:
+        session = owned = aiohttp.ClientSession()
+
+    async def upload(source: UploadSource) -> dict[str, Any]:
+        async with semaphore:
+            return await upload_external(slack, session, source, progress)
+
+    try:
+        files = await asyncio.gather(*(upload(s) for s in sources))
+    finally:
+        if owned is not None:
+            await owned.close()
+
+    kwargs: dict[str, Any] = {"files": files}
+    if channels:
+        kwargs["channels"] = channels
+    if initial_comment:
+        kwargs["initial_comment"] = initial_comment
+    if thread_ts:
+        kwargs["thread_ts"] = thread_ts
+    resp = await slack.files_completeUploadExternal(**kwargs)
+    return resp.get("files", [])
@@ -0,0 +1,152 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from slack_mcp_app.jobs import DONE, FAILED, QUEUED, UNKNOWN, JobQueue, classify, not_sent
+
+pytestmark = pytest.mark.anyio
+
+
+def slack_error(error: str, status: int = 200, headers: dict | None = None) -> SlackApiError:
+    response = AsyncSlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/chat.postMessage",
+        req_args={},
+        data={"ok": False, "error": error},
+        headers=headers or {},
+        status_code=status,
+    )
+    return SlackApiError(error, response)
+
+
+def connect_error() -> aiohttp.ClientConnectorError:
+    key = SimpleNamespace(host="slack.com", port=443, ssl=True)
+    return aiohttp.ClientConnectorError(key, OSError(111, "Connection refused"))
+
+
+def test_classify():
+    assert classify(slack_error("internal_error", 500)) == ("internal_error", True, 0.0)
+    assert classify(slack_error("ratelimited", 429, {"Retry-After": "3"})) == ("ratelimited", True, 3.0)
+    assert classify(slack_error("channel_not_found"))[1] is False
+    assert classify(asyncio.TimeoutError())[1] is True
+    assert classify(aiohttp.ServerDisconnectedError())[1] is True
+    assert classify(ValueError("bad"))[1] is False
+
+
+def test_not_sent():
+    assert not_sent(connect_error())
+    assert not_sent(slack_error("ratelimited", 429))
+    assert not_sent(slack_error("circuit_open"))
+    assert not not_sent(asyncio.TimeoutError())
+    assert not not_sent(aiohttp.ServerDisconnectedError())
+    assert not not_sent(slack_error("internal_error", 500))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=2, max_attempts=3, retry_base=0.0)
+    yield queue
+    queue.close()
+
+
+class Runner:
+    """Fails each job with the next of ``failures`` before succeeding."""
+
+    def __init__(self, *failures: BaseException) -> None:
+        self.failures = list(failures)
+        self.calls = 0
+
+    async def __call__(self, job) -> dict:
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return {"channel": job.args["channel"], "ts": "1.000100"}
+
+
+async def finished(queue: JobQueue, job_id: str):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job.status not in (QUEUED, "running"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+async def run(queue: JobQueue, runner: Runner, method: str):
+    await queue.start(runner)
+    try:
+        job = await queue.submit("default", "test", method, {"channel": "C1"})
+        return await finished(queue, job.id)
+    finally:
+        await queue.stop()
+
+
+async def test_post_is_not_repeated_after_a_timeout(queue):
+    runner = Runner(asyncio.TimeoutError())
+    job = await run(queue, runner, "chat_postMessage")
+    assert job.status == UNKNOWN
+    assert runner.calls == 1
+    assert "not retried" in job.error
+
+
+async def test_post_is_not_repeated_after_a_server_error(queue):
+    runner = Runner(slack_error("internal_error", 500))
+    job = await run(queue, runner, "chat_postMessage")
+    assert job.status == UNKNOWN
+    assert runner.calls == 1
+
+
+async def test_post_is_retried_when_it_never_left(queue):
+    runner = Runner(connect_error(), slack_error("ratelimited", 429))
+    job = await run(queue, runner, "chat_postMessage")
+    assert job.status == DONE
+    assert job.attempts == 3
+    assert job.result == {"channel": "C1", "ts": "1.000100"}
+
+
+async def test_idempotent_writes_are_retried(queue):
+    runner = Runner(asyncio.TimeoutError(), slack_error("internal_error", 500))
+    job = await run(queue, runner, "reactions_add")
+    assert job.status == DONE
+    assert runner.calls == 3
+
+
+async def test_retries_stop_at_max_attempts(queue):
+    runner = Runner(*[asyncio.TimeoutError()] * 5)
+    job = await run(queue, runner, "pins_add")
+    assert job.status == FAILED
+    assert runner.calls == 3
+
+
+async def test_satisfied_and_permanent_errors(queue):
+    assert (await run(queue, Runner(slack_error("already_reacted")), "reactions_add")).status == DONE
+    assert (await run(queue, Runner(slack_error("channel_not_found")), "chat_postMessage")).status == FAILED
+
+
+async def test_restart_requeues_only_idempotent_jobs(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    before = JobQueue(path)
+    post = await before.submit("default", "send_message", "chat_postMessage", {"channel": "C1"})
+    react = await before.submit("default", "add_reaction", "reactions_add", {"channel": "C1"})
+    # Both jobs were running when the process stopped
+    assert before._claim(float("inf")) and before._claim(float("inf"))
+    before.close()
+
+    after = JobQueue(path)
+    assert after._recover() == 1
+    assert (await after.get(post.id)).status == UNKNOWN
+    assert (await after.get(react.id)).status == QUEUED
+    after.close()
+
+
+async def test_idempotency_key_deduplicates(queue):
+    first = await queue.submit("default", "send_message", "chat_postMessage", {"channel": "C1"}, "k1")
+    second = await queue.submit("default", "send_message", "chat_postMessage", {"channel": "C1"}, "k1")
+    other_tenant = await queue.submit("acme", "send_message", "chat_postMessage", {"channel": "C1"}, "k1")
+    assert first.id == second.id != other_tenant.id
+    assert queue.stats()["deduplicated"] == 1
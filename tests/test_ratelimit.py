@@ -0,0 +1,125 @@
+import pytest
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from slack_mcp_app.ratelimit import (
+    RateLimitScheduler,
+    TokenBucket,
+    bucket_params,
+    method_rate,
+    retry_after_seconds,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def ratelimited(retry_after: str = "2") -> SlackApiError:
+    response = AsyncSlackResponse(
+        client=None,
+        http_verb="POST",
+        api_url="https://slack.com/api/users.info",
+        req_args={},
+        data={"ok": False, "error": "ratelimited"},
+        headers={"Retry-After": retry_after},
+        status_code=429,
+    )
+    return SlackApiError("ratelimited", response)
+
+
+def test_method_rates_follow_tiers():
+    assert method_rate("users.list") == 20
+    assert method_rate("users.info") == 100
+    assert method_rate("chat.postMessage") == 300
+    assert method_rate("unknown.method") == 50
+
+
+def test_bucket_params():
+    # Tier 2: one request every 3s and no burst beyond the first request
+    assert bucket_params(20) == (3.0, 0.0)
+    interval, tolerance = bucket_params(100)
+    assert interval == pytest.approx(0.6)
+    assert tolerance == pytest.approx(4 * 0.6)
+
+
+def test_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(100, clock=clock)
+    # 3 seconds of burst at 100/min is 5 requests without waiting
+    assert [bucket.reserve() for _ in range(5)] == pytest.approx([0.0] * 5)
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits == pytest.approx([0.6, 1.2, 1.8])
+
+
+def test_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(20, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(3.0)
+    clock.now += 6.0
+    assert bucket.reserve() == 0.0
+
+
+def test_bucket_pause_blocks_until_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(100, clock=clock)
+    bucket.pause(10.0)
+    assert bucket.reserve() == pytest.approx(10.0)
+    clock.now += 10.0
+    assert bucket.reserve() == pytest.approx(0.6)
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(ratelimited("7")) == 7.0
+    assert retry_after_seconds(ratelimited("soon"), default=1.5) == 1.5
+
+
+async def test_scheduler_retries_rate_limited_calls(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("slack_mcp_app.ratelimit.asyncio.sleep", fake_sleep)
+    scheduler = RateLimitScheduler(max_retries=2)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ratelimited("1")
+        return "ok"
+
+    assert await scheduler.run("users.info", call) == "ok"
+    assert len(calls) == 3
+    assert scheduler.stats()["users.info"]["ratelimited"] == 2
+    assert sleeps and all(s > 0 for s in sleeps)
+
+
+async def test_scheduler_gives_up_after_max_retries(monkeypatch):
+    async def fake_sleep(seconds: float) -> None:
+        pass
+
+    monkeypatch.setattr("slack_mcp_app.ratelimit.asyncio.sleep", fake_sleep)
+    scheduler = RateLimitScheduler(max_retries=1)
+
+    async def call():
+        raise ratelimited("1")
+
+    with pytest.raises(SlackApiError):
+        await scheduler.run("users.info", call)
+
+
+async def test_scheduler_isolates_scopes():
+    scheduler = RateLimitScheduler()
+    for _ in range(5):
+        await scheduler._reserve("a", "users.list", None)
+    assert await scheduler._reserve("a", "users.list", None) > 0
+    assert await scheduler._reserve("b", "users.list", None) == 0.0
@@ -0,0 +1,148 @@
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+from slack_mcp_app import tools
+from slack_mcp_app.cache import DirectoryCache
+from slack_mcp_app.ratelimit import bucket_params
+from slack_mcp_app.state import MemoryBackend, RedisBackend
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def redis_backend():
+    backend = RedisBackend(fakeredis.FakeAsyncRedis(decode_responses=True), prefix="test:")
+    yield backend
+    await backend.close()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_redis_keys_are_prefixed_and_expire(redis_backend):
+    await redis_backend.set("a", "1", ttl=60)
+    assert await redis_backend.get("a") == "1"
+    assert await redis_backend.client.get("test:a") == "1"
+    assert 0 < await redis_backend.client.pttl("test:a") <= 60_000
+
+
+async def test_redis_set_if_absent(redis_backend):
+    assert await redis_backend.set_if_absent("lock", "x", ttl=10)
+    assert not await redis_backend.set_if_absent("lock", "y", ttl=10)
+    assert await redis_backend.get("lock") == "x"
+    await redis_backend.delete("lock")
+    assert await redis_backend.set_if_absent("lock", "z", ttl=10)
+
+
+async def test_redis_set_many_and_delete_pattern(redis_backend):
+    await redis_backend.set_many({"dir:a:1": "1", "dir:a:2": "2", "dir:b:1": "3"}, ttl=60)
+    await redis_backend.delete_pattern("dir:a:*")
+    assert await redis_backend.get("dir:a:1") is None
+    assert await redis_backend.get("dir:b:1") == "3"
+
+
+async def test_redis_gcra_paces_like_the_local_bucket(redis_backend):
+    interval, tolerance = bucket_params(100)
+    waits = [await redis_backend.gcra("rl:users.info", interval, tolerance) for _ in range(7)]
+    assert waits[:5] == pytest.approx([0.0] * 5, abs=0.05)
+    assert waits[5:] == pytest.approx([0.6, 1.2], abs=0.05)
+
+
+async def test_redis_gcra_pause(redis_backend):
+    interval, tolerance = bucket_params(20)
+    assert await redis_backend.gcra("rl:users.list", interval, tolerance, pause=30) == 0.0
+    assert await redis_backend.gcra("rl:users.list", interval, tolerance) == pytest.approx(30, abs=0.05)
+
+
+async def test_memory_and_redis_gcra_agree(redis_backend):
+    clock = FakeClock()
+    memory = MemoryBackend(clock=clock)
+    interval, tolerance = bucket_params(50)
+    local = [await memory.gcra("k", interval, tolerance) for _ in range(5)]
+    shared = [await redis_backend.gcra("k", interval, tolerance) for _ in range(5)]
+    assert shared == pytest.approx(local, abs=0.05)
+
+
+async def test_directory_cache_writes_through_to_shared_backend(redis_backend):
+    replica_a = DirectoryCache(backend=redis_backend, namespace="acme")
+    replica_b = DirectoryCache(backend=redis_backend, namespace="acme")
+    other_tenant = DirectoryCache(backend=redis_backend, namespace="globex")
+
+    await replica_a.put_users([{"id": "U1", "name": "ada", "profile": {"email": "ada@example.com"}}])
+    assert (await replica_b.get_user("U1"))["name"] == "ada"
+    assert (await replica_b.get_user_by_email("ada@example.com"))["id"] == "U1"
+    assert await other_tenant.get_user("U1") is None
+    assert replica_b.stats()["shared"]["hits"] >= 1
+
+    await replica_a.put_channels([{"id": "C1", "name": "general"}])
+    await replica_a.invalidate_channel("C1")
+    assert await replica_b.get_channel("C1") is None
+
+
+def app_context(state) -> SimpleNamespace:
+    app = SimpleNamespace(id="acme", state=state, tenants=None)
+    return SimpleNamespace(request_context=SimpleNamespace(lifespan_context=app))
+
+
+async def test_idempotent_call_runs_once_and_replays(redis_backend):
+    ctx = app_context(redis_backend)
+    calls = []
+
+    async def post():
+        calls.append(1)
+        return {"ok": True, "ts": "1.000100"}
+
+    first = await tools._once(ctx, "send_message", "key-1", post)
+    second = await tools._once(ctx, "send_message", "key-1", post)
+    assert first == second == {"ok": True, "ts": "1.000100"}
+    assert len(calls) == 1
+    assert await redis_backend.client.pttl("test:idem:acme:send_message:key-1") > tools.IDEMPOTENCY_LEASE * 1000
+
+
+async def test_in_progress_key_is_only_leased():
+    clock = FakeClock()
+    state = MemoryBackend(clock=clock)
+    ctx = app_context(state)
+    leases = []
+
+    async def post():
+        expires_at, _ = state._data["idem:acme:send_message:key-2"]
+        leases.append(expires_at - clock())
+        return {"ok": True}
+
+    await tools._once(ctx, "send_message", "key-2", post)
+    assert leases == [tools.IDEMPOTENCY_LEASE]
+
+
+async def test_key_of_a_crashed_call_frees_up_after_the_lease():
+    clock = FakeClock()
+    state = MemoryBackend(clock=clock)
+    ctx = app_context(state)
+
+    async def post():
+        return {"ok": True}
+
+    # A process that died mid-call left its in-progress marker behind
+    await state.set_if_absent("idem:acme:send_message:key-3", "", tools.IDEMPOTENCY_LEASE)
+    assert "already in progress" in (await tools._once(ctx, "send_message", "key-3", post))["error"]
+    clock.now += tools.IDEMPOTENCY_LEASE
+    assert await tools._once(ctx, "send_message", "key-3", post) == {"ok": True}
+
+
+async def test_failed_calls_release_the_key():
+    state = MemoryBackend()
+    ctx = app_context(state)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await tools._once(ctx, "send_message", "key-4", fail)
+    assert await state.get("idem:acme:send_message:key-4") is None
@@ -0,0 +1,159 @@
+import pytest
+
+from slack_mcp_app.store import MessageStore, to_match_expression, to_ts
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeHistory:
+    """``conversations.history`` over an in-memory channel, newest first."""
+
+    def __init__(self, count: int) -> None:
+        timestamps = [f"{1_700_000_000 + i}.000100" for i in range(count)]
+        self.messages = {ts: {"ts": ts, "user": "U1", "text": f"message {i}"} for i, ts in enumerate(timestamps)}
+        self.requests: list[dict] = []
+
+    def post(self, text: str) -> str:
+        ts = f"{float(max(self.messages, default='1700000000.000100')) + 1:.6f}"
+        self.messages[ts] = {"ts": ts, "user": "U2", "text": text}
+        return ts
+
+    async def conversations_history(
+        self, channel: str, limit: int, cursor: str = "", oldest: str = "", latest: str = "", inclusive: bool = False
+    ) -> dict:
+        self.requests.append({"oldest": oldest, "latest": latest, "inclusive": inclusive})
+        window = [
+            m for ts, m in sorted(self.messages.items(), reverse=True)
+            if (not oldest or ts > oldest or (inclusive and ts == oldest)) and (not latest or ts < latest)
+        ]
+        start = int(cursor or 0)
+        page = window[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(window) else ""
+        return {"messages": [dict(m) for m in page], "response_metadata": {"next_cursor": next_cursor}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MessageStore(str(tmp_path / "messages.db"), sync_interval=60, initial_limit=50, refresh_window=10)
+    yield store
+    store.close()
+
+
+async def test_first_sync_fetches_initial_limit(store):
+    slack = FakeHistory(80)
+    state = await store.sync(slack, "C1")
+    assert not state.complete
+    assert state.newest_ts == max(slack.messages)
+    messages = await store.read("C1", 20)
+    assert [m["ts"] for m in messages] == sorted(slack.messages, reverse=True)[:20]
+
+
+async def test_read_outside_synced_range_falls_back(store):
+    await store.sync(FakeHistory(80), "C1")
+    assert await store.read("C1", 60) is None
+    assert await store.read("C2", 10) is None
+
+
+async def test_sync_within_interval_does_not_call_slack(store):
+    slack = FakeHistory(20)
+    await store.sync(slack, "C1")
+    await store.sync(slack, "C1")
+    assert len(slack.requests) == 1
+
+
+async def test_delta_sync_refreshes_recent_messages(store):
+    slack = FakeHistory(30)
+    await store.sync(slack, "C1")
+    recent = sorted(slack.messages, reverse=True)
+    slack.messages[recent[0]]["text"] = "edited"
+    slack.messages[recent[1]]["reactions"] = [{"name": "eyes", "users": ["U2"], "count": 1}]
+    del slack.messages[recent[2]]
+    new_ts = slack.post("new message")
+
+    state = await store.sync(slack, "C1", force=True)
+    assert state.newest_ts == new_ts
+    assert slack.requests[-1]["inclusive"]
+    stored = {m["ts"]: m for m in await store.read("C1", 30)}
+    assert stored[new_ts]["text"] == "new message"
+    assert stored[recent[0]]["text"] == "edited"
+    assert stored[recent[1]]["reactions"][0]["name"] == "eyes"
+    assert recent[2] not in stored
+
+
+async def test_refresh_window_leaves_older_messages_alone(store):
+    slack = FakeHistory(30)
+    await store.sync(slack, "C1")
+    oldest = min(slack.messages)
+    del slack.messages[oldest]
+    await store.sync(slack, "C1", force=True)
+    assert oldest in {m["ts"] for m in await store.read("C1", 30)}
+    # A full sync refreshes every stored message
+    await store.sync(slack, "C1", full=True)
+    assert oldest not in {m["ts"] for m in await store.read("C1", 30)}
+
+
+async def test_delta_only_without_refresh_window(tmp_path):
+    store = MessageStore(str(tmp_path / "messages.db"), refresh_window=0)
+    slack = FakeHistory(5)
+    state = await store.sync(slack, "C1")
+    await store.sync(slack, "C1", force=True)
+    assert slack.requests[-1] == {"oldest": state.newest_ts, "latest": "", "inclusive": False}
+    store.close()
+
+
+async def test_full_sync_backfills_history(store):
+    slack = FakeHistory(80)
+    state = await store.sync(slack, "C1", full=True)
+    assert state.complete
+    assert state.oldest_ts == min(slack.messages)
+    assert len(await store.read("C1", 100)) == 80
+
+
+async def test_store_survives_reopen(tmp_path):
+    path = str(tmp_path / "messages.db")
+    store = MessageStore(path)
+    await store.sync(FakeHistory(5), "C1")
+    store.close()
+    reopened = MessageStore(path)
+    assert len(await reopened.read("C1", 5)) == 5
+    reopened.close()
+
+
+def test_match_expression_quotes_terms():
+    assert to_match_expression('deploy "prod" fail*') == '"deploy" "prod" "fail"*'
+    assert to_match_expression("  -- ") == ""
+
+
+def test_to_ts_accepts_iso_dates():
+    assert to_ts("2024-01-01") == "1704067200.000000"
+    assert to_ts("1704067200.000100") == "1704067200.000100"
+    assert to_ts("") is None
+
+
+async def test_search_ranks_and_filters(store):
+    slack = FakeHistory(0)
+    for text in ["deploy failed on prod", "lunch?", "prod deploy is green", "deployment notes"]:
+        slack.post(text)
+    await store.sync(slack, "C1")
+    await store.sync(FakeHistory(3), "C2")
+
+    hits = await store.search("prod deploy")
+    assert sorted(h.snippet for h in hits) == ["*deploy* failed on *prod*", "*prod* *deploy* is green"]
+    assert {h.channel for h in hits} == {"C1"}
+    assert len(await store.search("deploy*")) == 3
+    assert await store.search("message", channel="C1") == []
+    assert len(await store.search("message", channel="C2")) == 3
+    assert len(await store.search("message", user="U2")) == 0
+
+
+async def test_search_index_follows_edits_and_deletes(store):
+    slack = FakeHistory(0)
+    ts = slack.post("old wording")
+    await store.sync(slack, "C1")
+    slack.messages[ts]["text"] = "new wording"
+    await store.sync(slack, "C1", force=True)
+    assert await store.search("old") == []
+    assert [h.ts for h in await store.search("new")] == [ts]
+    del slack.messages[ts]
+    await store.sync(slack, "C1", force=True)
+    assert await store.search("wording") == []
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+from slack_mcp_app.store import MESSAGE_STORE_PATH_ENV, MessageStore
+from slack_mcp_app.tenants import DEFAULT_TENANT, TenantRegistry, TenantTokens
+
+
+def request(authorization: str = "") -> SimpleNamespace:
+    headers = {"authorization": authorization} if authorization else {}
+    return SimpleNamespace(request=SimpleNamespace(headers=headers))
+
+
+def registry(default_keys: list[str] | None = None, **kwargs) -> TenantRegistry:
+    tokens = {
+        DEFAULT_TENANT: TenantTokens("xoxb-default", api_keys=default_keys or []),
+        "acme": TenantTokens("xoxb-acme", api_keys=["acme-key"]),
+        "globex": TenantTokens("xoxb-globex", api_keys=["globex-key"]),
+    }
+    return TenantRegistry(tokens, lambda token, scope: SimpleNamespace(token=token, scope=scope), **kwargs)
+
+
+def test_api_key_selects_tenant():
+    tenants = registry()
+    assert tenants.resolve(request("Bearer acme-key")) == "acme"
+    assert tenants.for_request(request("Bearer globex-key")).slack_bot.token == "xoxb-globex"
+
+
+def test_tenant_name_headers_are_ignored():
+    tenants = registry()
+    spoofed = SimpleNamespace(request=SimpleNamespace(headers={"x-slack-tenant": "acme"}))
+    assert tenants.resolve(spoofed) == DEFAULT_TENANT
+
+
+def test_unknown_api_key_is_refused():
+    tenants = registry()
+    with pytest.raises(PermissionError):
+        tenants.resolve(request("Bearer acme"))
+    assert tenants.stats()["rejected"] == 1
+
+
+def test_default_tenant_can_require_a_key():
+    tenants = registry(default_keys=["default-key"])
+    with pytest.raises(PermissionError):
+        tenants.resolve(request())
+    assert tenants.resolve(request("Bearer default-key")) == DEFAULT_TENANT
+
+
+def test_requests_without_http_transport_use_default():
+    tenants = registry(default_keys=["default-key"])
+    assert tenants.resolve(SimpleNamespace(request=None)) == DEFAULT_TENANT
+
+
+def test_idle_tenants_are_evicted():
+    clock = SimpleNamespace(now=0.0)
+    tenants = registry(idle_ttl=10, clock=lambda: clock.now)
+    first = tenants.get("acme")
+    clock.now = 11
+    tenants.get("globex")
+    assert tenants.get("acme") is not first
+    assert tenants.stats()["evicted"] == 1
+
+
+class FakeHistory:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    async def conversations_history(self, channel: str, limit: int, **kwargs) -> dict:
+        return {"messages": [{"ts": "1700000000.000100", "user": "U1", "text": self.text}]}
+
+
+@pytest.mark.anyio
+async def test_tenants_have_separate_message_stores(tmp_path, monkeypatch):
+    monkeypatch.setenv(MESSAGE_STORE_PATH_ENV, str(tmp_path / "messages.db"))
+    tenants = registry(store_factory=MessageStore.from_env)
+    acme, globex = tenants.get("acme").store, tenants.get("globex").store
+    assert acme.path.endswith("messages.acme.db") and globex.path.endswith("messages.globex.db")
+
+    await acme.sync(FakeHistory("acme launch plan"), "C1")
+    await globex.sync(FakeHistory("globex payroll"), "C1")
+    assert [m["text"] for m in await acme.read("C1", 10)] == ["acme launch plan"]
+    assert [m["text"] for m in await globex.read("C1", 10)] == ["globex payroll"]
+    assert await acme.search("payroll") == []
+    assert await tenants.get(DEFAULT_TENANT).store.read("C1", 10) is None
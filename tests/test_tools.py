@@ -0,0 +1,103 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from mcp.server.fastmcp.tools import Tool
+from slack_sdk.errors import SlackApiError
+
+from slack_mcp_app import tools
+from slack_mcp_app.slack_mcp_server import tool_registry
+
+
+def test_every_tool_receives_the_request_context():
+    for name, _ in tool_registry:
+        tool = Tool.from_function(getattr(tools, name))
+        assert tool.context_kwarg == "ctx", name
+        assert "ctx" not in tool.parameters["properties"], name
+
+
+def test_listing_defaults():
+    schema = Tool.from_function(tools.list_channels).parameters["properties"]
+    assert schema["limit"]["default"] == 100
+
+
+class FakeSlack:
+    """Records ``chat_postMessage`` calls and fails for the configured channels."""
+
+    def __init__(self, failures: dict[str, BaseException] | None = None) -> None:
+        self.failures = failures or {}
+        self.posted: list[str] = []
+
+    async def chat_postMessage(self, channel: str, text: str) -> dict:
+        if channel in self.failures:
+            raise self.failures[channel]
+        self.posted.append(channel)
+        return {"ok": True, "channel": channel, "ts": f"{len(self.posted)}.000100"}
+
+
+def context(**app: object) -> SimpleNamespace:
+    defaults = {"slack_bot": None, "slack_user": None, "directory": None, "store": None, "state": None, "tenants": None}
+    return SimpleNamespace(request_context=SimpleNamespace(lifespan_context=SimpleNamespace(**{**defaults, **app})))
+
+
+@pytest.mark.anyio
+async def test_bulk_send_reports_network_errors_per_target():
+    slack = FakeSlack({"C2": asyncio.TimeoutError(), "C3": aiohttp.ClientOSError(104, "reset")})
+    result = await tools.send_messages_bulk(
+        channels=["C1", "C2", "C3", "C4"], text="hi", output_format="json", ctx=context(slack_bot=slack)
+    )
+    rows = {r["channel"]: r for r in json.loads(result)["items"]}
+    assert slack.posted == ["C1", "C4"]
+    assert rows["C1"]["ok"] and rows["C4"]["ok"]
+    assert rows["C2"] == {"channel": "C2", "ok": False, "error": "TimeoutError"}
+    assert not rows["C3"]["ok"] and "reset" in rows["C3"]["error"]
+
+
+class FakeDirectorySlack:
+    """``users.list`` pages of ``members`` users plus ``users.info`` for any known ID."""
+
+    def __init__(self, members: int, page_size: int, extra: set[str] = frozenset()) -> None:
+        self.members = [{"id": f"U{i:05d}", "name": f"user{i}"} for i in range(members)]
+        self.extra = extra
+        self.page_size = page_size
+        self.pages = 0
+        self.info_calls: list[str] = []
+
+    async def users_list(self, limit: int, cursor: str = "") -> dict:
+        self.pages += 1
+        start = int(cursor or 0)
+        stop = start + self.page_size
+        next_cursor = str(stop) if stop < len(self.members) else ""
+        return {"members": self.members[start:stop], "response_metadata": {"next_cursor": next_cursor}}
+
+    async def users_info(self, user: str) -> dict:
+        self.info_calls.append(user)
+        if user in self.extra:
+            return {"ok": True, "user": {"id": user, "name": f"external-{user}"}}
+        if user.startswith("U0") and int(user[1:]) < len(self.members):
+            return {"ok": True, "user": self.members[int(user[1:])]}
+        raise SlackApiError("user_not_found", {"ok": False, "error": "user_not_found"})
+
+
+@pytest.mark.anyio
+async def test_user_names_caps_users_list_pages():
+    slack = FakeDirectorySlack(members=10_000, page_size=100, extra={"W99999"})
+    wanted = {f"U{i:05d}" for i in range(0, 10_000, 250)} | {"W99999", "UGONE"}
+    names = await tools._user_names(context(slack_bot=slack), wanted)
+
+    assert slack.pages == tools.USERS_LIST_MAX_PAGES
+    found_in_pages = {u for u in wanted if u.startswith("U0") and int(u[1:]) < 300}
+    assert set(slack.info_calls) == wanted - found_in_pages
+    assert names["W99999"] == "external-W99999"
+    assert names["U09750"] == "user9750"
+    assert "UGONE" not in names
+
+
+@pytest.mark.anyio
+async def test_user_names_uses_users_info_for_few_misses():
+    slack = FakeDirectorySlack(members=100, page_size=100)
+    names = await tools._user_names(context(slack_bot=slack), {"U00001", "U00002"})
+    assert slack.pages == 0
+    assert names == {"U00001": "user1", "U00002": "user2"}